@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for gemini-mcp-server
+
+Measures the server's own overhead without network access:
+
+- ``detect_uncertainty`` and ``_prepare_query`` throughput across text sizes
+- ``detect_uncertainty`` on many short, varied messages, the typical input
+- end-to-end ``consult_gemini`` latency and throughput through MCPServer's
+  tool handlers at several concurrency levels, against ``stub_gemini.py``
+
+Results are written as JSON. Pass ``--compare`` with an earlier results file
+to report regressions between releases.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent))
+
+from gemini_mcp import __version__  # noqa: E402
+from gemini_mcp.gemini_integration import (  # noqa: E402
+    GeminiIntegration,
+    get_registry,
+)
+from gemini_mcp.server import MCPServer  # noqa: E402
+
+STUB_CLI = BENCHMARK_DIR / "stub_gemini.py"
+
+FILLER_WORDS = [
+    "the",
+    "function",
+    "returns",
+    "a",
+    "value",
+    "after",
+    "parsing",
+    "request",
+    "handler",
+    "validates",
+    "input",
+    "before",
+    "writing",
+    "results",
+    "to",
+    "database",
+    "layer",
+]
+HEDGE_WORDS = ["maybe", "I think", "trade-offs", "security", "production"]
+
+
+def make_text(size: int, hedge_ratio: float = 0.01, seed: int = 0) -> str:
+    """Build roughly ``size`` characters of prose with occasional hedges"""
+    rng = random.Random(seed)
+    words: list[str] = []
+    length = 0
+    while length < size:
+        word = (
+            rng.choice(HEDGE_WORDS)
+            if rng.random() < hedge_ratio
+            else rng.choice(FILLER_WORDS)
+        )
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def time_callable(fn: Callable[[], Any], min_time: float) -> dict[str, float]:
+    """Call ``fn`` repeatedly for at least ``min_time`` seconds"""
+    fn()  # warm up caches
+    iterations = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+    return {
+        "iterations": iterations,
+        "mean_us": elapsed / iterations * 1e6,
+        "ops_per_sec": iterations / elapsed,
+    }
+
+
+def bench_detect_uncertainty(sizes: list[int], min_time: float) -> list[dict]:
+    """Throughput of detect_uncertainty on texts of each size"""
+    integration = GeminiIntegration()
+    results = []
+    for size in sizes:
+        text = make_text(size)
+        timing = time_callable(
+            functools.partial(integration.detect_uncertainty, text), min_time
+        )
+        timing["mb_per_sec"] = timing["ops_per_sec"] * size / 1e6
+        results.append({"size": size, **timing})
+    return results
+
+
+def bench_detect_messages(
+    count: int, size: int, min_time: float
+) -> dict[str, float | int]:
+    """Mean detect_uncertainty time over many short messages with varied hedges"""
+    integration = GeminiIntegration()
+    messages = [make_text(size, hedge_ratio=0.1, seed=seed) for seed in range(count)]
+
+    def detect_all() -> None:
+        for message in messages:
+            integration.detect_uncertainty(message)
+
+    timing = time_callable(detect_all, min_time)
+    return {
+        "messages": count,
+        "size": size,
+        "mean_us": timing["mean_us"] / count,
+        "messages_per_sec": timing["ops_per_sec"] * count,
+    }
+
+
+def bench_prepare_query(sizes: list[int], min_time: float) -> list[dict]:
+    """Throughput of _prepare_query with contexts of each size"""
+    integration = GeminiIntegration({"max_context_length": max(sizes)})
+    query = "Is this the right approach for caching?"
+    results = []
+    for size in sizes:
+        context = make_text(size)
+        timing = time_callable(
+            functools.partial(integration._prepare_query, query, context, True),
+            min_time,
+        )
+        results.append({"size": size, **timing})
+    return results
+
+
+async def bench_consult(
+    levels: list[int],
+    requests: int,
+    latency: float,
+    output_bytes: int,
+    failure_rate: float,
+) -> list[dict]:
+    """End-to-end consult_gemini latency through MCPServer's tool handler"""
+    os.environ["STUB_GEMINI_LATENCY"] = str(latency)
+    os.environ["STUB_GEMINI_OUTPUT_BYTES"] = str(output_bytes)
+    os.environ["STUB_GEMINI_FAILURE_RATE"] = str(failure_rate)
+
+    results = []
+    with tempfile.TemporaryDirectory() as project_root:
+
+        async def one_request(
+            server: MCPServer, query: str, semaphore: asyncio.Semaphore
+        ) -> tuple[float, bool]:
+            async with semaphore:
+                start = time.perf_counter()
+                content = await server._handle_consult_gemini({"query": query})
+                return time.perf_counter() - start, "Failed" in content[0].text
+
+        for level in levels:
+            # Failures are reported as errors rather than retried or tripping
+            # the breaker, so the timings measure the server's own overhead
+            config = {
+                "cli_command": str(STUB_CLI),
+                "model": "stub",
+                "timeout": 60,
+                "rate_limit_delay": 0,
+                "max_concurrency": level,
+                "max_retries": 0,
+                "circuit_failure_threshold": 0,
+                "cache_enabled": False,
+                "stream_output": False,
+            }
+            (Path(project_root) / "gemini-config.json").write_text(json.dumps(config))
+            os.environ["GEMINI_GLOBAL_MAX_CONCURRENCY"] = str(level)
+            server = MCPServer(project_root=project_root)
+            semaphore = asyncio.Semaphore(level)
+
+            start = time.perf_counter()
+            try:
+                outcomes = await asyncio.gather(
+                    *(
+                        one_request(
+                            server, f"Benchmark question {level}-{index}", semaphore
+                        )
+                        for index in range(requests)
+                    )
+                )
+                wall_time = time.perf_counter() - start
+            finally:
+                await get_registry().release(server.gemini)
+            latencies = [latency for latency, _ in outcomes]
+            errors = sum(failed for _, failed in outcomes)
+
+            percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50 = statistics.median(latencies)
+            results.append(
+                {
+                    "concurrency": level,
+                    "requests": requests,
+                    "errors": errors,
+                    "wall_time": wall_time,
+                    "throughput_rps": requests / wall_time,
+                    "latency_p50": p50,
+                    "latency_p95": percentiles[94],
+                    "latency_p99": percentiles[98],
+                    "overhead_p50": p50 - latency,
+                }
+            )
+    return results
+
+
+def flatten(results: dict[str, Any]) -> dict[str, float]:
+    """Map comparable metrics to stable names"""
+    metrics: dict[str, float] = {}
+    for entry in results["detect_uncertainty"]:
+        metrics[f"detect_uncertainty[{entry['size']}].mean_us"] = entry["mean_us"]
+    if "detect_messages" in results:
+        entry = results["detect_messages"]
+        metrics[f"detect_messages[{entry['size']}].mean_us"] = entry["mean_us"]
+    for entry in results["prepare_query"]:
+        metrics[f"prepare_query[{entry['size']}].mean_us"] = entry["mean_us"]
+    for entry in results["consult"]:
+        name = f"consult[c={entry['concurrency']}]"
+        metrics[f"{name}.latency_p50"] = entry["latency_p50"]
+        metrics[f"{name}.latency_p99"] = entry["latency_p99"]
+    return metrics
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> int:
+    """Print metric changes and return the number of regressions"""
+    old, new = flatten(baseline), flatten(current)
+    regressions = 0
+    print(f"\nComparison against {baseline.get('version', 'unknown')}:")
+    for name in sorted(new.keys() & old.keys()):
+        change = (new[name] - old[name]) / old[name] if old[name] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  <-- regression"
+            regressions += 1
+        print(
+            f"  {name:45} {old[name]:12.4g} -> {new[name]:12.4g} ({change:+.1%}){flag}"
+        )
+    return regressions
+
+
+def parse_sizes(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        type=parse_sizes,
+        default=[1_000, 10_000, 100_000, 500_000],
+        help="Comma-separated text sizes for the micro benchmarks",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=parse_sizes,
+        default=[1, 4, 16],
+        help="Comma-separated concurrency levels for consult_gemini",
+    )
+    parser.add_argument(
+        "--messages",
+        type=int,
+        default=2000,
+        help="Number of short messages for the message benchmark",
+    )
+    parser.add_argument("--message-size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--output-bytes", type=int, default=2048)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--min-time", type=float, default=0.5)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Results file (default: benchmarks/results/<timestamp>.json)",
+    )
+    parser.add_argument("--compare", type=Path, help="Earlier results to diff against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative slowdown reported as a regression (default: 0.10)",
+    )
+    args = parser.parse_args()
+
+    print("Benchmarking detect_uncertainty...")
+    detect = bench_detect_uncertainty(args.sizes, args.min_time)
+    detect_messages = bench_detect_messages(
+        args.messages, args.message_size, args.min_time
+    )
+    print("Benchmarking _prepare_query...")
+    prepare = bench_prepare_query(args.sizes, args.min_time)
+    print("Benchmarking consult_gemini through MCPServer...")
+    consult = asyncio.run(
+        bench_consult(
+            args.concurrency,
+            args.requests,
+            args.latency,
+            args.output_bytes,
+            args.failure_rate,
+        )
+    )
+
+    results = {
+        "version": __version__,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "stub_latency": args.latency,
+            "stub_output_bytes": args.output_bytes,
+            "stub_failure_rate": args.failure_rate,
+            "requests": args.requests,
+        },
+        "detect_uncertainty": detect,
+        "detect_messages": detect_messages,
+        "prepare_query": prepare,
+        "consult": consult,
+    }
+
+    output = args.output or (
+        BENCHMARK_DIR / "results" / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+
+    for entry in detect:
+        print(
+            f"  detect_uncertainty {entry['size']:>8} chars: "
+            f"{entry['mean_us']:10.1f} us  ({entry['mb_per_sec']:.1f} MB/s)"
+        )
+    print(
+        f"  detect_uncertainty {detect_messages['messages']:>5} x "
+        f"{detect_messages['size']} chars: {detect_messages['mean_us']:7.1f} us/message"
+    )
+    for entry in prepare:
+        print(
+            f"  prepare_query      {entry['size']:>8} chars: {entry['mean_us']:10.1f} us"
+        )
+    for entry in consult:
+        print(
+            f"  consult c={entry['concurrency']:<3} {entry['throughput_rps']:7.1f} req/s  "
+            f"p50 {entry['latency_p50'] * 1000:7.1f} ms  "
+            f"p99 {entry['latency_p99'] * 1000:7.1f} ms  errors {entry['errors']}"
+        )
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
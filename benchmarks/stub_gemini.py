@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Stub Gemini CLI for offline benchmarks
+
+Accepts the same arguments as the real CLI (``-m MODEL`` and ``-p PROMPT``, or
+the prompt on stdin) and answers after a configurable delay. Behaviour is set
+through environment variables so it can be used as ``cli_command``:
+
+  STUB_GEMINI_LATENCY        Seconds to wait before answering (default: 0.05)
+  STUB_GEMINI_OUTPUT_BYTES   Size of the response in bytes (default: 2048)
+  STUB_GEMINI_FAILURE_RATE   Probability of exiting with an error (default: 0)
+"""
+
+import os
+import random
+import sys
+import time
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    prompt = args[args.index("-p") + 1] if "-p" in args else sys.stdin.read()
+
+    latency = float(os.getenv("STUB_GEMINI_LATENCY", "0.05"))
+    output_bytes = int(os.getenv("STUB_GEMINI_OUTPUT_BYTES", "2048"))
+    failure_rate = float(os.getenv("STUB_GEMINI_FAILURE_RATE", "0"))
+
+    time.sleep(latency)
+    if random.random() < failure_rate:
+        sys.stderr.write("Stub failure: 503 Service Unavailable\n")
+        return 1
+
+    line = f"Stub answer for a {len(prompt)}-character prompt.\n"
+    repeats = output_bytes // len(line) + 1
+    sys.stdout.write((line * repeats)[:output_bytes])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,36 @@
 Gemini MCP Server - MCP Server with Google Gemini CLI integration
 """
 
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.1.0"
 __author__ = "Your Name"
 
-from .gemini_integration import GeminiIntegration, get_integration
-from .server import MCPServer
+if TYPE_CHECKING:
+    from .gemini_integration import GeminiIntegration, get_integration
+    from .server import MCPServer
+
+# Public names are imported on first access so that ``import gemini_mcp``
+# (e.g. to read __version__) does not pull in the MCP SDK and pydantic.
+_LAZY_EXPORTS = {
+    "GeminiIntegration": ".gemini_integration",
+    "get_integration": ".gemini_integration",
+    "MCPServer": ".server",
+}
 
 __all__ = ["GeminiIntegration", "get_integration", "MCPServer"]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EXPORTS:
+        import importlib
+
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -4,8 +4,8 @@ Main entry point for the Gemini MCP Server
 """
 
 import argparse
-import asyncio
 import sys
+import time
 
 
 def main() -> None:
@@ -21,8 +21,14 @@ Examples:
   # Run server with specific project root
   gemini-mcp-server --project-root /path/to/project
 
+  # Serve many clients over Streamable HTTP on port 8000
+  gemini-mcp-server --transport http --port 8000
+
   # Show version
   gemini-mcp-server --version
+
+  # Report import and initialization timings
+  gemini-mcp-server --profile-startup
         """,
     )
 
@@ -46,15 +52,98 @@ Examples:
         help="Path to gemini-config.json file (default: <project-root>/gemini-config.json)",
     )
 
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "http"],
+        default="stdio",
+        help="Serve one client over stdio or many over Streamable HTTP (default: stdio)",
+    )
+
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Address to bind with --transport http (default: 127.0.0.1)",
+    )
+
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="Port to bind with --transport http (default: 8000)",
+    )
+
+    parser.add_argument(
+        "--allow-remote",
+        action="store_true",
+        help="Allow --host to be a non-loopback address, exposing the server",
+    )
+
+    parser.add_argument(
+        "--allowed-host",
+        action="append",
+        default=[],
+        help="Extra Host header name clients may use with --transport http "
+        "(repeatable)",
+    )
+
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=100,
+        help="Concurrent HTTP connections before new ones get 503 (default: 100)",
+    )
+
+    parser.add_argument(
+        "--shutdown-timeout",
+        type=int,
+        default=10,
+        help="Seconds open HTTP connections get to finish on shutdown (default: 10)",
+    )
+
+    parser.add_argument(
+        "--stateless",
+        action="store_true",
+        help="Serve HTTP without per-client sessions (no streamed output)",
+    )
+
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report import and initialization timings and exit",
+    )
+
     args = parser.parse_args()
 
-    # Import here to avoid circular imports
+    if args.profile_startup:
+        profile_startup(args.project_root)
+        return
+
+    # Heavy imports are deferred so --help and --version stay fast
+    import asyncio
+    import logging
+
     from .server import MCPServer
 
+    logging.basicConfig(level=logging.INFO)
+
     try:
         # Create and run server
         server = MCPServer(project_root=args.project_root)
-        asyncio.run(server.run())
+        if args.transport == "http":
+            asyncio.run(
+                server.run_http(
+                    host=args.host,
+                    port=args.port,
+                    max_connections=args.max_connections,
+                    shutdown_timeout=args.shutdown_timeout,
+                    stateless=args.stateless,
+                    allow_remote=args.allow_remote,
+                    allowed_hosts=args.allowed_host,
+                )
+            )
+        else:
+            asyncio.run(server.run())
     except KeyboardInterrupt:
         print("\n✋ Server stopped by user")
         sys.exit(0)
@@ -63,5 +152,33 @@ Examples:
         sys.exit(1)
 
 
+def profile_startup(project_root: str) -> None:
+    """Print how long each startup stage takes to stderr"""
+    import importlib
+
+    timings: list[tuple[str, float]] = []
+    for module in (
+        "gemini_mcp.gemini_integration",
+        "mcp.types",
+        "mcp.server",
+        "gemini_mcp.server",
+    ):
+        stage_start = time.perf_counter()
+        importlib.import_module(module)
+        timings.append((f"import {module}", time.perf_counter() - stage_start))
+
+    from .server import MCPServer
+
+    stage_start = time.perf_counter()
+    MCPServer(project_root=project_root)
+    timings.append(("MCPServer() initialization", time.perf_counter() - stage_start))
+
+    print("⏱️ Startup profile", file=sys.stderr)
+    for stage, elapsed in timings:
+        print(f"  {stage:40} {elapsed * 1000:8.1f} ms", file=sys.stderr)
+    total = sum(elapsed for _, elapsed in timings)
+    print(f"  {'total':40} {total * 1000:8.1f} ms", file=sys.stderr)
+
+
 if __name__ == "__main__":
     main()
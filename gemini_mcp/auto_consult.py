@@ -0,0 +1,110 @@
+"""
+Auto-Consult Module
+Scores assistant text for uncertainty and decides when to consult Gemini
+"""
+
+import re
+import time
+from collections import deque
+from typing import Any
+
+from .uncertainty import UncertaintyMatcher, default_matcher
+
+DEFAULT_WEIGHTS = {
+    "uncertainty": 1.0,
+    "complex_decision": 1.5,
+    "critical_operation": 2.5,
+}
+
+# Map the uncertainty_thresholds config switches to pattern families
+FAMILY_SWITCHES = {
+    "uncertainty_patterns": "uncertainty",
+    "complex_decisions": "complex_decision",
+    "critical_operations": "critical_operation",
+}
+
+_WORD = re.compile(r"\w+")
+
+
+class AutoConsultPolicy:
+    """Decide whether assistant text warrants an automatic consultation
+
+    Every distinct pattern found adds its family's weight to the score, and
+    a consultation is suggested once the score reaches ``threshold``. Text
+    whose words overlap a trigger from the last ``debounce`` seconds by at
+    least ``similarity`` (Jaccard) is treated as a near-duplicate and skipped.
+    """
+
+    def __init__(
+        self,
+        weights: dict[str, float] | None = None,
+        threshold: float = 3.0,
+        debounce: float = 300.0,
+        similarity: float = 0.8,
+        history: int = 32,
+        matcher: UncertaintyMatcher = default_matcher,
+    ):
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.threshold = threshold
+        self.debounce = debounce
+        self.similarity = similarity
+        self.matcher = matcher
+        self._recent: deque[tuple[float, frozenset[str]]] = deque(maxlen=history)
+
+        # Statistics
+        self.evaluated = 0
+        self.triggered = 0
+        self.debounced = 0
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "AutoConsultPolicy":
+        """Build a policy from integration config keys"""
+        weights = dict(config.get("auto_consult_weights", {}))
+        for switch, family in FAMILY_SWITCHES.items():
+            if not config.get("uncertainty_thresholds", {}).get(switch, True):
+                weights[family] = 0.0
+        return cls(
+            weights=weights,
+            threshold=config.get("auto_consult_threshold", 3.0),
+            debounce=config.get("auto_consult_debounce", 300.0),
+            similarity=config.get("auto_consult_similarity", 0.8),
+        )
+
+    def score(self, text: str) -> tuple[float, list[str]]:
+        """Weighted score of ``text`` and the pattern labels behind it"""
+        labels = self.matcher.detect(text)
+        score = sum(self.weights.get(label.split(":", 1)[0], 0.0) for label in labels)
+        return score, labels
+
+    def evaluate(self, text: str, now: float | None = None) -> dict[str, Any]:
+        """Score ``text`` and decide whether to consult
+
+        The returned dict has ``score``, ``patterns``, ``consult`` and, when
+        consulting was declined, a ``reason``.
+        """
+        self.evaluated += 1
+        score, labels = self.score(text)
+        decision: dict[str, Any] = {
+            "score": score,
+            "patterns": labels,
+            "consult": False,
+        }
+        if score < self.threshold:
+            decision["reason"] = "below_threshold"
+            return decision
+
+        now = time.monotonic() if now is None else now
+        words = frozenset(word.lower() for word in _WORD.findall(text))
+        while self._recent and now - self._recent[0][0] > self.debounce:
+            self._recent.popleft()
+        for _, previous in self._recent:
+            union = len(words | previous)
+            if union and len(words & previous) / union >= self.similarity:
+                self.debounced += 1
+                decision["reason"] = "debounced"
+                return decision
+
+        self._recent.append((now, words))
+        self.triggered += 1
+        decision["consult"] = True
+        return decision
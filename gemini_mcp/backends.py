@@ -0,0 +1,475 @@
+"""
+Backends Module
+Ways of executing a prepared prompt: the Gemini CLI or the Gemini HTTP API
+"""
+
+import asyncio
+import importlib.util
+import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Any, Protocol
+
+from .process import ProcessSupervisor
+from .retry import GeminiCLIError, classify_error
+from .streaming import ChunkCallback, iter_stream
+from .tracing import Span
+from .worker_pool import WarmWorkerPool
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+# Size of each write when streaming a prompt to the CLI's stdin
+STDIN_CHUNK_SIZE = 64 * 1024
+
+DEFAULT_API_BASE_URL = "https://generativelanguage.googleapis.com"
+
+
+class Backend(Protocol):
+    """Executes prepared prompts against Gemini
+
+    ``execute`` returns a dict with at least ``output``, ``execution_time``,
+    ``spawn_time``, ``first_chunk_time`` and ``spans``, and raises
+    GeminiCLIError on failure.
+    """
+
+    name: str
+
+    async def execute(
+        self,
+        query: str,
+        model: str,
+        timeout: float,
+        on_chunk: ChunkCallback | None = None,
+    ) -> dict[str, Any]: ...
+
+    async def start(self) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+def make_backend(config: dict[str, Any], supervisor: ProcessSupervisor) -> Backend:
+    """Build the backend selected by the ``backend`` and ``cli_command`` keys
+
+    A ``cli_command`` that is an http(s) URL selects the HTTP backend with
+    that base URL.
+    """
+    cli_command = config.get("cli_command", "gemini")
+    is_url = cli_command.startswith(("http://", "https://"))
+    kind = config.get("backend", "http" if is_url else "cli")
+    if kind == "http":
+        return HTTPBackend.from_config(config)
+    if kind == "cli":
+        return CLIBackend.from_config(config, supervisor)
+    raise ValueError(f"Unknown Gemini backend: {kind}")
+
+
+def _spans(
+    start_time: float,
+    connected_at: float,
+    first_chunk_at: float | None,
+    completed_at: float,
+) -> list[Span]:
+    """Spawn, first byte, complete and decode spans of one execution"""
+    spans = [Span("spawn", start_time, connected_at - start_time)]
+    if first_chunk_at is not None:
+        spans.append(Span("first_byte", connected_at, first_chunk_at - connected_at))
+    output_start = first_chunk_at or connected_at
+    spans.append(Span("complete", output_start, completed_at - output_start))
+    spans.append(Span.since("decode", completed_at))
+    return spans
+
+
+class CLIBackend:
+    """Run each prompt through a Gemini CLI process
+
+    A warm worker from the pool is used when one is ready and the model is
+    the configured one; otherwise a new CLI process is spawned through
+    ``supervisor``. Prompts go to the CLI on its command line or through
+    stdin, see ``_use_stdin``.
+    """
+
+    name = "cli"
+
+    def __init__(
+        self,
+        cli_command: str = "gemini",
+        model: str = "",
+        supervisor: ProcessSupervisor | None = None,
+        prompt_delivery: str = "auto",
+        stdin_threshold: int = 32 * 1024,
+        worker_pool_size: int = 0,
+        worker_max_idle: float = 300.0,
+    ):
+        self.cli_command = cli_command
+        self.model = model
+        self.supervisor = supervisor or ProcessSupervisor()
+        self.prompt_delivery = prompt_delivery
+        self.stdin_threshold = stdin_threshold
+        self.worker_pool: WarmWorkerPool | None = None
+        if worker_pool_size > 0:
+            self.worker_pool = WarmWorkerPool(
+                self._build_command(),
+                size=worker_pool_size,
+                max_idle=worker_max_idle,
+                supervisor=self.supervisor,
+            )
+
+    @classmethod
+    def from_config(
+        cls, config: dict[str, Any], supervisor: ProcessSupervisor
+    ) -> "CLIBackend":
+        """Build a CLI backend from integration config keys"""
+        return cls(
+            cli_command=config.get("cli_command", "gemini"),
+            model=config.get("model", "gemini-2.5-flash"),
+            supervisor=supervisor,
+            prompt_delivery=config.get("prompt_delivery", "auto"),
+            stdin_threshold=config.get("stdin_threshold", 32 * 1024),
+            worker_pool_size=config.get("worker_pool_size", 0),
+            worker_max_idle=config.get("worker_max_idle", 300.0),
+        )
+
+    async def start(self) -> None:
+        """Start filling the warm worker pool"""
+        if self.worker_pool is not None:
+            self.worker_pool.start()
+
+    async def close(self) -> None:
+        """Stop the warm workers"""
+        if self.worker_pool is not None:
+            await self.worker_pool.close()
+
+    async def execute(
+        self,
+        query: str,
+        model: str,
+        timeout: float,
+        on_chunk: ChunkCallback | None = None,
+    ) -> dict[str, Any]:
+        """Run the CLI on ``query`` and return its output
+
+        Stdout is read incrementally and, with ``on_chunk``, forwarded as it
+        arrives. ``timeout`` bounds the whole call, including the wait for a
+        process slot. The process is reaped however the call ends.
+        """
+        start_time = time.time()
+
+        process = None
+        if self.worker_pool is not None and model == self.model:
+            process = await self.worker_pool.acquire()
+        warm = process is not None
+        use_stdin = warm or self._use_stdin(query)
+
+        if process is None:
+            # Waiting for a free process slot counts against the timeout
+            try:
+                process = await asyncio.wait_for(
+                    self.supervisor.spawn(
+                        *self._build_command(None if use_stdin else query, model),
+                        stdin=asyncio.subprocess.PIPE if use_stdin else None,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE,
+                    ),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError as e:
+                raise GeminiCLIError(
+                    f"No Gemini CLI process slot freed within {timeout:g} seconds",
+                    kind="timeout",
+                    retryable=True,
+                ) from e
+        spawned_at = time.time()
+
+        try:
+            stdin_data = query.encode() if use_stdin else None
+            parts, stderr, first_chunk_at = await asyncio.wait_for(
+                self._stream_output(process, stdin_data, on_chunk),
+                timeout=max(0.0, start_time + timeout - spawned_at),
+            )
+        except asyncio.TimeoutError as e:
+            raise GeminiCLIError(
+                f"Gemini CLI timed out after {timeout:g} seconds",
+                kind="timeout",
+                retryable=True,
+            ) from e
+        finally:
+            # Terminates the process group if the CLI is still running after a
+            # timeout, an error or cancellation
+            await self.supervisor.reap(process)
+
+        completed_at = time.time()
+
+        if process.returncode != 0:
+            error_msg = stderr.decode() if stderr else "Unknown error"
+            kind, retryable = classify_error(process.returncode, error_msg)
+            if kind == "auth":
+                error_msg += "\nTip: Run 'gemini' interactively to authenticate"
+            raise GeminiCLIError(
+                f"Gemini CLI failed: {error_msg}", kind=kind, retryable=retryable
+            )
+
+        return {
+            "output": "".join(parts).strip(),
+            "execution_time": completed_at - start_time,
+            "spawn_time": spawned_at - start_time,
+            "warm_worker": warm,
+            "first_chunk_time": (
+                None if first_chunk_at is None else first_chunk_at - start_time
+            ),
+            "prompt_delivery": "stdin" if use_stdin else "argv",
+            "spans": _spans(start_time, spawned_at, first_chunk_at, completed_at),
+        }
+
+    def _build_command(
+        self, query: str | None = None, model: str | None = None
+    ) -> list[str]:
+        """Build the Gemini CLI command line
+
+        Without a query the CLI reads its prompt from stdin, which is how warm
+        workers are started.
+        """
+        cmd = [self.cli_command]
+        model = self.model if model is None else model
+        if model:
+            cmd.extend(["-m", model])
+        if query is not None:
+            cmd.extend(["-p", query])  # Non-interactive mode
+        return cmd
+
+    def _use_stdin(self, query: str) -> bool:
+        """Whether a prompt should be sent through stdin instead of argv
+
+        ``prompt_delivery`` is "argv", "stdin" or "auto"; in auto mode prompts
+        larger than ``stdin_threshold`` bytes go through stdin, which avoids
+        ARG_MAX limits and keeps them out of the process table.
+        """
+        if self.prompt_delivery == "stdin":
+            return True
+        if self.prompt_delivery == "argv":
+            return False
+        return len(query.encode()) > self.stdin_threshold
+
+    async def _stream_output(
+        self,
+        process: asyncio.subprocess.Process,
+        stdin_data: bytes | None,
+        on_chunk: ChunkCallback | None = None,
+    ) -> tuple[list[str], bytes, float | None]:
+        """Read stdout incrementally while collecting stderr
+
+        Returns the decoded stdout chunks, stderr and the time the first
+        chunk arrived. Chunks are forwarded to ``on_chunk`` when given.
+        """
+        assert process.stdout is not None and process.stderr is not None
+        stderr_task = asyncio.ensure_future(process.stderr.read())
+        tasks: list[asyncio.Future[Any]] = [stderr_task]
+        if stdin_data is not None:
+            tasks.append(asyncio.ensure_future(self._write_stdin(process, stdin_data)))
+
+        parts: list[str] = []
+        first_chunk_at = None
+        try:
+            async for text in iter_stream(process.stdout):
+                if first_chunk_at is None:
+                    first_chunk_at = time.time()
+                parts.append(text)
+                if on_chunk is not None:
+                    await on_chunk(text)
+            stderr = await stderr_task
+            await process.wait()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        return parts, stderr, first_chunk_at
+
+    async def _write_stdin(
+        self, process: asyncio.subprocess.Process, data: bytes
+    ) -> None:
+        """Write ``data`` to the process's stdin in chunks and close it"""
+        assert process.stdin is not None
+        try:
+            for offset in range(0, len(data), STDIN_CHUNK_SIZE):
+                process.stdin.write(data[offset : offset + STDIN_CHUNK_SIZE])
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # The CLI exited early; its exit status explains why
+            pass
+        finally:
+            process.stdin.close()
+
+
+class HTTPBackend:
+    """Call the Gemini API's streamGenerateContent endpoint directly
+
+    Requests share one pooled httpx client, so connections are kept alive
+    between consultations instead of paying process startup and a TLS
+    handshake on every call. HTTP/2 is negotiated when the optional ``h2``
+    package is installed. Responses are read as server-sent events and
+    forwarded chunk by chunk. The ``spawn`` span covers sending the request
+    until the response headers arrive.
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_API_BASE_URL,
+        api_key: str | None = None,
+        max_connections: int = 10,
+        http2: bool = True,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.http2 = http2 and _h2_available()
+        self._client: httpx.AsyncClient | None = None
+
+        # Statistics
+        self.requests = 0
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "HTTPBackend":
+        """Build an HTTP backend from integration config keys"""
+        cli_command = config.get("cli_command", "")
+        base_url = config.get("api_base_url") or (
+            cli_command
+            if cli_command.startswith(("http://", "https://"))
+            else DEFAULT_API_BASE_URL
+        )
+        return cls(
+            base_url=base_url,
+            api_key=config.get("api_key"),
+            max_connections=config.get("http_max_connections", 10),
+            http2=config.get("http2", True),
+        )
+
+    def _ensure_client(self) -> "httpx.AsyncClient":
+        """The pooled client, created on first use"""
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                # Overall time is bounded by the caller's timeout
+                timeout=httpx.Timeout(None, connect=10.0),
+            )
+        return self._client
+
+    async def start(self) -> None:
+        """Create the connection pool"""
+        self._ensure_client()
+
+    async def close(self) -> None:
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def execute(
+        self,
+        query: str,
+        model: str,
+        timeout: float,
+        on_chunk: ChunkCallback | None = None,
+    ) -> dict[str, Any]:
+        """Send ``query`` to the API and return the generated text"""
+        import httpx
+
+        start_time = time.time()
+        self.requests += 1
+        try:
+            connected_at, parts, first_chunk_at = await asyncio.wait_for(
+                self._stream(query, model, on_chunk), timeout=timeout
+            )
+        except asyncio.TimeoutError as e:
+            raise GeminiCLIError(
+                f"Gemini API timed out after {timeout:g} seconds",
+                kind="timeout",
+                retryable=True,
+            ) from e
+        except httpx.TransportError as e:
+            raise GeminiCLIError(
+                f"Gemini API request failed: {e!r}", kind="network", retryable=True
+            ) from e
+        completed_at = time.time()
+
+        return {
+            "output": "".join(parts).strip(),
+            "execution_time": completed_at - start_time,
+            "spawn_time": connected_at - start_time,
+            "first_chunk_time": (
+                None if first_chunk_at is None else first_chunk_at - start_time
+            ),
+            "spans": _spans(start_time, connected_at, first_chunk_at, completed_at),
+        }
+
+    async def _stream(
+        self, query: str, model: str, on_chunk: ChunkCallback | None
+    ) -> tuple[float, list[str], float | None]:
+        """Stream one response; returns header time, text parts, first chunk time"""
+        headers = {"Accept": "text/event-stream"}
+        if self.api_key:
+            headers["x-goog-api-key"] = self.api_key
+        body = {"contents": [{"role": "user", "parts": [{"text": query}]}]}
+
+        async with self._ensure_client().stream(
+            "POST",
+            f"/v1beta/models/{model}:streamGenerateContent",
+            params={"alt": "sse"},
+            headers=headers,
+            json=body,
+        ) as response:
+            connected_at = time.time()
+            if response.status_code != 200:
+                error = (await response.aread()).decode(errors="replace")
+                message = f"HTTP {response.status_code}: {error}"
+                kind, retryable = classify_error(None, message)
+                if kind == "auth":
+                    message += "\nTip: Check the configured Gemini API key"
+                raise GeminiCLIError(
+                    f"Gemini API failed: {message}", kind=kind, retryable=retryable
+                )
+
+            parts: list[str] = []
+            first_chunk_at = None
+            async for text in _iter_events(response.aiter_lines()):
+                if first_chunk_at is None:
+                    first_chunk_at = time.time()
+                parts.append(text)
+                if on_chunk is not None:
+                    await on_chunk(text)
+        return connected_at, parts, first_chunk_at
+
+
+async def _iter_events(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Yield the generated text of each server-sent event"""
+    async for line in lines:
+        if not line.startswith("data:"):
+            continue
+        try:
+            event = json.loads(line[5:])
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring malformed Gemini API event: {line[:200]}")
+            continue
+        for candidate in event.get("candidates", [])[:1]:
+            text = "".join(
+                part.get("text", "")
+                for part in candidate.get("content", {}).get("parts", [])
+            )
+            if text:
+                yield text
+
+
+def _h2_available() -> bool:
+    """Whether httpx can negotiate HTTP/2"""
+    return importlib.util.find_spec("h2") is not None
@@ -0,0 +1,145 @@
+"""
+Response Cache Module
+Two-tier (memory LRU + optional disk) cache for Gemini consultation responses
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(prepared_query: str, model: str, comparison_mode: bool) -> str:
+    """Build a stable cache key for a prepared query"""
+    digest = hashlib.sha256()
+    digest.update(model.encode())
+    digest.update(b"\0")
+    digest.update(b"1" if comparison_mode else b"0")
+    digest.update(b"\0")
+    digest.update(prepared_query.encode())
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """LRU/TTL cache with an optional on-disk tier
+
+    The memory tier holds at most ``max_entries`` responses. When ``cache_dir``
+    is set, responses are also written there as one JSON file per key so they
+    survive restarts; that tier is trimmed to ``max_disk_entries`` files.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 3600.0,
+        cache_dir: str | Path | None = None,
+        max_disk_entries: int = 1024,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return a cached response, or None on a miss or expiry"""
+        entry = self._entries.get(key)
+        if entry is not None and not self._expired(entry[0]):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+
+        disk_entry = self._read_disk(key)
+        if disk_entry is not None:
+            self._store_memory(key, *disk_entry)
+            self.hits += 1
+            return disk_entry[1]
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        """Store a response in every enabled tier"""
+        created = time.time()
+        self._store_memory(key, created, value)
+        self._write_disk(key, created, value)
+
+    def clear(self) -> None:
+        """Drop all cached responses from every tier"""
+        self._entries.clear()
+        if self.cache_dir and self.cache_dir.is_dir():
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl > 0 and time.time() - created > self.ttl
+
+    def _store_memory(self, key: str, created: float, value: dict[str, Any]) -> None:
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path | None:
+        return self.cache_dir / f"{key}.json" if self.cache_dir else None
+
+    def _read_disk(self, key: str) -> tuple[float, dict[str, Any]] | None:
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            created = float(data["created"])
+            value = data["value"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        if self._expired(created):
+            path.unlink(missing_ok=True)
+            return None
+        return created, value
+
+    def _write_disk(self, key: str, created: float, value: dict[str, Any]) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"created": created, "value": value}, f)
+            os.replace(tmp_path, path)
+            self._trim_disk()
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {path}: {e}")
+
+    def _trim_disk(self) -> None:
+        assert self.cache_dir is not None
+        files = list(self.cache_dir.glob("*.json"))
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[: len(files) - self.max_disk_entries]:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,154 @@
+"""
+Circuit Breaker Module
+Fails consultations fast while the Gemini backend is failing
+"""
+
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Gemini while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker around Gemini CLI executions
+
+    The circuit opens after ``failure_threshold`` consecutive failures, or
+    when at least ``error_rate`` of the last ``window`` calls failed (once
+    ``min_calls`` have been seen). While open, calls are rejected at once with
+    the last error. After ``reset_timeout`` seconds a single probe call is let
+    through: its success closes the circuit, its failure opens it again.
+    A ``failure_threshold`` of zero disables the breaker.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        error_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0,
+    ):
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.consecutive_failures = 0
+        self.last_error: str | None = None
+
+        # Statistics
+        self.opened = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "CircuitBreaker":
+        """Build a breaker from integration config keys"""
+        return cls(
+            failure_threshold=config.get("circuit_failure_threshold", 5),
+            error_rate=config.get("circuit_error_rate", 0.5),
+            window=config.get("circuit_window", 20),
+            min_calls=config.get("circuit_min_calls", 10),
+            reset_timeout=config.get("circuit_reset_timeout", 30.0),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the breaker can open at all"""
+        return self.failure_threshold > 0
+
+    @property
+    def state(self) -> str:
+        """Current state; an expired open circuit reports half-open"""
+        if self._state == OPEN and self.retry_after() == 0:
+            return HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until a probe is allowed, 0 when not open"""
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if a call would be rejected right now"""
+        if not self.enabled:
+            return
+        if (self._state == OPEN and self.retry_after() > 0) or (
+            self._state == HALF_OPEN and self._probing
+        ):
+            self.rejected += 1
+            raise CircuitOpenError(self._rejection_message())
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Admit one call through the breaker and record its outcome
+
+        Raises CircuitOpenError when the call is rejected. An exception raised
+        inside the block counts as a failure; cancellation counts as neither.
+        """
+        self.check()
+        probe = False
+        if self.enabled and self._state != CLOSED:
+            self._state = HALF_OPEN
+            self._probing = probe = True
+        try:
+            yield
+        except Exception as e:
+            self._record(False, str(e))
+            raise
+        else:
+            self._record(True)
+        finally:
+            if probe:
+                self._probing = False
+
+    def _record(self, success: bool, error: str | None = None) -> None:
+        if not self.enabled:
+            return
+        self._outcomes.append(success)
+        if success:
+            self.consecutive_failures = 0
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._outcomes.clear()
+            return
+
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self._state == HALF_OPEN or (self._state == CLOSED and self._should_open()):
+            self._open()
+
+    def _should_open(self) -> bool:
+        if self.consecutive_failures >= self.failure_threshold:
+            return True
+        if len(self._outcomes) < self.min_calls:
+            return False
+        failures = self._outcomes.count(False)
+        return failures / len(self._outcomes) >= self.error_rate
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self.opened += 1
+
+    def _rejection_message(self) -> str:
+        message = "Gemini backend unavailable (circuit open"
+        retry_after = self.retry_after()
+        if retry_after > 0:
+            message += f", retrying in {retry_after:.0f}s"
+        message += ")"
+        if self.last_error:
+            message += f": {self.last_error}"
+        return message
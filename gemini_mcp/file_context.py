@@ -0,0 +1,254 @@
+"""
+File Context Module
+Incremental file ingestion and relevance-ranked packing of consultation context
+"""
+
+import hashlib
+import math
+import mmap
+import re
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any
+
+_TERM = re.compile(r"[a-z0-9]+")
+
+# BM25 term-frequency saturation and chunk-length normalization
+_K1 = 1.2
+_B = 0.75
+
+
+def terms(text: str) -> list[str]:
+    """Lowercased alphanumeric terms; identifiers are split at underscores"""
+    return _TERM.findall(text.lower())
+
+
+class _Chunk:
+    """A run of whole lines from a file and its term counts"""
+
+    __slots__ = ("start", "end", "text", "terms", "length")
+
+    def __init__(self, start: int, end: int, text: str):
+        self.start = start
+        self.end = end
+        self.text = text
+        words = terms(text)
+        self.terms = Counter(words)
+        self.length = len(words)
+
+
+class _File:
+    """What was last read from a path"""
+
+    __slots__ = ("mtime_ns", "size", "digest", "chunks")
+
+    def __init__(self, mtime_ns: int, size: int, digest: str, chunks: list[_Chunk]):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.chunks = chunks
+
+
+class FileContextIndex:
+    """Turn project files into consultation context that fits a budget
+
+    Files are memory-mapped and split into chunks of ``chunk_lines`` lines.
+    A file whose size and modification time are unchanged since the last
+    call is not read again, and one whose content hash is unchanged is not
+    split again; chunks are shared by content hash, so copies of a file are
+    processed once. ``pack`` ranks the chunks of the requested files by BM25
+    relevance to the question and packs the best ones into the budget. At
+    most ``max_files`` files are remembered. ``pack`` may be called from
+    several threads; calls run one at a time.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        chunk_lines: int = 40,
+        max_file_bytes: int = 1024 * 1024,
+        max_files: int = 512,
+    ):
+        self.root = root.resolve()
+        self.chunk_lines = chunk_lines
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self._files: OrderedDict[Path, _File] = OrderedDict()
+        self._by_digest: OrderedDict[str, list[_Chunk]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.unchanged = 0
+        self.reads = 0
+        self.splits = 0
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any], root: Path) -> "FileContextIndex":
+        """Build an index from integration config keys"""
+        return cls(
+            root,
+            chunk_lines=config.get("file_chunk_lines", 40),
+            max_file_bytes=config.get("file_max_bytes", 1024 * 1024),
+            max_files=config.get("file_index_max_files", 512),
+        )
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def resolve(self, path: str) -> Path:
+        """Resolve ``path`` against the root, refusing anything outside it"""
+        resolved = (self.root / path).resolve()
+        if not resolved.is_relative_to(self.root):
+            raise ValueError(f"{path} is outside the project root")
+        if not resolved.is_file():
+            raise ValueError(f"{path} is not a file")
+        return resolved
+
+    def pack(
+        self, query: str, paths: list[str], budget: int
+    ) -> tuple[str, list[dict[str, Any]]]:
+        """Build context from the files most relevant to ``query``
+
+        Returns the context, at most ``budget`` characters, and one entry
+        per file with its ``path`` and the 1-based inclusive line ``ranges``
+        that were included (empty when none fit). Chunks that match no query
+        term fill any space left, in file order.
+        """
+        with self._lock:
+            return self._pack(query, paths, budget)
+
+    def _pack(
+        self, query: str, paths: list[str], budget: int
+    ) -> tuple[str, list[dict[str, Any]]]:
+        files: list[tuple[str, list[_Chunk]]] = []
+        for path in dict.fromkeys(paths):
+            resolved = self.resolve(path)
+            files.append(
+                (resolved.relative_to(self.root).as_posix(), self._load(resolved))
+            )
+
+        candidates = [
+            (file_index, chunk)
+            for file_index, (_, chunks) in enumerate(files)
+            for chunk in chunks
+        ]
+        scores = self._scores(query, [chunk for _, chunk in candidates])
+        order = sorted(
+            range(len(candidates)),
+            key=lambda i: (-scores[i], candidates[i][0], candidates[i][1].start),
+        )
+
+        chosen: list[list[_Chunk]] = [[] for _ in files]
+        remaining = budget
+        for i in order:
+            file_index, chunk = candidates[i]
+            cost = len(self._header(files[file_index][0], chunk.start, chunk.end))
+            cost += len(chunk.text) + 1
+            if cost <= remaining:
+                chosen[file_index].append(chunk)
+                remaining -= cost
+
+        sections: list[str] = []
+        included: list[dict[str, Any]] = []
+        for (name, _), selected in zip(files, chosen, strict=True):
+            ranges: list[list[int]] = []
+            texts: list[list[str]] = []
+            for chunk in sorted(selected, key=lambda chunk: chunk.start):
+                if ranges and ranges[-1][1] + 1 == chunk.start:
+                    ranges[-1][1] = chunk.end
+                    texts[-1].append(chunk.text)
+                else:
+                    ranges.append([chunk.start, chunk.end])
+                    texts.append([chunk.text])
+            for (start, end), parts in zip(ranges, texts, strict=True):
+                sections.append(self._header(name, start, end) + "".join(parts))
+            included.append({"path": name, "ranges": ranges})
+        return "\n".join(sections), included
+
+    def _load(self, path: Path) -> list[_Chunk]:
+        """Chunks of ``path``, reading and splitting it only when it changed"""
+        stat = path.stat()
+        entry = self._files.get(path)
+        if entry is not None and (entry.mtime_ns, entry.size) == (
+            stat.st_mtime_ns,
+            stat.st_size,
+        ):
+            self._files.move_to_end(path)
+            self.unchanged += 1
+            return entry.chunks
+        if stat.st_size > self.max_file_bytes:
+            raise ValueError(
+                f"{path.relative_to(self.root)} is larger than "
+                f"{self.max_file_bytes} bytes"
+            )
+
+        self.reads += 1
+        with open(path, "rb") as f:
+            if stat.st_size == 0:
+                digest, chunks = hashlib.blake2b(b"").hexdigest(), []
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if mapped.find(b"\0", 0, 8192) != -1:
+                        raise ValueError(
+                            f"{path.relative_to(self.root)} is a binary file"
+                        )
+                    digest = hashlib.blake2b(mapped).hexdigest()
+                    cached = self._by_digest.get(digest)
+                    if cached is None:
+                        chunks = self._split(
+                            mapped[:].decode("utf-8", errors="replace")
+                        )
+                    else:
+                        chunks = cached
+
+        self._by_digest[digest] = chunks
+        self._by_digest.move_to_end(digest)
+        self._files[path] = _File(stat.st_mtime_ns, stat.st_size, digest, chunks)
+        self._files.move_to_end(path)
+        while len(self._files) > self.max_files:
+            self._files.popitem(last=False)
+        while len(self._by_digest) > self.max_files:
+            self._by_digest.popitem(last=False)
+        return chunks
+
+    def _split(self, text: str) -> list[_Chunk]:
+        """Split text into chunks of whole lines"""
+        self.splits += 1
+        lines = text.splitlines(keepends=True)
+        if lines and not lines[-1].endswith("\n"):
+            lines[-1] += "\n"
+        return [
+            _Chunk(
+                start + 1,
+                min(start + self.chunk_lines, len(lines)),
+                "".join(lines[start : start + self.chunk_lines]),
+            )
+            for start in range(0, len(lines), self.chunk_lines)
+        ]
+
+    @staticmethod
+    def _scores(query: str, chunks: list[_Chunk]) -> list[float]:
+        """BM25 score of each chunk against the query terms"""
+        query_terms = set(terms(query))
+        if not chunks or not query_terms:
+            return [0.0] * len(chunks)
+        average = sum(chunk.length for chunk in chunks) / len(chunks) or 1.0
+        idf = {}
+        for term in query_terms:
+            df = sum(term in chunk.terms for chunk in chunks)
+            idf[term] = math.log(1 + (len(chunks) - df + 0.5) / (df + 0.5))
+        scores = []
+        for chunk in chunks:
+            norm = _K1 * (1 - _B + _B * chunk.length / average)
+            score = 0.0
+            for term in query_terms:
+                tf = chunk.terms.get(term, 0)
+                if tf:
+                    score += idf[term] * tf * (_K1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    @staticmethod
+    def _header(name: str, start: int, end: int) -> str:
+        return f"--- {name} (lines {start}-{end}) ---\n"
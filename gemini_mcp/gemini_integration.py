@@ -5,75 +5,154 @@ Provides automatic consultation with Gemini for second opinions and validation
 """
 
 import asyncio
+import itertools
+import json
 import logging
-import re
 import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
 from datetime import datetime
+from pathlib import Path
 from typing import Any
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# Uncertainty patterns that trigger automatic Gemini consultation
-UNCERTAINTY_PATTERNS = [
-    r"\bI'm not sure\b",
-    r"\bI think\b",
-    r"\bpossibly\b",
-    r"\bprobably\b",
-    r"\bmight be\b",
-    r"\bcould be\b",
-    r"\bI believe\b",
-    r"\bIt seems\b",
-    r"\bappears to be\b",
-    r"\buncertain\b",
-    r"\bI would guess\b",
-    r"\blikely\b",
-    r"\bperhaps\b",
-    r"\bmaybe\b",
-    r"\bI assume\b",
-]
+from .auto_consult import AutoConsultPolicy
+from .backends import Backend, CLIBackend, make_backend
+from .cache import ResponseCache, make_cache_key
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .hedging import HedgePolicy
+from .journal import ConsultationJournal
+from .metrics import ConsultationMetrics, MetricsExporter
+from .process import ProcessSupervisor
+from .rate_limiter import FairShare, QueueDeadlineError, RateLimiter
+from .retry import GeminiCLIError, RetryPolicy
+from .similarity import SimilarityIndex
+from .singleflight import SingleFlight
+from .stats import ConsultationLog, ConsultationRecord, ConsultationStats
+from .streaming import ChunkBroadcast, ChunkCallback
+from .tracing import Span, SpanHook, emit_spans, phase_durations
+from .uncertainty import (
+    COMPLEX_DECISION_PATTERNS,
+    CRITICAL_OPERATION_PATTERNS,
+    UNCERTAINTY_PATTERNS,
+    UncertaintyScanner,
+    default_matcher,
+)
+from .worker_pool import WarmWorkerPool
 
-# Complex decision patterns that benefit from second opinions
-COMPLEX_DECISION_PATTERNS = [
-    r"\bmultiple approaches\b",
-    r"\bseveral options\b",
-    r"\btrade-offs?\b",
-    r"\bconsider(?:ing)?\b",
-    r"\balternatives?\b",
-    r"\bpros and cons\b",
-    r"\bweigh(?:ing)? the options\b",
-    r"\bchoice between\b",
-    r"\bdecision\b",
-]
+logger = logging.getLogger(__name__)
 
-# Critical operations that should trigger consultation
-CRITICAL_OPERATION_PATTERNS = [
-    r"\bproduction\b",
-    r"\bdatabase migration\b",
-    r"\bsecurity\b",
-    r"\bauthentication\b",
-    r"\bencryption\b",
-    r"\bAPI key\b",
-    r"\bcredentials?\b",
-    r"\bperformance\s+critical\b",
+# Question asked when assistant text triggers an automatic consultation
+AUTO_CONSULT_QUERY = (
+    "An AI assistant wrote the response below and sounded unsure or was making "
+    "a consequential decision. Review it: point out mistakes, risks and better "
+    "alternatives, and say whether you agree with its conclusion."
+)
+
+__all__ = [
+    "COMPLEX_DECISION_PATTERNS",
+    "CRITICAL_OPERATION_PATTERNS",
+    "UNCERTAINTY_PATTERNS",
+    "GeminiIntegration",
+    "IntegrationRegistry",
+    "get_integration",
+    "get_registry",
 ]
 
 
 class GeminiIntegration:
     """Handles Gemini CLI integration for second opinions and validation"""
 
-    def __init__(self, config: dict[str, Any] | None = None):
+    def __init__(
+        self,
+        config: dict[str, Any] | None = None,
+        shared_concurrency: FairShare | None = None,
+        tenant: str = "",
+        metrics: ConsultationMetrics | None = None,
+        metrics_exporter: MetricsExporter | None = None,
+    ):
         self.config = config or {}
+        self.project = tenant or "default"
         self.enabled = self.config.get("enabled", True)
         self.auto_consult = self.config.get("auto_consult", True)
+        self.auto_consult_policy = AutoConsultPolicy.from_config(self.config)
+        # Finished background consultations by ticket, with their owner
+        self.auto_consult_results: OrderedDict[str, tuple[str, dict[str, Any]]] = (
+            OrderedDict()
+        )
+        self.max_auto_consult_results = self.config.get("auto_consult_results", 100)
+        self._auto_consult_tickets = itertools.count(1)
+        self._auto_consult_tasks: set[asyncio.Task[None]] = set()
         self.cli_command = self.config.get("cli_command", "gemini")
         self.timeout = self.config.get("timeout", 60)
-        self.rate_limit_delay = self.config.get("rate_limit_delay", 2.0)
-        self.last_consultation: float = 0
-        self.consultation_log: list[dict[str, Any]] = []
+        self.request_deadline = self.config.get("request_deadline", self.timeout)
+        self.retry_policy = RetryPolicy.from_config(self.config)
+        self.rate_limiter = RateLimiter.from_config(
+            self.config, shared=shared_concurrency, tenant=tenant
+        )
+        self.consultation_log = ConsultationLog(self.config.get("log_capacity", 1000))
+        self.stats = ConsultationStats()
+        self.journal: ConsultationJournal | None = None
+        if self.config.get("journal_dir"):
+            self.journal = ConsultationJournal(
+                self.config["journal_dir"],
+                max_bytes=self.config.get("journal_max_bytes", 8 * 1024 * 1024),
+                max_files=self.config.get("journal_max_files", 10),
+            )
+        self._consultation_ids = itertools.count(1)
         self.max_context_length = self.config.get("max_context_length", 4000)
         self.model = self.config.get("model", "gemini-2.5-flash")
+        self.cache_enabled = self.config.get("cache_enabled", True)
+        self.cache = ResponseCache(
+            max_entries=self.config.get("cache_max_entries", 256),
+            ttl=self.config.get("cache_ttl", 3600),
+            cache_dir=self.config.get("cache_dir"),
+            max_disk_entries=self.config.get("cache_max_disk_entries", 1024),
+        )
+        self.similarity: SimilarityIndex | None = None
+        if self.config.get("similarity_enabled", False):
+            self.similarity = SimilarityIndex.from_config(self.config)
+        self.inflight: SingleFlight[dict[str, Any]] = SingleFlight()
+        self.breaker = CircuitBreaker.from_config(self.config)
+        self.hedge_enabled = self.config.get("hedge_enabled", False)
+        self.hedging = HedgePolicy.from_config(self.config)
+        self._broadcasts: dict[str, ChunkBroadcast] = {}
+        self.processes = ProcessSupervisor.from_config(self.config)
+        self.backend: Backend = make_backend(self.config, self.processes)
+        self.worker_pool: WarmWorkerPool | None = None
+        if isinstance(self.backend, CLIBackend):
+            self.worker_pool = self.backend.worker_pool
+        self.span_hooks: list[SpanHook] = []
+        # Shared with other projects' integrations when given
+        self.metrics = metrics or ConsultationMetrics()
+        self._register_gauges()
+        self.metrics_exporter = metrics_exporter
+        self._owns_exporter = False
+        if metrics_exporter is None and (
+            self.config.get("metrics_port") is not None
+            or self.config.get("metrics_textfile")
+        ):
+            self.metrics_exporter = MetricsExporter.from_config(
+                self.config, self.metrics.registry
+            )
+            self._owns_exporter = True
+
+    def add_span_hook(self, hook: SpanHook) -> None:
+        """Forward the phase spans of every finished consultation to ``hook``"""
+        self.span_hooks.append(hook)
+
+    def _register_gauges(self) -> None:
+        """Expose component state as metrics read at scrape time"""
+        self.metrics.track(
+            self.project,
+            queue_depth=lambda: self.rate_limiter.waiting,
+            active_consultations=lambda: self.rate_limiter.active,
+            queue_expired=lambda: self.rate_limiter.expired,
+            cli_processes=lambda: self.processes.live,
+            circuit_open=lambda: self.breaker.state == "open",
+            cache_hits=lambda: self.cache.hits,
+            coalesced_calls=lambda: self.inflight.coalesced,
+            similar_reuses=lambda: self.similarity.reused if self.similarity else 0,
+        )
 
     async def consult_gemini(
         self,
@@ -81,82 +160,535 @@ class GeminiIntegration:
         context: str = "",
         comparison_mode: bool = True,
         force_consult: bool = False,
+        use_cache: bool = True,
+        on_chunk: ChunkCallback | None = None,
+        priority: str = "normal",
     ) -> dict[str, Any]:
-        """Consult Gemini CLI for second opinion"""
+        """Consult Gemini CLI for second opinion
+
+        Responses are served from the cache when an identical prepared query
+        was answered before, or, with ``similarity_enabled``, when a question
+        and context similar enough to this one were; such answers are marked
+        ``reused`` with their ``similarity`` score. ``force_consult`` or
+        ``use_cache=False`` skip both.
+        Identical queries that are already running share that execution.
+        When ``on_chunk`` is given the CLI output is streamed to it as it
+        arrives; the full response is still returned at the end.
+        ``priority`` ("interactive", "normal" or "background") is the class
+        the consultation queues in for admission.
+        """
         if not self.enabled:
             return {"status": "disabled", "message": "Gemini integration is disabled"}
 
-        if not force_consult:
-            await self._enforce_rate_limit()
-
-        consultation_id = f"consult_{int(time.time())}"
+        consultation_id = f"consult_{int(time.time())}_{next(self._consultation_ids)}"
+
+        # Prepare query with context
+        prepared_at = time.time()
+        full_query = self._prepare_query(query, context, comparison_mode)
+        cache_key = make_cache_key(full_query, self.model or "", comparison_mode)
+        prepare_span = Span.since("prepare", prepared_at)
+
+        if self.cache_enabled and use_cache and not force_consult:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if on_chunk is not None:
+                    await on_chunk(cached["response"])
+                spans = [prepare_span]
+                self._record_consultation(
+                    consultation_id, query, "cached", {"spans": spans}
+                )
+                return {
+                    "status": "success",
+                    "response": cached["response"],
+                    "execution_time": cached["execution_time"],
+                    "phases": phase_durations(spans),
+                    "consultation_id": consultation_id,
+                    "timestamp": datetime.now().isoformat(),
+                    "cached": True,
+                }
+
+        if self.similarity is not None and use_cache and not force_consult:
+            match = self.similarity.find(
+                query, context, self.model or "", comparison_mode
+            )
+            if match is not None:
+                reused, score = match
+                if on_chunk is not None:
+                    await on_chunk(reused["response"])
+                spans = [prepare_span]
+                self._record_consultation(
+                    consultation_id, query, "cached", {"spans": spans}
+                )
+                return {
+                    "status": "success",
+                    "response": reused["response"],
+                    "execution_time": reused["execution_time"],
+                    "phases": phase_durations(spans),
+                    "consultation_id": consultation_id,
+                    "timestamp": datetime.now().isoformat(),
+                    "cached": True,
+                    "reused": True,
+                    "reused_from": reused["consultation_id"],
+                    "similarity": round(score, 3),
+                }
+
+        delivered = False
+
+        async def forward(chunk: str) -> None:
+            nonlocal delivered
+            delivered = True
+            assert on_chunk is not None
+            await on_chunk(chunk)
+
+        broadcast = None
+        if on_chunk is not None:
+            broadcast = self._broadcasts.setdefault(cache_key, ChunkBroadcast())
+            await broadcast.subscribe(forward)
 
         try:
-            # Prepare query with context
-            full_query = self._prepare_query(query, context, comparison_mode)
+            # Execute Gemini CLI command, joining an identical running call
+            try:
+                result, coalesced = await self.inflight.do(
+                    cache_key,
+                    lambda: self._run_consultation(
+                        full_query, cache_key, force_consult, priority
+                    ),
+                )
+            finally:
+                if broadcast is not None:
+                    broadcast.unsubscribe(forward)
 
-            # Execute Gemini CLI command
-            result = await self._execute_gemini_cli(full_query)
+            # Joined a call that was not streaming; hand over the whole text
+            if on_chunk is not None and not delivered:
+                await on_chunk(result["output"])
 
             # Log consultation
-            if self.config.get("log_consultations", True):
-                self.consultation_log.append(
+            spans = [prepare_span, *result.get("spans", [])]
+            self._record_consultation(
+                consultation_id, query, "success", {**result, "spans": spans}
+            )
+            if self.similarity is not None and not coalesced:
+                self.similarity.add(
+                    query,
+                    context,
+                    self.model or "",
+                    comparison_mode,
                     {
-                        "id": consultation_id,
-                        "timestamp": datetime.now().isoformat(),
-                        "query": query[:200] + "..." if len(query) > 200 else query,
-                        "status": "success",
-                        "execution_time": result.get("execution_time", 0),
-                    }
+                        "response": result["output"],
+                        "execution_time": result["execution_time"],
+                        "consultation_id": consultation_id,
+                    },
                 )
 
             return {
                 "status": "success",
                 "response": result["output"],
                 "execution_time": result["execution_time"],
+                "queue_wait": result["queue_wait"],
+                "spawn_time": result.get("spawn_time", 0.0),
+                "first_chunk_time": result.get("first_chunk_time"),
+                "prompt_delivery": result.get("prompt_delivery", "argv"),
+                "hedged": result.get("hedged", False),
+                "retries": result.get("retries", 0),
+                "phases": phase_durations(spans),
                 "consultation_id": consultation_id,
                 "timestamp": datetime.now().isoformat(),
+                "cached": False,
+                "coalesced": coalesced,
+            }
+
+        except CircuitOpenError as e:
+            logger.warning(f"Rejected Gemini consultation: {str(e)}")
+            self._record_consultation(consultation_id, query, "rejected")
+            return {
+                "status": "error",
+                "error": str(e),
+                "circuit_open": True,
+                "consultation_id": consultation_id,
+            }
+
+        except QueueDeadlineError as e:
+            logger.warning(f"Dropped expired Gemini consultation: {str(e)}")
+            self._record_consultation(consultation_id, query, "rejected")
+            return {
+                "status": "error",
+                "error": str(e),
+                "expired": True,
+                "consultation_id": consultation_id,
             }
 
         except Exception as e:
             logger.error(f"Error consulting Gemini: {str(e)}")
+            self._record_consultation(consultation_id, query, "error")
             return {
                 "status": "error",
                 "error": str(e),
                 "consultation_id": consultation_id,
             }
 
-    def detect_uncertainty(self, text: str) -> tuple[bool, list[str]]:
-        """Detect if text contains uncertainty patterns"""
-        found_patterns = []
+    def _record_consultation(
+        self,
+        consultation_id: str,
+        query: str,
+        status: str,
+        result: dict[str, Any] | None = None,
+    ) -> None:
+        """Update statistics, metrics, span hooks and the consultation log"""
+        result = result or {}
+        execution_time = result.get("execution_time")
+        spans = result.get("spans", [])
+        if spans and self.span_hooks:
+            emit_spans(self.span_hooks, consultation_id, spans)
+        self.stats.record(status, execution_time)
+        self.metrics.consultations.inc(
+            project=self.project, status=status, model=self.model
+        )
+        if status == "success" and execution_time is not None:
+            self.metrics.duration.observe(
+                execution_time, project=self.project, model=self.model
+            )
+            self.metrics.response_bytes.observe(
+                len(result["output"].encode()), project=self.project
+            )
+
+        if self.config.get("log_consultations", True):
+            record = ConsultationRecord(
+                id=consultation_id,
+                query=query,
+                status=status,
+                execution_time=execution_time or 0.0,
+                spawn_time=result.get("spawn_time", 0.0),
+                warm_worker=result.get("warm_worker", False),
+                first_chunk_time=result.get("first_chunk_time"),
+                phases=phase_durations(spans) if spans else None,
+            )
+            self.consultation_log.append(record)
+            if self.journal is not None:
+                self.journal.append(record.to_dict(), record.timestamp, status)
+
+    async def _run_consultation(
+        self,
+        full_query: str,
+        cache_key: str,
+        force_consult: bool,
+        priority: str = "normal",
+    ) -> dict[str, Any]:
+        """Rate-limit, execute and cache a single consultation
+
+        Output is streamed when a caller subscribed to this query's chunks.
+        While the circuit breaker is open the call fails before queueing, and
+        a call still queued when ``request_deadline`` passes is dropped.
+        Retryable failures are retried with backoff until ``request_deadline``
+        runs out; each retry is admitted by the rate limiter again. Once output
+        has been streamed to a client the call is no longer retried.
+        """
+        broadcast = self._broadcasts.get(cache_key)
+        deadline = time.monotonic() + self.request_deadline
+        queue_wait = 0.0
+        queue_spans: list[Span] = []
+        retries = 0
+        self.metrics.prompt_bytes.observe(
+            len(full_query.encode()), project=self.project
+        )
+        try:
+            while True:
+                self.breaker.check()
+                try:
+                    queued_at = time.time()
+                    async with self.rate_limiter.acquire(
+                        use_token=not force_consult or retries > 0,
+                        priority=priority,
+                        deadline=deadline,
+                    ) as wait:
+                        queue_wait += wait
+                        queue_spans.append(Span("queue_wait", queued_at, wait))
+                        self.metrics.queue_wait.observe(wait, project=self.project)
+                        with self.breaker.guard():
+                            result = await self._execute_hedged(
+                                full_query,
+                                on_chunk=broadcast.publish if broadcast else None,
+                                deadline=deadline,
+                            )
+                    break
+                except GeminiCLIError as e:
+                    delay = self.retry_policy.backoff(retries)
+                    if (
+                        not e.retryable
+                        or retries >= self.retry_policy.max_retries
+                        or (broadcast is not None and broadcast.chunks)
+                        or time.monotonic() + delay >= deadline
+                    ):
+                        raise
+                    retries += 1
+                    self.stats.retries += 1
+                    self.metrics.retries.inc(project=self.project, kind=e.kind)
+                    logger.warning(
+                        f"Retrying Gemini CLI after {e.kind} error in {delay:.1f}s "
+                        f"(retry {retries}/{self.retry_policy.max_retries})"
+                    )
+                    await asyncio.sleep(delay)
+        finally:
+            self._broadcasts.pop(cache_key, None)
+        result["queue_wait"] = queue_wait
+        result["retries"] = retries
+        result["spans"] = queue_spans + result.get("spans", [])
+
+        if self.cache_enabled:
+            self.cache.set(
+                cache_key,
+                {
+                    "response": result["output"],
+                    "execution_time": result["execution_time"],
+                },
+            )
+        return result
+
+    async def _execute_hedged(
+        self,
+        query: str,
+        on_chunk: ChunkCallback | None = None,
+        deadline: float | None = None,
+    ) -> dict[str, Any]:
+        """Execute a query, starting a backup attempt if the first one stalls
+
+        When hedging is enabled and the primary attempt has not finished after
+        the policy's adaptive delay, a second attempt (optionally on
+        ``hedge_model``) is started and whichever succeeds first wins; the
+        other is cancelled. For streamed output the first attempt to produce a
+        chunk wins instead, so the client never sees two interleaved answers.
+        """
+        if not self.hedge_enabled:
+            return await self._execute_gemini_cli(
+                query, on_chunk=on_chunk, deadline=deadline
+            )
 
-        # Check uncertainty patterns
-        for pattern in UNCERTAINTY_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                found_patterns.append(f"uncertainty: {pattern}")
+        policy = self.hedging
+        policy.eligible += 1
+        attempts: list[asyncio.Future[dict[str, Any]]] = []
+        stream_owner: int | None = None
+
+        def gate(index: int) -> ChunkCallback | None:
+            if on_chunk is None:
+                return None
+
+            async def forward(chunk: str) -> None:
+                nonlocal stream_owner
+                if stream_owner is None:
+                    stream_owner = index
+                    for other, attempt in enumerate(attempts):
+                        if other != index:
+                            attempt.cancel()
+                if stream_owner == index:
+                    await on_chunk(chunk)
+
+            return forward
+
+        attempts.append(
+            asyncio.ensure_future(
+                self._execute_gemini_cli(query, on_chunk=gate(0), deadline=deadline)
+            )
+        )
+        # Whatever ends this call, no attempt may outlive it
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=policy.delay())
+            if done or stream_owner is not None or not policy.try_acquire():
+                result = await attempts[0]
+                policy.observe(result["execution_time"])
+                return result
+
+            logger.info("Primary Gemini CLI attempt is slow; starting a hedge")
+            attempts.append(
+                asyncio.ensure_future(
+                    self._execute_gemini_cli(
+                        query, on_chunk=gate(1), model=policy.model, deadline=deadline
+                    )
+                )
+            )
 
-        # Check complex decision patterns
-        for pattern in COMPLEX_DECISION_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                found_patterns.append(f"complex_decision: {pattern}")
+            pending: set[asyncio.Future[dict[str, Any]]] = set(attempts)
+            winner: asyncio.Future[dict[str, Any]] | None = None
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for attempt in done:
+                    if not attempt.cancelled() and attempt.exception() is None:
+                        winner = attempt
+                        break
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+        if winner is None:
+            # Both attempts failed; report the primary's error
+            if attempts[0].cancelled():
+                return await attempts[1]
+            return await attempts[0]
+
+        hedge_won = winner is attempts[1]
+        if hedge_won:
+            policy.wins += 1
+        else:
+            policy.losses += 1
+
+        result = winner.result()
+        policy.observe(result["execution_time"])
+        result["hedged"] = True
+        result["hedge_won"] = hedge_won
+        return result
+
+    async def consult_gemini_batch(
+        self,
+        items: list[dict[str, Any]],
+        force_consult: bool = False,
+        use_cache: bool = True,
+        priority: str = "normal",
+    ) -> list[dict[str, Any]]:
+        """Consult Gemini on several queries concurrently
+
+        Every item is a dict with ``query`` and optional ``context`` and
+        ``comparison_mode``. Items run under the usual rate and concurrency
+        limits at ``priority``; results come back in input order with
+        per-item status and elapsed time, and a failing item never fails the
+        batch.
+        """
+        max_batch_size = self.config.get("max_batch_size", 50)
+        if len(items) > max_batch_size:
+            raise ValueError(
+                f"Batch of {len(items)} queries exceeds max_batch_size ({max_batch_size})"
+            )
 
-        # Check critical operation patterns
-        for pattern in CRITICAL_OPERATION_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                found_patterns.append(f"critical_operation: {pattern}")
+        async def run_item(index: int, item: dict[str, Any]) -> dict[str, Any]:
+            start_time = time.time()
+            query = item.get("query", "")
+            if not query:
+                result: dict[str, Any] = {
+                    "status": "error",
+                    "error": "'query' is required",
+                }
+            else:
+                try:
+                    result = await self.consult_gemini(
+                        query,
+                        item.get("context", ""),
+                        item.get("comparison_mode", True),
+                        force_consult=force_consult,
+                        use_cache=use_cache,
+                        priority=priority,
+                    )
+                except Exception as e:
+                    result = {"status": "error", "error": str(e)}
+            result["index"] = index
+            result["elapsed"] = time.time() - start_time
+            return result
+
+        return list(
+            await asyncio.gather(
+                *(run_item(index, item) for index, item in enumerate(items))
+            )
+        )
 
-        return len(found_patterns) > 0, found_patterns
+    async def stream_gemini(
+        self,
+        query: str,
+        context: str = "",
+        comparison_mode: bool = True,
+        force_consult: bool = False,
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """Consult Gemini and yield the response as it is produced"""
+        chunks: asyncio.Queue[str | None] = asyncio.Queue()
+
+        async def on_chunk(chunk: str) -> None:
+            await chunks.put(chunk)
+
+        task = asyncio.ensure_future(
+            self.consult_gemini(
+                query,
+                context,
+                comparison_mode,
+                force_consult=force_consult,
+                use_cache=use_cache,
+                on_chunk=on_chunk,
+            )
+        )
+        task.add_done_callback(lambda _: chunks.put_nowait(None))
 
-    async def _enforce_rate_limit(self) -> None:
-        """Enforce rate limiting between consultations"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_consultation
+        try:
+            while (chunk := await chunks.get()) is not None:
+                yield chunk
+            result = task.result()
+            if result["status"] == "error":
+                raise Exception(result["error"])
+        finally:
+            if not task.done():
+                task.cancel()
 
-        if time_since_last < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last
-            await asyncio.sleep(sleep_time)
+    def detect_uncertainty(self, text: str) -> tuple[bool, list[str]]:
+        """Detect if text contains uncertainty patterns"""
+        found_patterns = default_matcher.detect(text)
+        return len(found_patterns) > 0, found_patterns
 
-        self.last_consultation = time.time()
+    async def auto_consult_text(
+        self, text: str, context: str = "", owner: str = ""
+    ) -> dict[str, Any]:
+        """Consult Gemini in the background when ``text`` is uncertain enough
+
+        The text is scored by the auto-consult policy; above its threshold,
+        and unless a near-duplicate triggered recently, a consultation starts
+        as a background task and this returns at once with the decision and
+        a ``ticket``. The finished consultation belongs to ``owner`` and is
+        collected with ``take_auto_consult_results`` by that owner or ticket.
+        """
+        if not self.enabled or not self.auto_consult:
+            return {"consult": False, "reason": "disabled"}
+
+        decision = self.auto_consult_policy.evaluate(text)
+        if decision["consult"]:
+            decision["ticket"] = f"auto_{next(self._auto_consult_tickets)}"
+            task = asyncio.ensure_future(
+                self._run_auto_consult(text, context, decision, owner)
+            )
+            self._auto_consult_tasks.add(task)
+            task.add_done_callback(self._auto_consult_tasks.discard)
+        return decision
+
+    def take_auto_consult_results(
+        self, owner: str = "", tickets: list[str] | None = None
+    ) -> list[dict[str, Any]]:
+        """Return and forget finished consultations of ``owner`` or ``tickets``"""
+        wanted = set(tickets or ())
+        taken = [
+            ticket
+            for ticket, (result_owner, _) in self.auto_consult_results.items()
+            if result_owner == owner or ticket in wanted
+        ]
+        return [self.auto_consult_results.pop(ticket)[1] for ticket in taken]
+
+    async def _run_auto_consult(
+        self, text: str, context: str, decision: dict[str, Any], owner: str
+    ) -> None:
+        full_context = f"{context}\n\nAssistant response:\n{text}" if context else text
+        result = await self.consult_gemini(
+            AUTO_CONSULT_QUERY, context=full_context, priority="background"
+        )
+        self.auto_consult_results[decision["ticket"]] = (
+            owner,
+            {
+                **result,
+                "ticket": decision["ticket"],
+                "score": decision["score"],
+                "patterns": decision["patterns"],
+                "excerpt": text[:200] + "..." if len(text) > 200 else text,
+            },
+        )
+        while len(self.auto_consult_results) > self.max_auto_consult_results:
+            self.auto_consult_results.popitem(last=False)
+
+    def uncertainty_scanner(self) -> UncertaintyScanner:
+        """Create a scanner that detects uncertainty in streamed text"""
+        return default_matcher.scanner()
 
     def _prepare_query(self, query: str, context: str, comparison_mode: bool) -> str:
         """Prepare the full query for Gemini CLI"""
@@ -190,58 +722,177 @@ class GeminiIntegration:
 
         return "\n".join(parts)
 
-    async def _execute_gemini_cli(self, query: str) -> dict[str, Any]:
-        """Execute Gemini CLI command and return results"""
-        start_time = time.time()
+    async def _execute_gemini_cli(
+        self,
+        query: str,
+        on_chunk: ChunkCallback | None = None,
+        model: str | None = None,
+        deadline: float | None = None,
+    ) -> dict[str, Any]:
+        """Execute a prepared query on the configured backend
+
+        The backend is given ``timeout`` seconds, or whatever is left until
+        the monotonic ``deadline`` if that is sooner, and runs ``model`` or
+        the configured one. Output is forwarded to ``on_chunk`` as it
+        arrives. Failures raise GeminiCLIError. The result carries spawn,
+        first byte, complete and decode spans.
+        """
+        timeout = self.timeout
+        if deadline is not None:
+            timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+        return await self.backend.execute(
+            query,
+            model=self.model if model is None else model,
+            timeout=timeout,
+            on_chunk=on_chunk,
+        )
+
+    async def start(self) -> None:
+        """Start background resources such as the warm worker pool"""
+        await self.backend.start()
+        if self.metrics_exporter is not None:
+            try:
+                await self.metrics_exporter.start()
+            except OSError as e:
+                logger.warning(f"Failed to start metrics exporter: {e}")
+
+    async def close(self) -> None:
+        """Release background resources and stop every live CLI process"""
+        for task in list(self._auto_consult_tasks):
+            task.cancel()
+        await asyncio.gather(*self._auto_consult_tasks, return_exceptions=True)
+        self.metrics.forget(self.project)
+        if self.metrics_exporter is not None and self._owns_exporter:
+            await self.metrics_exporter.close()
+        if self.journal is not None:
+            await self.journal.close()
+        await self.backend.close()
+        await self.processes.shutdown()
+
+
+class IntegrationRegistry:
+    """Integrations keyed by project root and configuration
+
+    Each project root and config gets its own integration, with its own rate
+    limit, cache, history and statistics, so one server process can serve
+    several repositories. Their consultations draw on a single concurrency
+    cap of ``max_concurrency`` that is shared fairly between project roots.
+    """
 
-        # Build command
-        cmd = [self.cli_command]
-        if self.model:
-            cmd.extend(["-m", self.model])
-        cmd.extend(["-p", query])  # Non-interactive mode
+    def __init__(self, max_concurrency: int = 8):
+        self.concurrency = FairShare(max_concurrency)
+        self._integrations: dict[tuple[str, str], GeminiIntegration] = {}
+        # Holders of each integration; it is closed when the last releases it
+        self._references: dict[tuple[str, str], int] = {}
+        # One registry and exporter for every project, told apart by label
+        self.metrics = ConsultationMetrics()
+        self.metrics_exporter: MetricsExporter | None = None
 
-        try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
+    def __len__(self) -> int:
+        return len(self._integrations)
 
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(), timeout=self.timeout
+    def get(
+        self,
+        config: dict[str, Any] | None = None,
+        project_root: str | Path | None = None,
+    ) -> GeminiIntegration:
+        """Return the integration for ``project_root`` and ``config``
+
+        The integration is created on first use; later calls with the same
+        root and an equal config return the same instance. Every call takes
+        a reference that ``release`` gives back.
+        """
+        root = str(Path(project_root).resolve()) if project_root else ""
+        key = (root, json.dumps(config or {}, sort_keys=True, default=str))
+        integration = self._integrations.get(key)
+        if integration is None:
+            settings = config or {}
+            if self.metrics_exporter is None and (
+                settings.get("metrics_port") is not None
+                or settings.get("metrics_textfile")
+            ):
+                self.metrics_exporter = MetricsExporter.from_config(
+                    settings, self.metrics.registry
+                )
+            integration = GeminiIntegration(
+                config,
+                shared_concurrency=self.concurrency,
+                tenant=root or "default",
+                metrics=self.metrics,
+                metrics_exporter=self.metrics_exporter,
             )
-
-            execution_time = time.time() - start_time
-
-            if process.returncode != 0:
-                error_msg = stderr.decode() if stderr else "Unknown error"
-                if "authentication" in error_msg.lower():
-                    error_msg += "\nTip: Run 'gemini' interactively to authenticate"
-                raise Exception(f"Gemini CLI failed: {error_msg}")
-
-            return {"output": stdout.decode().strip(), "execution_time": execution_time}
-
-        except asyncio.TimeoutError as e:
-            raise Exception(f"Gemini CLI timed out after {self.timeout} seconds") from e
-
-
-# Singleton pattern implementation
-_integration = None
-
-
-def get_integration(config: dict[str, Any] | None = None) -> GeminiIntegration:
+            self._integrations[key] = integration
+        self._references[key] = self._references.get(key, 0) + 1
+        return integration
+
+    def integrations(self) -> list[GeminiIntegration]:
+        """Every registered integration"""
+        return list(self._integrations.values())
+
+    async def release(self, integration: GeminiIntegration) -> None:
+        """Give back a reference taken by ``get``
+
+        The integration is closed and dropped from the registry once every
+        holder has released it.
+        """
+        for key, registered in list(self._integrations.items()):
+            if registered is integration:
+                self._references[key] -= 1
+                if self._references[key] > 0:
+                    return
+                del self._integrations[key]
+                del self._references[key]
+        await integration.close()
+        if not self._integrations:
+            await self._close_exporter()
+
+    async def close(self) -> None:
+        """Close and drop every integration"""
+        integrations = self.integrations()
+        self._integrations.clear()
+        self._references.clear()
+        for integration in integrations:
+            await integration.close()
+        await self._close_exporter()
+
+    def clear(self) -> None:
+        """Drop every integration and the shared metrics without closing them"""
+        self._integrations.clear()
+        self._references.clear()
+        self.metrics = ConsultationMetrics()
+        self.metrics_exporter = None
+
+    async def _close_exporter(self) -> None:
+        if self.metrics_exporter is not None:
+            await self.metrics_exporter.close()
+            self.metrics_exporter = None
+
+
+_registry = IntegrationRegistry()
+
+
+def get_registry() -> IntegrationRegistry:
+    """Return the process-wide integration registry"""
+    return _registry
+
+
+def get_integration(
+    config: dict[str, Any] | None = None,
+    project_root: str | Path | None = None,
+) -> GeminiIntegration:
     """
-    Get or create the global Gemini integration instance.
+    Get or create the Gemini integration for a project.
 
-    This ensures that all parts of the application share the same instance,
+    Callers with the same project root and configuration share one instance,
     maintaining consistent state for rate limiting, consultation history,
-    and configuration across all tool calls.
+    and caching across all tool calls; other projects get their own. Each
+    call takes a reference, given back with ``get_registry().release()``.
 
     Args:
-        config: Optional configuration dict. Only used on first call.
+        config: Optional configuration dict.
+        project_root: Optional project root the configuration belongs to.
 
     Returns:
-        The singleton GeminiIntegration instance
+        The GeminiIntegration registered for this project and config
     """
-    global _integration
-    if _integration is None:
-        _integration = GeminiIntegration(config)
-    return _integration
+    return _registry.get(config, project_root)
@@ -0,0 +1,74 @@
+"""
+Hedging Module
+Decides when to start a backup Gemini CLI attempt for a slow consultation
+"""
+
+from collections import deque
+from typing import Any
+
+
+class HedgePolicy:
+    """Adaptive hedge delay with a budget on extra attempts
+
+    The hedge delay is the ``quantile`` of the most recent ``window``
+    execution times (never below ``min_delay``); until ``min_samples`` times
+    have been observed ``initial_delay`` is used instead. At most
+    ``max_fraction`` of eligible consultations may start a hedge, so quota use
+    grows by that fraction at worst.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.9,
+        min_delay: float = 1.0,
+        initial_delay: float = 10.0,
+        max_fraction: float = 0.1,
+        window: int = 200,
+        min_samples: int = 20,
+        model: str | None = None,
+    ):
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.max_fraction = max_fraction
+        self.min_samples = min_samples
+        self.model = model
+        self._samples: deque[float] = deque(maxlen=window)
+
+        # Statistics
+        self.eligible = 0
+        self.launched = 0
+        self.wins = 0
+        self.losses = 0
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "HedgePolicy":
+        """Build a policy from integration config keys"""
+        return cls(
+            quantile=config.get("hedge_quantile", 0.9),
+            min_delay=config.get("hedge_min_delay", 1.0),
+            initial_delay=config.get("hedge_initial_delay", 10.0),
+            max_fraction=config.get("hedge_max_fraction", 0.1),
+            window=config.get("hedge_window", 200),
+            min_samples=config.get("hedge_min_samples", 20),
+            model=config.get("hedge_model"),
+        )
+
+    def observe(self, execution_time: float) -> None:
+        """Record the execution time of a finished attempt"""
+        self._samples.append(execution_time)
+
+    def delay(self) -> float:
+        """How long to wait for the primary attempt before hedging"""
+        if len(self._samples) < self.min_samples:
+            return max(self.min_delay, self.initial_delay)
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(self.quantile * (len(ordered) - 1) + 0.5))
+        return max(self.min_delay, ordered[index])
+
+    def try_acquire(self) -> bool:
+        """Reserve a hedge if the budget allows one"""
+        if self.launched + 1 > self.max_fraction * self.eligible:
+            return False
+        self.launched += 1
+        return True
@@ -0,0 +1,300 @@
+"""
+Consultation Journal Module
+Append-only on-disk history of consultations with a binary offset index
+"""
+
+import asyncio
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Index entry: timestamp, byte offset and length of the JSON line, status code
+INDEX_ENTRY = struct.Struct("<dQIB")
+STATUS_CODES = {"success": 0, "error": 1, "cached": 2, "rejected": 3}
+OTHER_STATUS = 255
+
+SEGMENT_PATTERN = re.compile(r"^journal-(\d{6})\.jsonl$")
+
+
+class _Segment:
+    """One rotated journal file and its index"""
+
+    def __init__(self, directory: Path, number: int):
+        self.number = number
+        self.data_path = directory / f"journal-{number:06d}.jsonl"
+        self.index_path = directory / f"journal-{number:06d}.idx"
+
+    def size(self) -> int:
+        try:
+            return self.data_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def delete(self) -> None:
+        for path in (self.data_path, self.index_path):
+            path.unlink(missing_ok=True)
+
+
+def _map(path: Path) -> mmap.mmap | None:
+    """Map a file read-only, or None when it is missing or empty"""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+
+class ConsultationJournal:
+    """Append-only JSONL journal of consultations
+
+    Records are buffered in memory and written in batches from a worker
+    thread, so appending never blocks the event loop. Each JSON line gets a
+    fixed-size entry in a binary index (timestamp, offset, length, status),
+    which lets queries binary-search a time range and filter by status
+    without parsing the journal; matching lines are then read through mmap.
+    Files rotate once they reach ``max_bytes`` and only the newest
+    ``max_files`` are kept.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = 8 * 1024 * 1024,
+        max_files: int = 10,
+        flush_interval: float = 1.0,
+        batch_size: int = 256,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_files = max(1, max_files)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        numbers = sorted(
+            int(match.group(1))
+            for path in self.directory.iterdir()
+            if (match := SEGMENT_PATTERN.match(path.name))
+        )
+        self._segments = [_Segment(self.directory, n) for n in numbers] or [
+            _Segment(self.directory, 1)
+        ]
+        self._pending: list[tuple[float, int, bytes]] = []
+        self._flusher: asyncio.Task[None] | None = None
+        self._write_lock = asyncio.Lock()
+        # Held by the worker thread itself, so cancelling a flush cannot free it
+        self._file_lock = threading.Lock()
+
+        # Statistics
+        self.written = 0
+        self.write_errors = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of records waiting to be written"""
+        return len(self._pending)
+
+    def append(self, record: dict[str, Any], timestamp: float, status: str) -> None:
+        """Queue a record for writing
+
+        Inside a running event loop the write happens in the background;
+        otherwise it is done immediately.
+        """
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        self._pending.append((timestamp, STATUS_CODES.get(status, OTHER_STATUS), line))
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_batch(self._take_pending())
+            return
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush_later())
+        elif len(self._pending) >= self.batch_size:
+            self._flusher.cancel()
+            self._flusher = asyncio.ensure_future(self.flush())
+
+    async def flush(self) -> None:
+        """Write every queued record
+
+        A flush cancelled while its batch is being written still waits for
+        the write to finish, so batches never overlap or reorder.
+        """
+        async with self._write_lock:
+            batch = self._take_pending()
+            if batch:
+                write = asyncio.ensure_future(
+                    asyncio.to_thread(self._write_batch, batch)
+                )
+                try:
+                    await asyncio.shield(write)
+                except asyncio.CancelledError:
+                    await write
+                    raise
+
+    async def close(self) -> None:
+        """Stop the background flusher and write what is left"""
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+        await self.flush()
+
+    async def query(
+        self,
+        since: float | None = None,
+        until: float | None = None,
+        status: str | None = None,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        """Newest-first page of records matching a time range and status"""
+        await self.flush()
+        return await asyncio.to_thread(self._query, since, until, status, offset, limit)
+
+    def _take_pending(self) -> list[tuple[float, int, bytes]]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    def _write_batch(self, batch: list[tuple[float, int, bytes]]) -> None:
+        """Append a batch to the current segment, rotating as needed"""
+        with self._file_lock:
+            self._write_segments(batch)
+
+    def _write_segments(self, batch: list[tuple[float, int, bytes]]) -> None:
+        try:
+            while batch:
+                segment = self._segments[-1]
+                offset = segment.size()
+                if offset >= self.max_bytes:
+                    self._rotate()
+                    continue
+
+                lines: list[bytes] = []
+                entries: list[bytes] = []
+                position = offset
+                taken = 0
+                while taken < len(batch) and (position < self.max_bytes or not lines):
+                    timestamp, code, line = batch[taken]
+                    lines.append(line)
+                    entries.append(
+                        INDEX_ENTRY.pack(timestamp, position, len(line), code)
+                    )
+                    position += len(line)
+                    taken += 1
+                del batch[:taken]
+
+                # Data first, so every index entry points at a complete line
+                with open(segment.data_path, "ab") as f:
+                    f.write(b"".join(lines))
+                with open(segment.index_path, "ab") as f:
+                    f.write(b"".join(entries))
+                self.written += len(lines)
+        except OSError as e:
+            self.write_errors += 1
+            logger.warning(f"Failed to write consultation journal: {e}")
+
+    def _rotate(self) -> None:
+        self._segments.append(_Segment(self.directory, self._segments[-1].number + 1))
+        while len(self._segments) > self.max_files:
+            self._segments.pop(0).delete()
+
+    def _query(
+        self,
+        since: float | None,
+        until: float | None,
+        status: str | None,
+        offset: int,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        code = None if status is None else STATUS_CODES.get(status, OTHER_STATUS)
+        matches: list[tuple[_Segment, int, int]] = []
+        skipped = 0
+        for segment in reversed(list(self._segments)):
+            for data_offset, length in self._matches(segment, since, until, code):
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                matches.append((segment, data_offset, length))
+                if len(matches) >= limit:
+                    return self._load(matches)
+        return self._load(matches)
+
+    def _matches(
+        self,
+        segment: _Segment,
+        since: float | None,
+        until: float | None,
+        code: int | None,
+    ) -> Iterator[tuple[int, int]]:
+        """Offsets and lengths of matching lines, newest first"""
+        index = _map(segment.index_path)
+        if index is None:
+            return
+        with index:
+            # Ignore a trailing entry that is still being written
+            count = len(index) // INDEX_ENTRY.size
+
+            def timestamp_at(position: int) -> float:
+                entry = INDEX_ENTRY.unpack_from(index, position * INDEX_ENTRY.size)
+                return float(entry[0])
+
+            # Records are appended in time order, so bisect the range
+            low, high = 0, count
+            if since is not None:
+                low = self._bisect(timestamp_at, count, since)
+            if until is not None:
+                high = self._bisect(timestamp_at, count, until, right=True)
+            for position in range(high - 1, low - 1, -1):
+                _, data_offset, length, entry_code = INDEX_ENTRY.unpack_from(
+                    index, position * INDEX_ENTRY.size
+                )
+                if code is None or entry_code == code:
+                    yield data_offset, length
+
+    @staticmethod
+    def _bisect(
+        timestamp_at: Callable[[int], float],
+        count: int,
+        value: float,
+        right: bool = False,
+    ) -> int:
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            current = timestamp_at(middle)
+            if current < value or (right and current == value):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    @staticmethod
+    def _load(matches: list[tuple[_Segment, int, int]]) -> list[dict[str, Any]]:
+        records: list[dict[str, Any]] = []
+        maps: dict[int, mmap.mmap | None] = {}
+        try:
+            for segment, offset, length in matches:
+                if segment.number not in maps:
+                    maps[segment.number] = _map(segment.data_path)
+                data = maps[segment.number]
+                if data is None or offset + length > len(data):
+                    continue
+                records.append(json.loads(data[offset : offset + length]))
+        finally:
+            for data in maps.values():
+                if data is not None:
+                    data.close()
+        return records
@@ -0,0 +1,473 @@
+"""
+Metrics Module
+Dependency-free metrics registry rendered in Prometheus/OpenMetrics format
+"""
+
+import asyncio
+import contextlib
+import logging
+import math
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+TEXT_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+WAIT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = tuple(256 * 4**power for power in range(10))  # 256 B .. 64 MiB
+
+Sample = tuple[str, dict[str, str], float]
+MetricT = TypeVar("MetricT", bound="_Metric")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric(ABC):
+    """Base class for a metric family with optional labels"""
+
+    kind = "unknown"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, key, strict=True))
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]:
+        """Every sample of the family as ``(name, labels, value)``"""
+
+
+class _TrackedMetric(_Metric):
+    """Metric whose series are set directly or read from callbacks
+
+    ``fn`` supplies the only series of an unlabelled metric; ``track`` adds
+    a callback for one labelled series, so several owners can share a family.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        fn: Callable[[], float] | None = None,
+    ):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._fns: dict[tuple[str, ...], Callable[[], float]] = {}
+        if fn is not None:
+            self._fns[()] = fn
+
+    def track(self, fn: Callable[[], float], **labels: str) -> None:
+        """Read the series selected by ``labels`` from ``fn`` at render time"""
+        self._fns[self._key(labels)] = fn
+
+    def untrack(self, **labels: str) -> None:
+        """Stop reporting the series selected by ``labels``"""
+        key = self._key(labels)
+        self._fns.pop(key, None)
+        self._values.pop(key, None)
+
+    def value(self, **labels: str) -> float:
+        """Current value of one series"""
+        key = self._key(labels)
+        fn = self._fns.get(key)
+        if fn is not None:
+            return float(fn())
+        return self._values.get(key, 0.0)
+
+    def _series(self) -> Iterator[tuple[dict[str, str], float]]:
+        for key, value in self._values.items():
+            yield self._labels(key), value
+        for key, fn in self._fns.items():
+            yield self._labels(key), float(fn())
+
+
+class Counter(_TrackedMetric):
+    """Monotonically increasing count, optionally read from a callback"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add ``amount`` to the series selected by ``labels``"""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, value in self._series():
+            yield self.name + "_total", labels, value
+
+
+class Gauge(_TrackedMetric):
+    """Value that goes up and down, optionally read from a callback"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the series selected by ``labels``"""
+        self._values[self._key(labels)] = value
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, value in self._series():
+            yield self.name, labels, value
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed bucket bounds"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        buckets: Sequence[float],
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: a count for each bucket plus +Inf, then the sum
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation"""
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, **labels: str) -> int:
+        """Number of observations in one series"""
+        series = self._series.get(self._key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> Iterator[Sample]:
+        for key, series in self._series.items():
+            labels = self._labels(key)
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), series, strict=False):
+                cumulative += count
+                yield (
+                    self.name + "_bucket",
+                    {**labels, "le": _format_value(bound)},
+                    cumulative,
+                )
+            yield self.name + "_count", labels, cumulative
+            yield self.name + "_sum", labels, series[-1]
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together"""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: MetricT) -> MetricT:
+        """Add a metric family; names must be unique"""
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, **kwargs: Any) -> Counter:
+        """Register and return a counter"""
+        return self.register(Counter(name, help, **kwargs))
+
+    def gauge(self, name: str, help: str, **kwargs: Any) -> Gauge:
+        """Register and return a gauge"""
+        return self.register(Gauge(name, help, **kwargs))
+
+    def histogram(self, name: str, help: str, **kwargs: Any) -> Histogram:
+        """Register and return a histogram"""
+        return self.register(Histogram(name, help, **kwargs))
+
+    def render(self, openmetrics: bool = True) -> str:
+        """Render every metric in OpenMetrics or Prometheus text format"""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            # The Prometheus text format names counters by their sample name
+            family = metric.name
+            if metric.kind == "counter" and not openmetrics:
+                family += "_total"
+            lines.append(f"# HELP {family} {_escape(metric.help)}")
+            lines.append(f"# TYPE {family} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Serve a registry over HTTP and/or write it to a textfile periodically
+
+    The HTTP endpoint answers ``GET /metrics`` on ``host``:``port``. The
+    textfile is rewritten atomically every ``interval`` seconds in the
+    Prometheus text format, for node_exporter's textfile collector.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        port: int | None = None,
+        host: str = "127.0.0.1",
+        textfile: str | Path | None = None,
+        interval: float = 15.0,
+    ):
+        self.registry = registry
+        self.port = port
+        self.host = host
+        self.textfile = Path(textfile) if textfile else None
+        self.interval = interval
+        self._server: asyncio.base_events.Server | None = None
+        self._writer: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_config(
+        cls, config: dict[str, Any], registry: MetricsRegistry
+    ) -> "MetricsExporter":
+        """Build an exporter from integration config keys"""
+        return cls(
+            registry,
+            port=config.get("metrics_port"),
+            host=config.get("metrics_host", "127.0.0.1"),
+            textfile=config.get("metrics_textfile"),
+            interval=config.get("metrics_interval", 15.0),
+        )
+
+    async def start(self) -> None:
+        """Start the configured exporters; starting again is a no-op"""
+        if self.port is not None and self._server is None:
+            self._server = await asyncio.start_server(
+                self._handle, self.host, self.port
+            )
+            logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+        if self.textfile is not None and self._writer is None:
+            self._writer = asyncio.ensure_future(self._write_periodically())
+
+    async def close(self) -> None:
+        """Stop serving and write the textfile one last time"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._writer is not None:
+            self._writer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._writer
+            self._writer = None
+            self.write_textfile()
+
+    def write_textfile(self) -> None:
+        """Atomically replace the textfile with the current metrics"""
+        if self.textfile is None:
+            return
+        self.textfile.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.textfile.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.registry.render(openmetrics=False))
+            os.replace(tmp_path, self.textfile)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+    async def _write_periodically(self) -> None:
+        while True:
+            try:
+                self.write_textfile()
+            except OSError as e:
+                logger.warning(f"Failed to write metrics textfile: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+            request_line, *headers = request.decode("latin-1").split("\r\n")
+            method, path, *_ = request_line.split(" ")
+            accept = next(
+                (
+                    line.split(":", 1)[1]
+                    for line in headers
+                    if line.lower().startswith("accept:")
+                ),
+                "",
+            )
+
+            if method != "GET" or path.split("?")[0] != "/metrics":
+                status, content_type, body = "404 Not Found", "text/plain", b""
+            else:
+                openmetrics = "application/openmetrics-text" in accept
+                status = "200 OK"
+                content_type = (
+                    OPENMETRICS_CONTENT_TYPE if openmetrics else TEXT_CONTENT_TYPE
+                )
+                body = self.registry.render(openmetrics=openmetrics).encode()
+
+            await self._respond(writer, status, content_type, body)
+        except asyncio.LimitOverrunError:
+            with contextlib.suppress(ConnectionError):
+                await self._respond(
+                    writer, "431 Request Header Fields Too Large", "text/plain", b""
+                )
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    @staticmethod
+    async def _respond(
+        writer: asyncio.StreamWriter, status: str, content_type: str, body: bytes
+    ) -> None:
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+
+
+class ConsultationMetrics:
+    """Metric families recorded on the consultation path
+
+    Recording is a dict lookup and an addition per metric, cheap enough to
+    leave enabled. Every series carries a ``project`` label, so integrations
+    for several project roots can share one registry and exporter. Families
+    that mirror other components' state are tracked with callbacks and only
+    read when the registry is rendered.
+    """
+
+    def __init__(self, registry: MetricsRegistry | None = None):
+        self.registry = registry or MetricsRegistry()
+        self.consultations = self.registry.counter(
+            "gemini_consultations",
+            "Consultations by outcome and model",
+            labelnames=("project", "status", "model"),
+        )
+        self.duration = self.registry.histogram(
+            "gemini_consultation_duration_seconds",
+            "Gemini CLI execution time of successful consultations",
+            buckets=LATENCY_BUCKETS,
+            labelnames=("project", "model"),
+        )
+        self.queue_wait = self.registry.histogram(
+            "gemini_queue_wait_seconds",
+            "Time spent waiting for rate-limiter admission",
+            buckets=WAIT_BUCKETS,
+            labelnames=("project",),
+        )
+        self.prompt_bytes = self.registry.histogram(
+            "gemini_prompt_bytes",
+            "Size of prompts sent to the Gemini CLI",
+            buckets=SIZE_BUCKETS,
+            labelnames=("project",),
+        )
+        self.response_bytes = self.registry.histogram(
+            "gemini_response_bytes",
+            "Size of responses returned by the Gemini CLI",
+            buckets=SIZE_BUCKETS,
+            labelnames=("project",),
+        )
+        self.retries = self.registry.counter(
+            "gemini_retries",
+            "Retries of failed Gemini CLI calls by error kind",
+            labelnames=("project", "kind"),
+        )
+
+        # Component state, tracked per project
+        self.tracked: list[_TrackedMetric] = [
+            self.registry.gauge(
+                "gemini_queue_depth",
+                "Consultations waiting for rate-limiter admission",
+                labelnames=("project",),
+            ),
+            self.registry.gauge(
+                "gemini_active_consultations",
+                "Consultations currently running",
+                labelnames=("project",),
+            ),
+            self.registry.counter(
+                "gemini_queue_expired",
+                "Consultations dropped because their deadline passed while queued",
+                labelnames=("project",),
+            ),
+            self.registry.gauge(
+                "gemini_cli_processes",
+                "Live Gemini CLI processes, warm workers included",
+                labelnames=("project",),
+            ),
+            self.registry.gauge(
+                "gemini_circuit_open",
+                "Whether the circuit breaker is rejecting calls",
+                labelnames=("project",),
+            ),
+            self.registry.counter(
+                "gemini_cache_hits",
+                "Consultations answered from the response cache",
+                labelnames=("project",),
+            ),
+            self.registry.counter(
+                "gemini_coalesced_calls",
+                "Consultations that joined an identical running call",
+                labelnames=("project",),
+            ),
+            self.registry.counter(
+                "gemini_similar_reuses",
+                "Consultations answered with the response to a similar question",
+                labelnames=("project",),
+            ),
+        ]
+
+    def track(self, project: str, **fns: Callable[[], float]) -> None:
+        """Report a project's component state, keyed by family name suffix
+
+        ``fns`` maps a family name without its ``gemini_`` prefix, such as
+        ``queue_depth``, to the callback that reads it.
+        """
+        families = {
+            metric.name.removeprefix("gemini_"): metric for metric in self.tracked
+        }
+        for name, fn in fns.items():
+            families[name].track(fn, project=project)
+
+    def forget(self, project: str) -> None:
+        """Stop reporting a project's component state"""
+        for metric in self.tracked:
+            metric.untrack(project=project)
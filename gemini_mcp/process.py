@@ -0,0 +1,107 @@
+"""
+Process Supervisor Module
+Spawns Gemini CLI processes in their own process groups and reaps them
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessSupervisor:
+    """Tracks live Gemini CLI processes and guarantees their cleanup
+
+    Each CLI is started as the leader of a new session so that it and any
+    children Node.js starts can be signalled as one process group. At most
+    ``max_processes`` children are alive at once; further spawns wait for a
+    slot. ``reap`` sends SIGTERM, escalates to SIGKILL after
+    ``grace_period`` seconds and waits for the exit, and must be called for
+    every spawned process, including after timeouts and cancellation.
+    """
+
+    def __init__(self, max_processes: int = 32, grace_period: float = 5.0):
+        self.max_processes = max_processes
+        self.grace_period = grace_period
+        self._slots = asyncio.Semaphore(max_processes)
+        self._live: set[asyncio.subprocess.Process] = set()
+
+        # Statistics
+        self.spawned = 0
+        self.terminated = 0
+        self.killed = 0
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "ProcessSupervisor":
+        """Build a supervisor from integration config keys"""
+        return cls(
+            max_processes=config.get("max_processes", 32),
+            grace_period=config.get("kill_grace_period", 5.0),
+        )
+
+    @property
+    def live(self) -> int:
+        """Number of spawned processes that have not been reaped yet"""
+        return len(self._live)
+
+    async def spawn(self, *cmd: str, **kwargs: Any) -> asyncio.subprocess.Process:
+        """Start ``cmd`` in a new process group once a slot is free"""
+        await self._slots.acquire()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, start_new_session=True, **kwargs
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        self._live.add(process)
+        self.spawned += 1
+        return process
+
+    async def reap(self, process: asyncio.subprocess.Process) -> None:
+        """Stop ``process`` if it is still running and release its slot
+
+        Safe to call more than once. The cleanup is shielded, so a second
+        cancellation of the caller does not leave the process behind.
+        """
+        if process not in self._live:
+            return
+        await asyncio.shield(self._reap(process))
+
+    async def shutdown(self) -> None:
+        """Stop and reap every live process"""
+        await asyncio.gather(
+            *(self.reap(process) for process in list(self._live)),
+            return_exceptions=True,
+        )
+
+    async def _reap(self, process: asyncio.subprocess.Process) -> None:
+        try:
+            if process.returncode is None:
+                self.terminated += 1
+                self._signal(process, signal.SIGTERM)
+                try:
+                    await asyncio.wait_for(process.wait(), timeout=self.grace_period)
+                except asyncio.TimeoutError:
+                    logger.warning(
+                        f"Gemini CLI process {process.pid} ignored SIGTERM; killing it"
+                    )
+                    self.killed += 1
+                    self._signal(process, signal.SIGKILL)
+                    await process.wait()
+        finally:
+            if process in self._live:
+                self._live.discard(process)
+                self._slots.release()
+
+    @staticmethod
+    def _signal(process: asyncio.subprocess.Process, sig: int) -> None:
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            if hasattr(os, "killpg"):
+                os.killpg(process.pid, sig)
+            else:
+                process.send_signal(sig)
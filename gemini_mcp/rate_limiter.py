@@ -0,0 +1,337 @@
+"""
+Rate Limiter Module
+Token-bucket admission control with priority classes and fairly shared concurrency
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from typing import Any
+
+# Relative share of admissions each priority class gets under contention
+PRIORITY_WEIGHTS = {"interactive": 4.0, "normal": 2.0, "background": 1.0}
+
+
+class QueueDeadlineError(Exception):
+    """A queued call's deadline passed before it was admitted"""
+
+
+class _Waiter:
+    """A call queued for admission"""
+
+    __slots__ = ("future", "tag", "use_token")
+
+    def __init__(self, future: asyncio.Future[None], tag: float, use_token: bool):
+        self.future = future
+        self.tag = tag  # virtual finish time for weighted fair queueing
+        self.use_token = use_token
+
+
+class RateLimiter:
+    """Admit consultations at a sustained rate with bounded concurrency
+
+    Tokens refill at ``rate`` per second up to ``burst``; every admitted call
+    takes one token and holds one of ``max_concurrency`` slots while it runs.
+    A ``rate`` of zero disables the token bucket.
+
+    Waiting calls are queued by priority class and admitted by weighted fair
+    queueing: each class gets admissions in proportion to its weight while
+    several classes wait, so interactive calls overtake background work
+    without starving it. Within a class calls are served in arrival order. A
+    call whose ``deadline`` passes while it is queued is dropped with
+    QueueDeadlineError. With a ``shared`` cap, admitted calls also take one
+    of its slots on behalf of ``tenant`` before they run.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        max_concurrency: int = 4,
+        shared: "FairShare | None" = None,
+        tenant: str = "",
+        weights: dict[str, float] | None = None,
+    ):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.shared = shared
+        self.tenant = tenant
+        self.weights = {**PRIORITY_WEIGHTS, **(weights or {})}
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._running = 0
+        self._queues: dict[str, deque[_Waiter]] = {
+            priority: deque() for priority in self.weights
+        }
+        self._finish = dict.fromkeys(self.weights, 0.0)
+        self._virtual_time = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+
+        # Statistics
+        self.waiting = 0
+        self.active = 0
+        self.admitted = 0
+        self.expired = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    @classmethod
+    def from_config(
+        cls,
+        config: dict[str, Any],
+        shared: "FairShare | None" = None,
+        tenant: str = "",
+    ) -> "RateLimiter":
+        """Build a limiter from integration config keys"""
+        rate = config.get("rate_limit_per_second")
+        if rate is None:
+            delay = config.get("rate_limit_delay", 2.0)
+            rate = 1.0 / delay if delay > 0 else 0.0
+        return cls(
+            rate=rate,
+            burst=config.get("rate_limit_burst", 1),
+            max_concurrency=config.get("max_concurrency", 4),
+            shared=shared,
+            tenant=tenant,
+            weights=config.get("priority_weights"),
+        )
+
+    @property
+    def waiting_by_class(self) -> dict[str, int]:
+        """Number of queued calls per priority class"""
+        return {
+            priority: sum(not waiter.future.done() for waiter in queue)
+            for priority, queue in self._queues.items()
+        }
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        use_token: bool = True,
+        priority: str = "normal",
+        deadline: float | None = None,
+    ) -> AsyncIterator[float]:
+        """Wait for admission and hold a concurrency slot
+
+        Yields the time spent waiting. ``use_token=False`` skips the token
+        bucket but still respects the concurrency bound. ``deadline`` is a
+        ``time.monotonic()`` value after which a still-queued call is
+        dropped.
+        """
+        if priority not in self.weights:
+            raise ValueError(f"Unknown priority: {priority}")
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._admit(priority, use_token, deadline)
+            try:
+                # Last, so a shared slot is never held while waiting on tokens
+                if self.shared is not None:
+                    await self.shared.acquire(self.tenant)
+            except BaseException:
+                self._release()
+                raise
+        finally:
+            self.waiting -= 1
+
+        wait_time = time.monotonic() - start
+        self.admitted += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+        self.active += 1
+        try:
+            yield wait_time
+        finally:
+            self.active -= 1
+            if self.shared is not None:
+                self.shared.release(self.tenant)
+            self._release()
+
+    @property
+    def average_wait_time(self) -> float:
+        """Mean admission wait across all admitted calls"""
+        return self.total_wait_time / self.admitted if self.admitted else 0.0
+
+    async def _admit(
+        self, priority: str, use_token: bool, deadline: float | None
+    ) -> None:
+        """Take a slot (and a token) now or queue until the scheduler grants one"""
+        if (
+            self._running < self.max_concurrency
+            and not any(self._queues.values())
+            and self._try_token(use_token)
+        ):
+            self._running += 1
+            return
+
+        tag = (
+            max(self._virtual_time, self._finish[priority]) + 1 / self.weights[priority]
+        )
+        self._finish[priority] = tag
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), tag, use_token)
+        self._queues[priority].append(waiter)
+        self._dispatch()
+
+        start = time.monotonic()
+        timeout = None if deadline is None else deadline - start
+        try:
+            await asyncio.wait_for(waiter.future, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just before the timeout or cancellation landed
+                self._release()
+            else:
+                with suppress(ValueError):
+                    self._queues[priority].remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.expired += 1
+            raise QueueDeadlineError(
+                f"Deadline passed after {time.monotonic() - start:.1f}s "
+                f"in the {priority} queue"
+            ) from None
+
+    def _release(self) -> None:
+        self._running -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to queued calls in weighted fair order"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._running < self.max_concurrency:
+            self._refill()
+            has_token = self.rate <= 0 or self._tokens >= 1
+            chosen: tuple[str, _Waiter] | None = None
+            pending = False
+            for priority, queue in self._queues.items():
+                while queue and queue[0].future.done():
+                    queue.popleft()  # timed out or cancelled
+                if not queue:
+                    continue
+                pending = True
+                head = queue[0]
+                if (has_token or not head.use_token) and (
+                    chosen is None or head.tag < chosen[1].tag
+                ):
+                    chosen = (priority, head)
+            if chosen is None:
+                if pending and not has_token:
+                    self._timer = asyncio.get_running_loop().call_later(
+                        (1 - self._tokens) / self.rate, self._dispatch
+                    )
+                return
+
+            priority, waiter = chosen
+            self._queues[priority].popleft()
+            if waiter.use_token and self.rate > 0:
+                self._tokens -= 1
+            self._virtual_time = waiter.tag
+            self._running += 1
+            waiter.future.set_result(None)
+
+    def _try_token(self, use_token: bool) -> bool:
+        if not use_token or self.rate <= 0:
+            return True
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class FairShare:
+    """Concurrency cap shared fairly between tenants
+
+    At most ``capacity`` holders run at once across all tenants. Once the cap
+    is reached, waiters queue per tenant and freed slots are handed to the
+    waiting tenants in round-robin order, so a tenant with a deep backlog
+    cannot starve the others.
+    """
+
+    def __init__(self, capacity: int = 8):
+        self.capacity = max(1, capacity)
+        self.active = 0
+        self.active_by_tenant: dict[str, int] = {}
+        # Insertion order is the round-robin order of waiting tenants
+        self._queues: dict[str, deque[asyncio.Future[None]]] = {}
+
+        # Statistics
+        self.granted = 0
+        self.queued = 0
+
+    @property
+    def waiting(self) -> int:
+        """Number of callers waiting for a slot"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def resize(self, capacity: int) -> None:
+        """Change the cap; waiters are admitted at once if it grew"""
+        self.capacity = max(1, capacity)
+        self._dispatch()
+
+    async def acquire(self, tenant: str) -> None:
+        """Wait for a slot on behalf of ``tenant``"""
+        if self.active < self.capacity and not self._queues:
+            self._grant(tenant)
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(tenant, deque()).append(future)
+        self.queued += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before the cancellation landed
+                self.release(tenant)
+            else:
+                self._discard(tenant, future)
+            raise
+
+    def release(self, tenant: str) -> None:
+        """Return a slot held by ``tenant``"""
+        self.active -= 1
+        remaining = self.active_by_tenant.get(tenant, 1) - 1
+        if remaining > 0:
+            self.active_by_tenant[tenant] = remaining
+        else:
+            self.active_by_tenant.pop(tenant, None)
+        self._dispatch()
+
+    def _grant(self, tenant: str) -> None:
+        self.active += 1
+        self.active_by_tenant[tenant] = self.active_by_tenant.get(tenant, 0) + 1
+        self.granted += 1
+
+    def _discard(self, tenant: str, future: asyncio.Future[None]) -> None:
+        queue = self._queues.get(tenant)
+        if queue is None:
+            return
+        with suppress(ValueError):
+            queue.remove(future)
+        if not queue:
+            del self._queues[tenant]
+
+    def _dispatch(self) -> None:
+        while self.active < self.capacity and self._queues:
+            tenant = next(iter(self._queues))
+            queue = self._queues.pop(tenant)
+            future = queue.popleft()
+            if queue:
+                # Back of the rotation until every other tenant had a turn
+                self._queues[tenant] = queue
+            if future.done():
+                continue
+            self._grant(tenant)
+            future.set_result(None)
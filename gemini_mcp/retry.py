@@ -0,0 +1,131 @@
+"""
+Retry Module
+Classifies Gemini CLI failures and schedules retries of transient ones
+"""
+
+import random
+import re
+from typing import Any
+
+# Checked in order against stderr; the first match wins, so permanent causes
+# take precedence over generic transient wording
+ERROR_CLASSES: list[tuple[str, bool, re.Pattern[str]]] = [
+    (kind, retryable, re.compile("|".join(patterns), re.IGNORECASE))
+    for kind, retryable, patterns in [
+        (
+            "auth",
+            False,
+            [
+                r"authenticat",
+                r"unauthori[sz]ed",
+                r"permission[ _]denied",
+                r"api key not valid",
+                r"invalid api key",
+                r"\b40[13]\b",
+            ],
+        ),
+        (
+            "invalid_request",
+            False,
+            [r"invalid[ _]argument", r"bad request", r"\b40[04]\b"],
+        ),
+        (
+            "rate_limit",
+            True,
+            [
+                r"\b429\b",
+                r"resource[ _]exhausted",
+                r"rate[ _-]?limit",
+                r"too many requests",
+                r"quota",
+            ],
+        ),
+        (
+            "server",
+            True,
+            [
+                r"\b50[0234]\b",
+                r"internal error",
+                r"unavailable",
+                r"overloaded",
+                r"deadline exceeded",
+            ],
+        ),
+        (
+            "network",
+            True,
+            [
+                r"\beconn(?:reset|refused)\b",
+                r"\betimedout\b",
+                r"\beai_again\b",
+                r"\benotfound\b",
+                r"socket hang up",
+                r"network",
+                r"fetch failed",
+            ],
+        ),
+    ]
+]
+
+
+class GeminiCLIError(Exception):
+    """A failed Gemini CLI execution
+
+    ``kind`` names the failure class and ``retryable`` tells whether trying
+    again later may succeed.
+    """
+
+    def __init__(self, message: str, kind: str = "unknown", retryable: bool = False):
+        super().__init__(message)
+        self.kind = kind
+        self.retryable = retryable
+
+
+def classify_error(returncode: int | None, stderr: str) -> tuple[str, bool]:
+    """Classify a CLI failure as ``(kind, retryable)``
+
+    Unrecognised failures are treated as permanent. A CLI killed by a signal
+    is retried, a missing executable is not.
+    """
+    for kind, retryable, pattern in ERROR_CLASSES:
+        if pattern.search(stderr):
+            return kind, retryable
+    if returncode is not None and returncode < 0:
+        return "crash", True
+    if returncode in (126, 127):
+        return "not_executable", False
+    return "unknown", False
+
+
+class RetryPolicy:
+    """Bounded retries with exponential backoff and full jitter
+
+    Retry ``n`` (counting from 0) sleeps for a random time between zero and
+    ``min(max_delay, base_delay * 2**n)``, which spreads retries from
+    concurrent callers instead of having them hit the backend in lockstep.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        rng: random.Random | None = None,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "RetryPolicy":
+        """Build a policy from integration config keys"""
+        return cls(
+            max_retries=config.get("max_retries", 2),
+            base_delay=config.get("retry_base_delay", 1.0),
+            max_delay=config.get("retry_max_delay", 30.0),
+        )
+
+    def backoff(self, retry: int) -> float:
+        """Sleep before retry number ``retry``"""
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
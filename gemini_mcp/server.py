@@ -4,18 +4,35 @@ MCP Server with Gemini Integration
 Provides development workflow automation with AI second opinions
 """
 
+import asyncio
+import ipaddress
 import json
 import os
-from collections.abc import Callable
+import uuid
+import weakref
+from collections.abc import AsyncIterator, Callable, Sequence
+from contextlib import asynccontextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import mcp.server.stdio
 import mcp.types as types
 from mcp.server import Server
 
 # Import Gemini integration
-from .gemini_integration import get_integration
+from .backends import HTTPBackend
+from .file_context import FileContextIndex
+from .gemini_integration import get_integration, get_registry
+from .rate_limiter import PRIORITY_WEIGHTS
+from .streaming import ChunkCallback
+
+if TYPE_CHECKING:
+    from mcp.server.session import ServerSession
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    from mcp.server.transport_security import TransportSecuritySettings
+    from starlette.applications import Starlette
+    from starlette.types import Receive, Scope, Send
 
 
 class MCPServer:
@@ -23,10 +40,18 @@ class MCPServer:
         self.project_root = Path(project_root) if project_root else Path.cwd()
         self.server = Server("mcp-server")
 
-        # Initialize Gemini integration with singleton pattern
+        # Each project root and config gets its own Gemini integration
         self.gemini_config = self._load_gemini_config()
-        # Get the singleton instance, passing config on first call
-        self.gemini = get_integration(self.gemini_config)
+        global_concurrency = os.getenv("GEMINI_GLOBAL_MAX_CONCURRENCY")
+        if global_concurrency is not None:
+            get_registry().concurrency.resize(int(global_concurrency))
+        self.gemini = get_integration(self.gemini_config, self.project_root)
+        self.files = FileContextIndex.from_config(self.gemini_config, self.project_root)
+
+        # Owner keys for auto-consult results, forgotten with their session
+        self._session_owners: weakref.WeakKeyDictionary[ServerSession, str] = (
+            weakref.WeakKeyDictionary()
+        )
 
         self._setup_tools()
 
@@ -45,9 +70,34 @@ class MCPServer:
             "GEMINI_ENABLED": ("enabled", lambda x: x.lower() == "true"),
             "GEMINI_AUTO_CONSULT": ("auto_consult", lambda x: x.lower() == "true"),
             "GEMINI_CLI_COMMAND": ("cli_command", str),
+            "GEMINI_BACKEND": ("backend", str),
+            "GEMINI_API_KEY": ("api_key", str),
+            "GEMINI_API_BASE_URL": ("api_base_url", str),
             "GEMINI_TIMEOUT": ("timeout", int),
+            "GEMINI_MAX_RETRIES": ("max_retries", int),
+            "GEMINI_CIRCUIT_FAILURE_THRESHOLD": ("circuit_failure_threshold", int),
+            "GEMINI_CIRCUIT_RESET_TIMEOUT": ("circuit_reset_timeout", float),
             "GEMINI_RATE_LIMIT": ("rate_limit_delay", float),
+            "GEMINI_RATE_LIMIT_BURST": ("rate_limit_burst", int),
+            "GEMINI_MAX_CONCURRENCY": ("max_concurrency", int),
+            "GEMINI_WORKER_POOL_SIZE": ("worker_pool_size", int),
+            "GEMINI_MAX_PROCESSES": ("max_processes", int),
+            "GEMINI_PROMPT_DELIVERY": ("prompt_delivery", str),
+            "GEMINI_STREAM_OUTPUT": ("stream_output", lambda x: x.lower() == "true"),
+            "GEMINI_HEDGE_ENABLED": ("hedge_enabled", lambda x: x.lower() == "true"),
+            "GEMINI_HEDGE_MODEL": ("hedge_model", str),
             "GEMINI_MODEL": ("model", str),
+            "GEMINI_CACHE_ENABLED": ("cache_enabled", lambda x: x.lower() == "true"),
+            "GEMINI_CACHE_TTL": ("cache_ttl", float),
+            "GEMINI_CACHE_DIR": ("cache_dir", str),
+            "GEMINI_SIMILARITY_ENABLED": (
+                "similarity_enabled",
+                lambda x: x.lower() == "true",
+            ),
+            "GEMINI_SIMILARITY_THRESHOLD": ("similarity_threshold", float),
+            "GEMINI_JOURNAL_DIR": ("journal_dir", str),
+            "GEMINI_METRICS_PORT": ("metrics_port", int),
+            "GEMINI_METRICS_TEXTFILE": ("metrics_textfile", str),
         }
 
         for env_key, (config_key, converter) in env_mapping.items():
@@ -55,6 +105,12 @@ class MCPServer:
             if value is not None:
                 config[config_key] = converter(value)
 
+        # Keep on-disk state under the project root unless given absolutely
+        for key in ("cache_dir", "journal_dir", "metrics_textfile"):
+            path = config.get(key)
+            if path and not Path(path).is_absolute():
+                config[key] = str(self.project_root / path)
+
         return config
 
     def _setup_tools(self) -> None:
@@ -82,13 +138,166 @@ class MCPServer:
                                 "description": "Whether to request structured comparison format",
                                 "default": True,
                             },
+                            "bypass_cache": {
+                                "type": "boolean",
+                                "description": "Skip cached responses and always ask Gemini",
+                                "default": False,
+                            },
+                            "priority": {
+                                "type": "string",
+                                "enum": list(PRIORITY_WEIGHTS),
+                                "description": "Queueing priority; background work yields to interactive questions",
+                                "default": "interactive",
+                            },
                         },
                         "required": ["query"],
                     },
                 ),
+                types.Tool(
+                    name="consult_gemini_files",
+                    description=(
+                        "Consult Gemini with the parts of project files most "
+                        "relevant to the question as context"
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "The question or topic to consult Gemini about",
+                            },
+                            "paths": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Files to draw context from, relative to the project root",
+                            },
+                            "context": {
+                                "type": "string",
+                                "description": "Additional context placed before the file excerpts",
+                            },
+                            "comparison_mode": {
+                                "type": "boolean",
+                                "description": "Whether to request structured comparison format",
+                                "default": True,
+                            },
+                            "bypass_cache": {
+                                "type": "boolean",
+                                "description": "Skip cached responses and always ask Gemini",
+                                "default": False,
+                            },
+                            "priority": {
+                                "type": "string",
+                                "enum": list(PRIORITY_WEIGHTS),
+                                "description": "Queueing priority; background work yields to interactive questions",
+                                "default": "interactive",
+                            },
+                        },
+                        "required": ["query", "paths"],
+                    },
+                ),
+                types.Tool(
+                    name="consult_gemini_batch",
+                    description="Consult Gemini on several independent questions in parallel",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "items": {
+                                "type": "array",
+                                "description": "Questions to consult Gemini about",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "query": {"type": "string"},
+                                        "context": {"type": "string"},
+                                        "comparison_mode": {
+                                            "type": "boolean",
+                                            "default": True,
+                                        },
+                                    },
+                                    "required": ["query"],
+                                },
+                            },
+                            "bypass_cache": {
+                                "type": "boolean",
+                                "description": "Skip cached responses and always ask Gemini",
+                                "default": False,
+                            },
+                            "priority": {
+                                "type": "string",
+                                "enum": list(PRIORITY_WEIGHTS),
+                                "description": "Queueing priority of every item in the batch",
+                                "default": "normal",
+                            },
+                        },
+                        "required": ["items"],
+                    },
+                ),
+                types.Tool(
+                    name="gemini_auto_consult",
+                    description=(
+                        "Submit assistant text for automatic review; Gemini is "
+                        "consulted in the background when it shows enough uncertainty"
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "text": {
+                                "type": "string",
+                                "description": "Assistant text to check for uncertainty",
+                            },
+                            "context": {
+                                "type": "string",
+                                "description": "Additional context for a consultation",
+                            },
+                            "tickets": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Tickets of earlier background consultations to collect",
+                            },
+                        },
+                    },
+                ),
                 types.Tool(
                     name="gemini_status",
                     description="Check Gemini integration status and statistics",
+                    inputSchema={"type": "object", "properties": {}},
+                ),
+                types.Tool(
+                    name="gemini_history",
+                    description="Page through the on-disk consultation journal",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "status": {
+                                "type": "string",
+                                "description": "Only show consultations with this status",
+                                "enum": ["success", "error", "cached", "rejected"],
+                            },
+                            "since": {
+                                "type": "string",
+                                "description": "Earliest consultation time (ISO 8601)",
+                            },
+                            "until": {
+                                "type": "string",
+                                "description": "Latest consultation time (ISO 8601)",
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Consultations per page",
+                                "default": 20,
+                            },
+                            "page": {
+                                "type": "integer",
+                                "description": "Page number, starting at 1 for the newest",
+                                "default": 1,
+                            },
+                        },
+                    },
+                ),
+                types.Tool(
+                    name="gemini_metrics",
+                    description="Export Gemini integration metrics in OpenMetrics format",
+                    inputSchema={"type": "object", "properties": {}},
                 ),
                 types.Tool(
                     name="toggle_gemini_auto_consult",
@@ -111,8 +320,18 @@ class MCPServer:
         ) -> list[types.TextContent]:
             if name == "consult_gemini":
                 return await self._handle_consult_gemini(arguments)
+            elif name == "consult_gemini_files":
+                return await self._handle_consult_gemini_files(arguments)
+            elif name == "consult_gemini_batch":
+                return await self._handle_consult_gemini_batch(arguments)
+            elif name == "gemini_auto_consult":
+                return await self._handle_auto_consult(arguments)
             elif name == "gemini_status":
                 return await self._handle_gemini_status(arguments)
+            elif name == "gemini_history":
+                return await self._handle_gemini_history(arguments)
+            elif name == "gemini_metrics":
+                return await self._handle_gemini_metrics(arguments)
             elif name == "toggle_gemini_auto_consult":
                 return await self._handle_toggle_auto_consult(arguments)
             else:
@@ -125,6 +344,8 @@ class MCPServer:
         query = arguments.get("query", "")
         context = arguments.get("context", "")
         comparison_mode = arguments.get("comparison_mode", True)
+        bypass_cache = arguments.get("bypass_cache", False)
+        priority = arguments.get("priority", "interactive")
 
         if not query:
             return [
@@ -135,43 +356,453 @@ class MCPServer:
             ]
 
         result = await self.gemini.consult_gemini(
-            query=query, context=context, comparison_mode=comparison_mode
+            query=query,
+            context=context,
+            comparison_mode=comparison_mode,
+            use_cache=not bypass_cache,
+            on_chunk=self._chunk_forwarder(),
+            priority=priority,
+        )
+
+        return [types.TextContent(type="text", text=self._consultation_text(result))]
+
+    async def _handle_consult_gemini_files(
+        self, arguments: dict[str, Any]
+    ) -> list[types.TextContent]:
+        """Handle Gemini consultations with context drawn from project files"""
+        query = arguments.get("query", "")
+        paths = arguments.get("paths") or []
+        context = arguments.get("context", "")
+
+        if not query or not paths:
+            return [
+                types.TextContent(
+                    type="text",
+                    text="❌ Error: 'query' and 'paths' are required",
+                )
+            ]
+
+        # File excerpts fill what the extra context leaves of the budget; reading
+        # and ranking run off the event loop so other sessions keep being served
+        budget = self.gemini.max_context_length - len(context) - 1
+        try:
+            excerpts, included = await asyncio.to_thread(
+                self.files.pack, query, paths, max(budget, 0)
+            )
+        except (OSError, ValueError) as e:
+            return [types.TextContent(type="text", text=f"❌ Error: {e}")]
+
+        result = await self.gemini.consult_gemini(
+            query=query,
+            context="\n".join(part for part in (context, excerpts) if part),
+            comparison_mode=arguments.get("comparison_mode", True),
+            use_cache=not arguments.get("bypass_cache", False),
+            on_chunk=self._chunk_forwarder(),
+            priority=arguments.get("priority", "interactive"),
         )
 
+        response_text = self._consultation_text(result)
+        lines = ["", "", "📄 **Files Included**:"]
+        for entry in included:
+            ranges = ", ".join(f"{start}-{end}" for start, end in entry["ranges"])
+            lines.append(
+                f"• `{entry['path']}`: lines {ranges}"
+                if ranges
+                else f"• `{entry['path']}`: omitted, no room left in the context"
+            )
+        return [types.TextContent(type="text", text=response_text + "\n".join(lines))]
+
+    def _consultation_text(self, result: dict[str, Any]) -> str:
+        """Render a consultation result for the client"""
         if result["status"] == "success":
             response_text = f"🤖 **Gemini Second Opinion**\n\n{result['response']}\n\n"
-            response_text += (
-                f"⏱️ *Consultation completed in {result['execution_time']:.2f}s*"
-            )
+            if result.get("reused"):
+                response_text += (
+                    "♻️ *Reused the answer to a similar question "
+                    f"(similarity {result['similarity']:.2f})*"
+                )
+            elif result.get("cached"):
+                response_text += "♻️ *Served from cache*"
+            else:
+                response_text += (
+                    f"⏱️ *Consultation completed in {result['execution_time']:.2f}s*"
+                )
+                if result.get("retries"):
+                    response_text += f" *after {result['retries']} retries*"
         else:
             response_text = f"❌ **Gemini Consultation Failed**\n\nError: {result.get('error', 'Unknown error')}"
 
-        return [types.TextContent(type="text", text=response_text)]
+        return response_text
+
+    async def _handle_consult_gemini_batch(
+        self, arguments: dict[str, Any]
+    ) -> list[types.TextContent]:
+        """Handle batched Gemini consultation requests"""
+        items = arguments.get("items") or []
+        if not items:
+            return [
+                types.TextContent(
+                    type="text",
+                    text="❌ Error: 'items' must contain at least one query",
+                )
+            ]
+
+        try:
+            results = await self.gemini.consult_gemini_batch(
+                items,
+                use_cache=not arguments.get("bypass_cache", False),
+                priority=arguments.get("priority", "normal"),
+            )
+        except ValueError as e:
+            return [types.TextContent(type="text", text=f"❌ Error: {e}")]
+
+        succeeded = sum(result["status"] == "success" for result in results)
+        lines = [
+            "🤖 **Gemini Batch Consultation**",
+            "",
+            f"✅ {succeeded} succeeded, ❌ {len(results) - succeeded} failed",
+        ]
+        for item, result in zip(items, results, strict=True):
+            query = item.get("query", "")
+            if len(query) > 80:
+                query = query[:80] + "..."
+            icon = "✅" if result["status"] == "success" else "❌"
+            lines.extend(
+                [
+                    "",
+                    f"### {icon} [{result['index'] + 1}] {query} "
+                    f"({result['elapsed']:.2f}s)",
+                    "",
+                ]
+            )
+            if result["status"] == "success":
+                lines.append(result["response"])
+            else:
+                lines.append(
+                    f"Error: {result.get('error') or result.get('message', 'Unknown error')}"
+                )
+
+        return [types.TextContent(type="text", text="\n".join(lines))]
+
+    def _chunk_forwarder(self) -> ChunkCallback | None:
+        """Build a callback that streams output chunks to the calling client
+
+        Chunks are sent as progress notifications when the client supplied a
+        progress token, and as log notifications otherwise.
+        """
+        if not self.gemini_config.get("stream_output", True):
+            return None
+        try:
+            ctx = self.server.request_context
+        except LookupError:
+            return None
+
+        progress_token = ctx.meta.progressToken if ctx.meta else None
+        request_id = str(ctx.request_id)
+        received = 0
+
+        async def forward(chunk: str) -> None:
+            nonlocal received
+            received += len(chunk)
+            if progress_token is not None:
+                await ctx.session.send_progress_notification(
+                    progress_token,
+                    received,
+                    message=chunk,
+                    related_request_id=request_id,
+                )
+            else:
+                await ctx.session.send_log_message(
+                    level="info",
+                    data=chunk,
+                    logger="gemini",
+                    related_request_id=request_id,
+                )
+
+        return forward
+
+    async def _handle_auto_consult(
+        self, arguments: dict[str, Any]
+    ) -> list[types.TextContent]:
+        """Handle automatic consultation requests
+
+        Background results are returned only to the session that submitted
+        the text, or to a caller presenting their tickets.
+        """
+        text = arguments.get("text", "")
+        tickets = arguments.get("tickets") or []
+        if not text and not tickets:
+            return [
+                types.TextContent(
+                    type="text", text="❌ Error: 'text' or 'tickets' is required"
+                )
+            ]
+
+        owner = self._session_owner()
+        lines: list[str] = []
+        if text:
+            lines.extend(await self._auto_consult_lines(text, arguments, owner))
+        for result in self.gemini.take_auto_consult_results(owner, tickets):
+            lines.extend(
+                ["", f"🤖 **Background Second Opinion** on: {result['excerpt']}"]
+            )
+            if result["status"] == "success":
+                lines.append(result["response"])
+            else:
+                lines.append(f"❌ Error: {result.get('error', 'Unknown error')}")
+        if not lines:
+            lines.append("⏳ No finished background consultations for these tickets")
+        return [types.TextContent(type="text", text="\n".join(lines).lstrip())]
+
+    async def _auto_consult_lines(
+        self, text: str, arguments: dict[str, Any], owner: str
+    ) -> list[str]:
+        """Score ``text`` and describe the auto-consult decision"""
+        decision = await self.gemini.auto_consult_text(
+            text, arguments.get("context", ""), owner
+        )
+        policy = self.gemini.auto_consult_policy
+        if decision["consult"]:
+            lines = [
+                f"🔍 **Uncertainty score {decision['score']:.1f}** "
+                f"(threshold {policy.threshold:.1f}): consulting Gemini in the "
+                f"background (ticket `{decision['ticket']}`)"
+            ]
+        elif decision["reason"] == "disabled":
+            lines = ["⏸️ Auto-consultation is disabled"]
+        elif decision["reason"] == "debounced":
+            lines = [
+                f"🔁 Uncertainty score {decision['score']:.1f}, but similar text was "
+                "consulted recently"
+            ]
+        else:
+            lines = [
+                f"✅ Uncertainty score {decision['score']:.1f} is below the "
+                f"threshold of {policy.threshold:.1f}; no consultation needed"
+            ]
+        if decision.get("patterns"):
+            lines.append("• **Patterns**: " + ", ".join(decision["patterns"]))
+        return lines
+
+    def _session_owner(self) -> str:
+        """Stable key of the calling client session, or "" outside a request"""
+        try:
+            session = self.server.request_context.session
+        except LookupError:
+            return ""
+        owner = self._session_owners.get(session)
+        if owner is None:
+            owner = self._session_owners[session] = uuid.uuid4().hex
+        return owner
 
     async def _handle_gemini_status(
         self, arguments: dict[str, Any]
     ) -> list[types.TextContent]:
         """Handle Gemini status requests"""
+        limiter = self.gemini.rate_limiter
+        stats = self.gemini.stats
         status_lines = [
             "🤖 **Gemini Integration Status**",
             "",
             f"• **Enabled**: {'✅ Yes' if self.gemini.enabled else '❌ No'}",
-            f"• **Auto-consult**: {'✅ Yes' if self.gemini.auto_consult else '❌ No'}",
-            f"• **CLI Command**: `{self.gemini.cli_command}`",
+            f"• **Auto-consult**: {'✅ Yes' if self.gemini.auto_consult else '❌ No'} "
+            f"({self.gemini.auto_consult_policy.triggered} triggered, "
+            f"{self.gemini.auto_consult_policy.debounced} debounced)",
+            self._backend_line(),
             f"• **Model**: {self.gemini.model}",
-            f"• **Rate Limit**: {self.gemini.rate_limit_delay}s between calls",
+            f"• **Rate Limit**: {limiter.rate:.2f} calls/s, burst {limiter.burst}, "
+            f"{limiter.max_concurrency} concurrent",
             f"• **Timeout**: {self.gemini.timeout}s",
             "",
             "📊 **Statistics**:",
-            f"• **Total Consultations**: {len(self.gemini.consultation_log)}",
+            f"• **Total Consultations**: {stats.total}",
         ]
 
-        if self.gemini.consultation_log:
-            recent = self.gemini.consultation_log[-1]
-            status_lines.append(f"• **Last Consultation**: {recent['timestamp']}")
+        if stats.total:
+            by_status = stats.by_status
+            status_lines.append(
+                f"• **Succeeded / Failed / Cached**: {by_status.get('success', 0)} / "
+                f"{by_status.get('error', 0)} / {by_status.get('cached', 0)}"
+            )
+        if stats.retries:
+            status_lines.append(f"• **Retries**: {stats.retries}")
+        journal = self.gemini.journal
+        if journal is not None:
+            status_lines.append(
+                f"• **Journal**: {journal.written} written to `{journal.directory}`"
+            )
+        if stats.latency.count:
+            p50, p95, p99 = (stats.latency.quantile(q) for q in (0.50, 0.95, 0.99))
+            status_lines.append(
+                f"• **Latency**: p50 {p50:.2f}s, p95 {p95:.2f}s, p99 {p99:.2f}s"
+            )
+        if stats.last_timestamp is not None:
+            rates = [stats.throughput.rate(window) for window in (1, 5, 15)]
+            status_lines.extend(
+                [
+                    "• **Throughput (1/5/15 min)**: "
+                    + " / ".join(f"{rate:.2f}" for rate in rates)
+                    + " per minute",
+                    "• **Last Consultation**: "
+                    f"{datetime.fromtimestamp(stats.last_timestamp).isoformat()}",
+                ]
+            )
+
+        breaker = self.gemini.breaker
+        if breaker.enabled:
+            breaker_lines = [
+                "",
+                "🔌 **Circuit Breaker**:",
+                f"• **State**: {breaker.state}",
+                f"• **Consecutive Failures**: {breaker.consecutive_failures}",
+                f"• **Opened / Rejected**: {breaker.opened} / {breaker.rejected}",
+            ]
+            if breaker.retry_after():
+                breaker_lines.append(f"• **Probe In**: {breaker.retry_after():.0f}s")
+            if breaker.state != "closed" and breaker.last_error:
+                breaker_lines.append(f"• **Last Error**: {breaker.last_error}")
+            status_lines.extend(breaker_lines)
+
+        status_lines.extend(
+            [
+                "",
+                "🚦 **Admission Queue**:",
+                f"• **Waiting / Running**: {limiter.waiting} / {limiter.active}",
+                "• **Queued by Priority**: "
+                + ", ".join(
+                    f"{priority} {depth}"
+                    for priority, depth in limiter.waiting_by_class.items()
+                ),
+                f"• **Wait Time**: {limiter.average_wait_time:.2f}s avg, "
+                f"{limiter.max_wait_time:.2f}s max",
+            ]
+        )
+        if limiter.expired:
+            status_lines.append(
+                f"• **Expired in Queue**: {limiter.expired} past their deadline"
+            )
+
+        shared = limiter.shared
+        if shared is not None:
+            status_lines.append(
+                f"• **Shared Concurrency**: {shared.active}/{shared.capacity} "
+                f"running, {shared.waiting} waiting, "
+                f"across {len(get_registry())} project(s)"
+            )
+
+        processes = self.gemini.processes
+        status_lines.append(
+            f"• **Live CLI Processes**: {processes.live}/{processes.max_processes} "
+            f"({processes.terminated} terminated, {processes.killed} killed)"
+        )
+
+        pool = self.gemini.worker_pool
+        if pool is not None:
+            status_lines.append(
+                f"• **Warm Workers**: {pool.idle}/{pool.size} ready, "
+                f"{pool.hits} warm / {pool.misses} cold starts"
+            )
+
+        if self.gemini.hedge_enabled:
+            hedging = self.gemini.hedging
+            status_lines.append(
+                f"• **Hedged Requests**: {hedging.launched} of {hedging.eligible} "
+                f"({hedging.wins} won, {hedging.losses} lost), "
+                f"delay {hedging.delay():.1f}s"
+            )
+
+        cache = self.gemini.cache
+        status_lines.extend(
+            [
+                "",
+                "♻️ **Response Cache**:",
+                f"• **Enabled**: {'✅ Yes' if self.gemini.cache_enabled else '❌ No'}",
+                f"• **Entries**: {len(cache)} in memory"
+                + (f", persisted to `{cache.cache_dir}`" if cache.cache_dir else ""),
+                f"• **Hits / Misses**: {cache.hits} / {cache.misses} "
+                f"({cache.hit_rate:.0%} hit rate)",
+                f"• **Coalesced Calls**: {self.gemini.inflight.coalesced} "
+                f"({self.gemini.inflight.in_flight()} in flight)",
+            ]
+        )
+        similarity = self.gemini.similarity
+        if similarity is not None:
+            status_lines.append(
+                f"• **Similar-Query Reuse**: {similarity.reused} of "
+                f"{similarity.lookups} lookups, threshold {similarity.threshold:.2f}"
+            )
+
+        status_lines.extend(
+            [
+                "",
+                "📄 **File Context**:",
+                f"• **Files Indexed**: {len(self.files)}",
+                f"• **Unchanged / Read / Split**: {self.files.unchanged} / "
+                f"{self.files.reads} / {self.files.splits}",
+            ]
+        )
 
         return [types.TextContent(type="text", text="\n".join(status_lines))]
 
+    async def _handle_gemini_history(
+        self, arguments: dict[str, Any]
+    ) -> list[types.TextContent]:
+        """Handle consultation history requests"""
+        journal = self.gemini.journal
+        if journal is None:
+            return [
+                types.TextContent(
+                    type="text",
+                    text="❌ The consultation journal is disabled. "
+                    "Set `journal_dir` to enable it.",
+                )
+            ]
+
+        try:
+            since, until = (
+                datetime.fromisoformat(arguments[key]).timestamp()
+                if arguments.get(key)
+                else None
+                for key in ("since", "until")
+            )
+        except ValueError as e:
+            return [types.TextContent(type="text", text=f"❌ Error: {e}")]
+
+        limit = min(max(1, int(arguments.get("limit", 20))), 100)
+        page = max(1, int(arguments.get("page", 1)))
+        records = await journal.query(
+            since=since,
+            until=until,
+            status=arguments.get("status"),
+            offset=(page - 1) * limit,
+            limit=limit,
+        )
+
+        lines = [f"📜 **Consultation History** (page {page})", ""]
+        if not records:
+            lines.append("No consultations found.")
+        for record in records:
+            lines.append(
+                f"• `{record['timestamp']}` **{record['status']}** "
+                f"{record['execution_time']:.2f}s: {record['query']}"
+            )
+        return [types.TextContent(type="text", text="\n".join(lines))]
+
+    async def _handle_gemini_metrics(
+        self, arguments: dict[str, Any]
+    ) -> list[types.TextContent]:
+        """Handle metrics export requests"""
+        text = self.gemini.metrics.registry.render()
+        return [types.TextContent(type="text", text=text)]
+
+    def _backend_line(self) -> str:
+        """Describe the backend consultations run on"""
+        backend = self.gemini.backend
+        if isinstance(backend, HTTPBackend):
+            protocol = "HTTP/2" if backend.http2 else "HTTP/1.1"
+            return f"• **Backend**: Gemini API at `{backend.base_url}` ({protocol})"
+        return f"• **CLI Command**: `{self.gemini.cli_command}`"
+
     async def _handle_toggle_auto_consult(
         self, arguments: dict[str, Any]
     ) -> list[types.TextContent]:
@@ -192,8 +823,141 @@ class MCPServer:
         ]
 
     async def run(self) -> None:
-        """Run the MCP server"""
-        await mcp.server.stdio.run(self.server, log_level="INFO")
+        """Run the MCP server over stdio"""
+        await self.gemini.start()
+        try:
+            async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    self.server.create_initialization_options(),
+                )
+        finally:
+            await get_registry().release(self.gemini)
+
+    def http_app(
+        self,
+        stateless: bool = False,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        allowed_hosts: Sequence[str] = (),
+    ) -> "Starlette":
+        """Build an ASGI app serving MCP over Streamable HTTP at ``/mcp``
+
+        Every client session is handled by this server, so all of them share
+        one Gemini integration: its cache, rate limit and request coalescing
+        work across clients. Stateless mode opens no session per client and
+        suits load-balanced deployments, at the cost of server-initiated
+        notifications such as streamed output.
+
+        Requests whose Host or Origin header names anything but the loopback
+        addresses, ``host`` or ``allowed_hosts`` on ``port`` (any port when
+        0) are rejected, so web pages cannot reach the server through DNS
+        rebinding.
+        """
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        from starlette.applications import Starlette
+        from starlette.routing import Route
+
+        manager = StreamableHTTPSessionManager(
+            app=self.server,
+            stateless=stateless,
+            security_settings=transport_security(host, port, allowed_hosts),
+        )
+
+        @asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[None]:
+            await self.gemini.start()
+            try:
+                async with manager.run():
+                    yield
+            finally:
+                await get_registry().release(self.gemini)
+
+        return Starlette(
+            routes=[Route("/mcp", endpoint=_StreamableHTTPEndpoint(manager))],
+            lifespan=lifespan,
+        )
+
+    async def run_http(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        max_connections: int = 100,
+        shutdown_timeout: int = 10,
+        stateless: bool = False,
+        allow_remote: bool = False,
+        allowed_hosts: Sequence[str] = (),
+    ) -> None:
+        """Run the MCP server over Streamable HTTP until interrupted
+
+        Connections beyond ``max_connections`` are refused with 503. On
+        SIGINT or SIGTERM the server stops accepting connections and gives
+        open ones up to ``shutdown_timeout`` seconds to finish before the
+        sessions and the Gemini integration are shut down. Binding to an
+        address other than loopback requires ``allow_remote``.
+        """
+        import uvicorn
+
+        if not allow_remote and not is_loopback(host):
+            raise ValueError(
+                f"Refusing to serve on non-loopback address {host}; "
+                "pass --allow-remote to expose the server to the network"
+            )
+        config = uvicorn.Config(
+            self.http_app(
+                stateless=stateless, host=host, port=port, allowed_hosts=allowed_hosts
+            ),
+            host=host,
+            port=port,
+            # uvicorn counts the connection being admitted against the limit
+            limit_concurrency=max_connections + 1,
+            timeout_graceful_shutdown=shutdown_timeout,
+            log_level="info",
+        )
+        await uvicorn.Server(config).serve()
+
+
+def is_loopback(host: str) -> bool:
+    """Whether ``host`` names a loopback address"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+def transport_security(
+    host: str, port: int, allowed_hosts: Sequence[str] = ()
+) -> "TransportSecuritySettings":
+    """Host and Origin checks for the HTTP transport
+
+    Loopback names are always allowed; ``host`` is added unless it is a
+    wildcard bind address. A ``port`` of 0 allows any port.
+    """
+    from mcp.server.transport_security import TransportSecuritySettings
+
+    names = ["127.0.0.1", "localhost", "[::1]"]
+    if host not in ("0.0.0.0", "::", "") and not is_loopback(host):
+        names.append(f"[{host}]" if ":" in host else host)
+    names.extend(allowed_hosts)
+    suffix = f":{port}" if port else ":*"
+    return TransportSecuritySettings(
+        enable_dns_rebinding_protection=True,
+        allowed_hosts=[name + suffix for name in names],
+        allowed_origins=[f"http://{name}{suffix}" for name in names],
+    )
+
+
+class _StreamableHTTPEndpoint:
+    """ASGI endpoint handing requests to the session manager"""
+
+    def __init__(self, manager: "StreamableHTTPSessionManager"):
+        self.manager = manager
+
+    async def __call__(self, scope: "Scope", receive: "Receive", send: "Send") -> None:
+        await self.manager.handle_request(scope, receive, send)
 
 
 # Main function moved to __main__.py for proper packaging
@@ -0,0 +1,219 @@
+"""
+Similarity Module
+Index of past consultations for reusing answers to near-duplicate questions
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Any
+
+_WORD = re.compile(r"\w+")
+FINGERPRINT_BITS = 64
+
+
+def normalize(text: str) -> list[str]:
+    """Lowercased word tokens, ignoring whitespace and punctuation"""
+    return _WORD.findall(text.lower())
+
+
+def _hash64(feature: str) -> int:
+    """Stable 64-bit hash, so fingerprints do not depend on PYTHONHASHSEED"""
+    return int.from_bytes(
+        hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big"
+    )
+
+
+def shingles(tokens: list[str]) -> frozenset[int]:
+    """Hashed word bigrams of ``tokens`` (the token itself when there is one)"""
+    if len(tokens) < 2:
+        return frozenset(_hash64(token) for token in tokens)
+    pairs = zip(tokens, tokens[1:], strict=False)
+    return frozenset(_hash64(f"{a} {b}") for a, b in pairs)
+
+
+def simhash(features: frozenset[int]) -> int:
+    """64-bit SimHash of hashed features
+
+    Similar feature sets get fingerprints that differ in few bits.
+    """
+    counts = [0] * FINGERPRINT_BITS
+    for feature in features:
+        for bit in range(FINGERPRINT_BITS):
+            counts[bit] += 1 if feature >> bit & 1 else -1
+    return sum(1 << bit for bit, count in enumerate(counts) if count > 0)
+
+
+def jaccard(a: frozenset[int], b: frozenset[int]) -> float:
+    """Jaccard similarity of two sets; two empty sets are identical"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class _Entry:
+    """A stored consultation and its signatures"""
+
+    __slots__ = (
+        "query",
+        "context",
+        "fingerprint",
+        "model",
+        "comparison_mode",
+        "value",
+        "created",
+    )
+
+    def __init__(
+        self,
+        query: frozenset[int],
+        context: frozenset[int],
+        fingerprint: int,
+        model: str,
+        comparison_mode: bool,
+        value: dict[str, Any],
+    ):
+        self.query = query
+        self.context = context
+        self.fingerprint = fingerprint
+        self.model = model
+        self.comparison_mode = comparison_mode
+        self.value = value
+        self.created = time.time()
+
+
+class SimilarityIndex:
+    """Find stored answers to questions similar to a new one
+
+    Queries are normalized to lowercase words and compared as sets of word
+    bigrams. Each stored query's SimHash fingerprint is split into ``bands``
+    bands that act as locality-sensitive hash buckets, so a lookup only
+    compares against entries sharing a band. Fingerprints within
+    ``bands - 1`` bits of each other are always found this way. Candidates
+    are then scored by the Jaccard similarity of their query and of their
+    context; the lower of the two must reach ``threshold`` for the answer to
+    be reused. Entries expire after ``ttl`` seconds and at most
+    ``max_entries`` are kept.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        max_entries: int = 1024,
+        ttl: float = 3600.0,
+        bands: int = 8,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.bands = bands
+        self._band_bits = FINGERPRINT_BITS // bands
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._buckets: list[dict[int, set[int]]] = [{} for _ in range(bands)]
+        self._ids = 0
+
+        # Statistics
+        self.lookups = 0
+        self.reused = 0
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "SimilarityIndex":
+        """Build an index from integration config keys"""
+        return cls(
+            threshold=config.get("similarity_threshold", 0.85),
+            max_entries=config.get("similarity_max_entries", 1024),
+            ttl=config.get("cache_ttl", 3600.0),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(
+        self,
+        query: str,
+        context: str,
+        model: str,
+        comparison_mode: bool,
+        value: dict[str, Any],
+    ) -> None:
+        """Store the answer to a consultation"""
+        query_shingles = shingles(normalize(query))
+        entry = _Entry(
+            query_shingles,
+            shingles(normalize(context)),
+            simhash(query_shingles),
+            model,
+            comparison_mode,
+            value,
+        )
+        self._ids += 1
+        self._entries[self._ids] = entry
+        for band, key in enumerate(self._band_keys(entry.fingerprint)):
+            self._buckets[band].setdefault(key, set()).add(self._ids)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def find(
+        self, query: str, context: str, model: str, comparison_mode: bool
+    ) -> tuple[dict[str, Any], float] | None:
+        """Return the most similar stored answer and its score, if any
+
+        Only answers from the same model and comparison mode are considered.
+        """
+        self.lookups += 1
+        query_shingles = shingles(normalize(query))
+        context_shingles: frozenset[int] | None = None
+        fingerprint = simhash(query_shingles)
+
+        candidates: set[int] = set()
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        best: tuple[int, float] | None = None
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            if self._expired(entry):
+                self._remove(entry_id)
+                continue
+            if entry.model != model or entry.comparison_mode != comparison_mode:
+                continue
+            score = jaccard(query_shingles, entry.query)
+            if score < self.threshold or (best is not None and score <= best[1]):
+                continue
+            if context_shingles is None:
+                context_shingles = shingles(normalize(context))
+            score = min(score, jaccard(context_shingles, entry.context))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (entry_id, score)
+
+        if best is None:
+            return None
+        entry_id, score = best
+        self._entries.move_to_end(entry_id)
+        self.reused += 1
+        return self._entries[entry_id].value, score
+
+    def clear(self) -> None:
+        """Forget every stored answer"""
+        self._entries.clear()
+        for buckets in self._buckets:
+            buckets.clear()
+
+    def _band_keys(self, fingerprint: int) -> list[int]:
+        mask = (1 << self._band_bits) - 1
+        return [
+            fingerprint >> (band * self._band_bits) & mask for band in range(self.bands)
+        ]
+
+    def _expired(self, entry: _Entry) -> bool:
+        return self.ttl > 0 and time.time() - entry.created > self.ttl
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        for band, key in enumerate(self._band_keys(entry.fingerprint)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[band][key]
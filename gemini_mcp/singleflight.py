@@ -0,0 +1,65 @@
+"""
+Single-flight Module
+Coalesces identical in-flight calls so that they share one execution
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    """A shared in-flight execution and the number of callers waiting on it"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """Run at most one execution per key at a time
+
+    Callers that arrive while an execution for the same key is running wait
+    for that execution instead of starting their own. The shared execution is
+    shielded from individual cancellations and is only cancelled once every
+    waiter has gone away.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, _Call[T]] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """Run ``fn`` or join the running call for ``key``
+
+        Returns the result and whether it was shared with an earlier caller.
+        """
+        call = self._calls.get(key)
+        shared = call is not None
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                self._forget(key, call)
+
+    def in_flight(self) -> int:
+        """Number of distinct executions currently running"""
+        return len(self._calls)
+
+    def _forget(self, key: str, call: Any) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -0,0 +1,201 @@
+"""
+Consultation Statistics Module
+Bounded consultation history and constant-size running aggregates
+"""
+
+import math
+import time
+from array import array
+from collections import deque
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any
+
+
+class ConsultationRecord:
+    """Compact record of one consultation"""
+
+    __slots__ = (
+        "id",
+        "timestamp",
+        "query",
+        "status",
+        "execution_time",
+        "spawn_time",
+        "warm_worker",
+        "first_chunk_time",
+        "phases",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        query: str,
+        status: str,
+        execution_time: float = 0.0,
+        spawn_time: float = 0.0,
+        warm_worker: bool = False,
+        first_chunk_time: float | None = None,
+        phases: dict[str, float] | None = None,
+        timestamp: float | None = None,
+    ):
+        self.id = id
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.query = query[:200] + "..." if len(query) > 200 else query
+        self.status = status
+        self.execution_time = execution_time
+        self.spawn_time = spawn_time
+        self.warm_worker = warm_worker
+        self.first_chunk_time = first_chunk_time
+        self.phases = phases
+
+    def __getitem__(self, key: str) -> Any:
+        """Dict-style access, with the timestamp in ISO format"""
+        if key == "timestamp":
+            return datetime.fromtimestamp(self.timestamp).isoformat()
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the record as a plain dict"""
+        return {key: self[key] for key in self.__slots__}
+
+
+class ConsultationLog:
+    """Fixed-capacity ring buffer of the most recent consultations"""
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._records: deque[ConsultationRecord] = deque(maxlen=capacity)
+
+    def append(self, record: ConsultationRecord) -> None:
+        """Add a record, evicting the oldest one when full"""
+        self._records.append(record)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[ConsultationRecord]:
+        return iter(self._records)
+
+    def __getitem__(self, index: int) -> ConsultationRecord:
+        return self._records[index]
+
+
+class LatencySketch:
+    """Log-bucketed histogram for streaming quantile estimates
+
+    Values are counted in buckets whose bounds grow by ``1 + relative_error``
+    between ``min_value`` and ``max_value``, so quantiles are accurate to
+    within that relative error and memory stays fixed however many values
+    are added.
+    """
+
+    def __init__(
+        self,
+        relative_error: float = 0.02,
+        min_value: float = 1e-3,
+        max_value: float = 1e4,
+    ):
+        self._gamma = 1 + relative_error
+        self._log_gamma = math.log(self._gamma)
+        self._min_value = min_value
+        self._size = self._raw_bucket(max_value) + 1
+        self._counts = array("Q", bytes(8 * self._size))
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Record one value"""
+        self._counts[self._bucket(value)] += 1
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate the ``q`` quantile, or None when empty"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen > rank:
+                return self._value(index)
+        return self._value(self._size - 1)
+
+    def _bucket(self, value: float) -> int:
+        return min(self._raw_bucket(value), self._size - 1)
+
+    def _raw_bucket(self, value: float) -> int:
+        if value <= self._min_value:
+            return 0
+        return math.ceil(math.log(value / self._min_value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        # Midpoint of the bucket in log space
+        if index == 0:
+            return self._min_value
+        return float(self._min_value * self._gamma ** (index - 0.5))
+
+
+class ThroughputWindow:
+    """Per-minute counters covering a sliding window of recent minutes"""
+
+    def __init__(self, minutes: int = 15):
+        self.minutes = minutes
+        self._counts = [0] * minutes
+        self._stamps = [-1] * minutes
+
+    def add(self, now: float | None = None) -> None:
+        """Count one event"""
+        minute = int((time.time() if now is None else now) // 60)
+        slot = minute % self.minutes
+        if self._stamps[slot] != minute:
+            self._stamps[slot] = minute
+            self._counts[slot] = 0
+        self._counts[slot] += 1
+
+    def rate(self, minutes: int, now: float | None = None) -> float:
+        """Average events per minute over the last ``minutes`` minutes"""
+        current = int((time.time() if now is None else now) // 60)
+        minutes = min(minutes, self.minutes)
+        total = sum(
+            count
+            for count, stamp in zip(self._counts, self._stamps, strict=True)
+            if current - minutes < stamp <= current
+        )
+        return total / minutes
+
+
+class ConsultationStats:
+    """Running aggregates over every consultation since startup"""
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.by_status: dict[str, int] = {}
+        self.latency = LatencySketch()
+        self.throughput = ThroughputWindow()
+        self.last_timestamp: float | None = None
+        self.retries = 0
+
+    def record(self, status: str, execution_time: float | None = None) -> None:
+        """Account for one finished consultation"""
+        self.total += 1
+        self.by_status[status] = self.by_status.get(status, 0) + 1
+        if execution_time is not None:
+            self.latency.add(execution_time)
+        self.throughput.add()
+        self.last_timestamp = time.time()
+
+    def summary(self) -> dict[str, Any]:
+        """Snapshot of the aggregates"""
+        return {
+            "total": self.total,
+            "by_status": dict(self.by_status),
+            "p50": self.latency.quantile(0.50),
+            "p95": self.latency.quantile(0.95),
+            "p99": self.latency.quantile(0.99),
+            "retries": self.retries,
+            "per_minute": {
+                window: self.throughput.rate(window) for window in (1, 5, 15)
+            },
+        }
@@ -0,0 +1,80 @@
+"""
+Streaming Module
+Helpers for delivering Gemini CLI output incrementally
+"""
+
+import asyncio
+import codecs
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+ChunkCallback = Callable[[str], Awaitable[None]]
+
+# Size of each read from the CLI's stdout
+READ_CHUNK_SIZE = 4096
+
+
+async def iter_stream(
+    stream: asyncio.StreamReader, chunk_size: int = READ_CHUNK_SIZE
+) -> AsyncIterator[str]:
+    """Yield decoded text from a byte stream as soon as it arrives
+
+    Multi-byte UTF-8 sequences split across reads are held back until they
+    are complete.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        data = await stream.read(chunk_size)
+        if not data:
+            break
+        text = decoder.decode(data)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+class ChunkBroadcast:
+    """Fan out chunks of one consultation to every subscribed caller
+
+    Chunks published before a subscriber joins are replayed to it, so callers
+    that coalesce onto a running consultation still see the whole output in
+    order. A failing subscriber is dropped without affecting the others.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: list[str] = []
+        self._subscribers: list[ChunkCallback] = []
+        self._lock = asyncio.Lock()
+
+    async def publish(self, chunk: str) -> None:
+        """Record a chunk and deliver it to current subscribers"""
+        async with self._lock:
+            self.chunks.append(chunk)
+            for callback in list(self._subscribers):
+                await self._deliver(callback, chunk)
+
+    async def subscribe(self, callback: ChunkCallback) -> None:
+        """Replay earlier chunks to ``callback`` and deliver later ones"""
+        async with self._lock:
+            for chunk in self.chunks:
+                if not await self._deliver(callback, chunk):
+                    return
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: ChunkCallback) -> None:
+        """Stop delivering chunks to ``callback``"""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    async def _deliver(self, callback: ChunkCallback, chunk: str) -> bool:
+        try:
+            await callback(chunk)
+            return True
+        except Exception as e:
+            logger.warning(f"Dropping failing stream subscriber: {e}")
+            self.unsubscribe(callback)
+            return False
@@ -0,0 +1,69 @@
+"""
+Tracing Module
+Per-phase timing spans of a consultation and hooks to forward them
+"""
+
+import logging
+import time
+from collections.abc import Sequence
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+# Phases in the order they happen during a consultation
+PHASES = ("prepare", "queue_wait", "spawn", "first_byte", "complete", "decode")
+
+
+class Span:
+    """One timed phase of a consultation"""
+
+    __slots__ = ("name", "start", "duration")
+
+    def __init__(self, name: str, start: float, duration: float):
+        self.name = name
+        self.start = start  # wall-clock epoch seconds
+        self.duration = duration
+
+    @classmethod
+    def since(cls, name: str, start: float) -> "Span":
+        """A span from ``start`` until now"""
+        return cls(name, start, time.time() - start)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the span as a plain dict"""
+        return {"name": self.name, "start": self.start, "duration": self.duration}
+
+    def __repr__(self) -> str:
+        return (
+            f"Span({self.name!r}, start={self.start:.6f}, duration={self.duration:.6f})"
+        )
+
+
+class SpanHook(Protocol):
+    """Receives the spans of every finished consultation
+
+    Hooks are called synchronously on the event loop, so they should hand
+    the spans off (for example to a tracer's exporter queue) rather than
+    block.
+    """
+
+    def __call__(self, consultation_id: str, spans: Sequence[Span]) -> None: ...
+
+
+def phase_durations(spans: Sequence[Span]) -> dict[str, float]:
+    """Total duration per phase, in PHASES order"""
+    totals: dict[str, float] = {}
+    for span in spans:
+        totals[span.name] = totals.get(span.name, 0.0) + span.duration
+    return {name: totals[name] for name in PHASES if name in totals}
+
+
+def emit_spans(
+    hooks: Sequence[SpanHook], consultation_id: str, spans: Sequence[Span]
+) -> None:
+    """Forward spans to every hook; a failing hook is logged and skipped"""
+    for hook in hooks:
+        try:
+            hook(consultation_id, spans)
+        except Exception as e:
+            logger.warning(f"Span hook failed: {e}")
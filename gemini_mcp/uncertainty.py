@@ -0,0 +1,196 @@
+"""
+Uncertainty Detection Module
+Single-pass matching of uncertainty, decision and critical-operation phrases
+"""
+
+import re
+from collections.abc import Sequence
+
+# Uncertainty patterns that trigger automatic Gemini consultation
+UNCERTAINTY_PATTERNS = [
+    r"\bI'm not sure\b",
+    r"\bI think\b",
+    r"\bpossibly\b",
+    r"\bprobably\b",
+    r"\bmight be\b",
+    r"\bcould be\b",
+    r"\bI believe\b",
+    r"\bIt seems\b",
+    r"\bappears to be\b",
+    r"\buncertain\b",
+    r"\bI would guess\b",
+    r"\blikely\b",
+    r"\bperhaps\b",
+    r"\bmaybe\b",
+    r"\bI assume\b",
+]
+
+# Complex decision patterns that benefit from second opinions
+COMPLEX_DECISION_PATTERNS = [
+    r"\bmultiple approaches\b",
+    r"\bseveral options\b",
+    r"\btrade-offs?\b",
+    r"\bconsider(?:ing)?\b",
+    r"\balternatives?\b",
+    r"\bpros and cons\b",
+    r"\bweigh(?:ing)? the options\b",
+    r"\bchoice between\b",
+    r"\bdecision\b",
+]
+
+# Critical operations that should trigger consultation
+CRITICAL_OPERATION_PATTERNS = [
+    r"\bproduction\b",
+    r"\bdatabase migration\b",
+    r"\bsecurity\b",
+    r"\bauthentication\b",
+    r"\bencryption\b",
+    r"\bAPI key\b",
+    r"\bcredentials?\b",
+    r"\bperformance\s+critical\b",
+]
+
+PATTERN_FAMILIES: tuple[tuple[str, Sequence[str]], ...] = (
+    ("uncertainty", UNCERTAINTY_PATTERNS),
+    ("complex_decision", COMPLEX_DECISION_PATTERNS),
+    ("critical_operation", CRITICAL_OPERATION_PATTERNS),
+)
+
+# Longest match the incremental scanner can see across chunk boundaries
+DEFAULT_OVERLAP = 256
+
+
+class UncertaintyMatcher:
+    """Match every pattern family with one pass over the text
+
+    All patterns are combined into a single zero-width alternation, so the
+    engine visits each position once and reports which pattern starts there.
+    Because alternatives are tried in order, only later patterns still need an
+    anchored check at a hit position, which keeps results identical to
+    searching each pattern separately, and those checks only try patterns
+    that are still missing and can start with the character at the hit.
+    """
+
+    def __init__(
+        self, families: Sequence[tuple[str, Sequence[str]]] = PATTERN_FAMILIES
+    ):
+        self.labels = [
+            f"{family}: {pattern}"
+            for family, patterns in families
+            for pattern in patterns
+        ]
+        self._sources = [pattern for _, patterns in families for pattern in patterns]
+        self._patterns = [re.compile(source, re.IGNORECASE) for source in self._sources]
+        self._combined = self._compile_combined(self._sources)
+        # Patterns that can start with a given (lowercase) character
+        self._by_first: dict[str, list[int]] = {}
+        for index, source in enumerate(self._sources):
+            first = source.removeprefix(r"\b")[:1]
+            if not first.isalnum():
+                self._by_first = {}
+                break
+            self._by_first.setdefault(first.lower(), []).append(index)
+
+    def scan(
+        self, text: str, found: list[bool], pos: int = 0, end: int | None = None
+    ) -> None:
+        """Mark patterns whose match starts in ``text[pos:end]`` as found"""
+        if end is None:
+            end = len(text)
+        missing = found.count(False)
+        everything = range(len(found))
+        while missing and pos < end:
+            match = self._combined.search(text, pos)
+            if match is None or match.start() >= end:
+                return
+            start = match.start()
+            assert match.lastgroup is not None
+            first = int(match.lastgroup[1:])
+            if not found[first]:
+                found[first] = True
+                missing -= 1
+            # Earlier alternatives already failed here; later ones may match too
+            candidates = (
+                self._by_first.get(text[start].lower(), ())
+                if self._by_first
+                else everything
+            )
+            for index in candidates:
+                if (
+                    index > first
+                    and not found[index]
+                    and self._patterns[index].match(text, start)
+                ):
+                    found[index] = True
+                    missing -= 1
+            pos = start + 1
+
+    def detect(self, text: str) -> list[str]:
+        """Return the labels of every pattern found in ``text``"""
+        found = [False] * len(self._patterns)
+        self.scan(text, found)
+        return self.labels_for(found)
+
+    def labels_for(self, found: list[bool]) -> list[str]:
+        """Return labels for found patterns in declaration order"""
+        return [label for label, hit in zip(self.labels, found, strict=True) if hit]
+
+    def scanner(self, overlap: int = DEFAULT_OVERLAP) -> "UncertaintyScanner":
+        """Create an incremental scanner backed by this matcher"""
+        return UncertaintyScanner(self, overlap)
+
+    @staticmethod
+    def _compile_combined(sources: list[str]) -> re.Pattern[str]:
+        """Compile a zero-width alternation of every pattern"""
+        # Hoist a shared leading word boundary so most positions fail fast
+        prefix = ""
+        if all(source.startswith(r"\b") for source in sources):
+            prefix = r"\b"
+            sources = [source[2:] for source in sources]
+        # Cheaply reject positions that cannot start any pattern
+        if all(source[:1].isalnum() for source in sources):
+            first_chars = "".join(sorted({source[0].lower() for source in sources}))
+            prefix += f"(?=[{first_chars}])"
+
+        alternation = "|".join(
+            f"(?P<p{position}>{source})" for position, source in enumerate(sources)
+        )
+        return re.compile(f"{prefix}(?=(?:{alternation}))", re.IGNORECASE)
+
+
+class UncertaintyScanner:
+    """Incrementally detect patterns in text that arrives in chunks
+
+    Each chunk is scanned once; only the last ``overlap`` characters are kept
+    so matches spanning a chunk boundary are still found. Matches longer than
+    ``overlap`` characters can be missed.
+    """
+
+    def __init__(self, matcher: UncertaintyMatcher, overlap: int = DEFAULT_OVERLAP):
+        self.matcher = matcher
+        self.overlap = max(1, overlap)
+        self.found = [False] * len(matcher.labels)
+        self._buffer = ""
+        self._pos = 0
+
+    def feed(self, chunk: str) -> list[str]:
+        """Scan a new chunk and return every pattern found so far"""
+        self._buffer += chunk
+        safe_end = len(self._buffer) - self.overlap
+        if safe_end > self._pos:
+            if not all(self.found):
+                self.matcher.scan(self._buffer, self.found, self._pos, safe_end)
+            # Keep one decided character so word boundaries stay correct
+            self._buffer = self._buffer[safe_end - 1 :]
+            self._pos = 1
+        return self.matcher.labels_for(self.found)
+
+    def finish(self) -> list[str]:
+        """Scan any buffered text and return every pattern found"""
+        if not all(self.found):
+            self.matcher.scan(self._buffer, self.found, self._pos)
+        self._pos = len(self._buffer)
+        return self.matcher.labels_for(self.found)
+
+
+default_matcher = UncertaintyMatcher()
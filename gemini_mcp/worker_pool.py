@@ -0,0 +1,134 @@
+"""
+Warm Worker Pool Module
+Keeps pre-spawned Gemini CLI processes ready so consultations skip startup
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any
+
+from .process import ProcessSupervisor
+
+logger = logging.getLogger(__name__)
+
+
+class _Worker:
+    """An idle CLI process waiting for its prompt on stdin"""
+
+    __slots__ = ("process", "spawned_at")
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.spawned_at = time.monotonic()
+
+    def healthy(self, max_idle: float) -> bool:
+        """Whether the process is still alive and not stale"""
+        if self.process.returncode is not None:
+            return False
+        return max_idle <= 0 or time.monotonic() - self.spawned_at < max_idle
+
+
+class WarmWorkerPool:
+    """Pool of pre-spawned Gemini CLI processes
+
+    The Gemini CLI answers a single prompt read from stdin and then exits, so
+    each worker serves exactly one consultation. Workers are spawned ahead of
+    time so Node.js startup and authentication happen off the request path,
+    and the pool is topped back up in the background after every checkout.
+    Workers that died or sat idle longer than ``max_idle`` are recycled.
+    Processes are spawned and reaped through ``supervisor``, so idle workers
+    count towards its process cap.
+    """
+
+    def __init__(
+        self,
+        cmd: list[str],
+        size: int,
+        max_idle: float = 300.0,
+        supervisor: ProcessSupervisor | None = None,
+    ):
+        self.cmd = cmd
+        self.size = size
+        self.max_idle = max_idle
+        self.supervisor = supervisor or ProcessSupervisor()
+        self._idle: deque[_Worker] = deque()
+        self._spawning = 0
+        self._tasks: set[asyncio.Task[Any]] = set()
+        self._closed = False
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self.spawn_failures = 0
+
+    @property
+    def idle(self) -> int:
+        """Number of warm workers ready to take a prompt"""
+        return len(self._idle)
+
+    def start(self) -> None:
+        """Begin filling the pool in the background"""
+        self._replenish()
+
+    async def acquire(self) -> asyncio.subprocess.Process | None:
+        """Check out a healthy warm worker, or None if none is ready"""
+        process = None
+        while self._idle:
+            worker = self._idle.popleft()
+            if worker.healthy(self.max_idle):
+                process = worker.process
+                break
+            self.recycled += 1
+            await self._terminate(worker.process)
+
+        if process is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        self._replenish()
+        return process
+
+    async def close(self) -> None:
+        """Stop replenishing and terminate every idle worker"""
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        while self._idle:
+            await self._terminate(self._idle.popleft().process)
+
+    def _replenish(self) -> None:
+        if self._closed:
+            return
+        missing = self.size - len(self._idle) - self._spawning
+        for _ in range(missing):
+            self._spawning += 1
+            task = asyncio.ensure_future(self._spawn())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _spawn(self) -> None:
+        try:
+            process = await self.supervisor.spawn(
+                *self.cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError as e:
+            self.spawn_failures += 1
+            logger.warning(f"Failed to spawn warm Gemini CLI worker: {e}")
+            return
+        finally:
+            self._spawning -= 1
+
+        if self._closed:
+            await self._terminate(process)
+            return
+        self._idle.append(_Worker(process))
+
+    async def _terminate(self, process: asyncio.subprocess.Process) -> None:
+        await self.supervisor.reap(process)
@@ -0,0 +1,44 @@
+"""Shared fixtures for gemini-mcp-server tests."""
+
+import stat
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+STUB_CLI_TEMPLATE = """#!{python}
+import sys
+import time
+
+args = sys.argv[1:]
+if "-p" in args:
+    prompt = args[args.index("-p") + 1]
+    source = "argv"
+else:
+    prompt = sys.stdin.read()
+    source = "stdin"
+
+time.sleep({delay})
+if {exit_code}:
+    sys.stderr.write("stub failure\\n")
+    sys.exit({exit_code})
+sys.stdout.write(f"{{source}}:{{len(prompt)}}:{{prompt}}")
+"""
+
+
+@pytest.fixture
+def stub_cli(tmp_path: Path) -> Callable[..., str]:
+    """Create a fake Gemini CLI that echoes its prompt and how it received it."""
+
+    def factory(delay: float = 0.0, exit_code: int = 0) -> str:
+        script = tmp_path / f"gemini-stub-{delay}-{exit_code}"
+        script.write_text(
+            STUB_CLI_TEMPLATE.format(
+                python=sys.executable, delay=delay, exit_code=exit_code
+            )
+        )
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+        return str(script)
+
+    return factory
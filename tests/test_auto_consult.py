@@ -0,0 +1,171 @@
+"""Tests for the auto-consult module."""
+
+import asyncio
+import re
+from typing import Any
+from unittest.mock import Mock, PropertyMock, patch
+
+import pytest
+
+from gemini_mcp.auto_consult import AutoConsultPolicy
+from gemini_mcp.gemini_integration import GeminiIntegration
+from gemini_mcp.server import MCPServer
+
+HEDGING_TEXT = (
+    "I think the database migration is probably safe for production, "
+    "but I'm not sure about the rollback."
+)
+
+
+class TestAutoConsultPolicy:
+    """Test cases for AutoConsultPolicy class."""
+
+    def test_score_uses_family_weights(self) -> None:
+        """Test that each found pattern adds its family's weight."""
+        policy = AutoConsultPolicy(
+            weights={"uncertainty": 1.0, "critical_operation": 2.0}
+        )
+        score, patterns = policy.score("I think this touches production")
+
+        assert score == 3.0
+        assert len(patterns) == 2
+
+    def test_below_threshold_is_declined(self) -> None:
+        """Test that a single hedge word does not trigger."""
+        policy = AutoConsultPolicy(threshold=3.0)
+        decision = policy.evaluate("This is probably fine.")
+
+        assert not decision["consult"]
+        assert decision["reason"] == "below_threshold"
+
+    def test_near_duplicates_are_debounced(self) -> None:
+        """Test that similar text within the window triggers once."""
+        policy = AutoConsultPolicy(debounce=60.0)
+
+        assert policy.evaluate(HEDGING_TEXT, now=0.0)["consult"]
+        again = policy.evaluate(HEDGING_TEXT + " Really.", now=10.0)
+        assert not again["consult"]
+        assert again["reason"] == "debounced"
+        assert policy.evaluate(HEDGING_TEXT, now=100.0)["consult"]
+        assert policy.triggered == 2
+        assert policy.debounced == 1
+
+    def test_disabled_family_has_no_weight(self) -> None:
+        """Test that uncertainty_thresholds switches turn families off."""
+        policy = AutoConsultPolicy.from_config(
+            {"uncertainty_thresholds": {"critical_operations": False}}
+        )
+        score, patterns = policy.score("production security")
+
+        assert score == 0.0
+        assert len(patterns) == 2
+
+
+class TestAutoConsultIntegration:
+    """Test cases for background auto-consultation."""
+
+    @pytest.mark.asyncio
+    async def test_consults_in_background(self) -> None:
+        """Test that the caller returns before the consultation finishes."""
+        integration = GeminiIntegration({"rate_limit_delay": 0})
+        release = asyncio.Event()
+
+        async def slow_execute(*args: Any, **kwargs: Any) -> dict[str, Any]:
+            await release.wait()
+            return {"output": "Looks risky", "execution_time": 0.1}
+
+        with patch.object(integration, "_execute_gemini_cli", side_effect=slow_execute):
+            decision = await integration.auto_consult_text(HEDGING_TEXT)
+            assert decision["consult"]
+            assert integration.take_auto_consult_results() == []
+
+            release.set()
+            await asyncio.gather(*integration._auto_consult_tasks)
+
+        results = integration.take_auto_consult_results()
+        assert results[0]["response"] == "Looks risky"
+        assert results[0]["score"] == decision["score"]
+        assert integration.take_auto_consult_results() == []
+
+    @pytest.mark.asyncio
+    async def test_disabled_auto_consult(self) -> None:
+        """Test that nothing is scored while auto-consult is off."""
+        integration = GeminiIntegration({"auto_consult": False})
+
+        decision = await integration.auto_consult_text(HEDGING_TEXT)
+
+        assert decision == {"consult": False, "reason": "disabled"}
+
+    @pytest.mark.asyncio
+    async def test_tool_reports_finished_results(self) -> None:
+        """Test that the tool returns earlier background results."""
+        server = MCPServer()
+        server.gemini = GeminiIntegration({"rate_limit_delay": 0})
+
+        with patch.object(
+            server.gemini,
+            "_execute_gemini_cli",
+            return_value={"output": "Consider a dry run", "execution_time": 0.1},
+        ):
+            first = await server._handle_auto_consult({"text": HEDGING_TEXT})
+            await asyncio.gather(*server.gemini._auto_consult_tasks)
+            second = await server._handle_auto_consult({"text": "All done."})
+
+        assert "consulting Gemini in the background" in first[0].text
+        assert "below the threshold" in second[0].text
+        assert "Consider a dry run" in second[0].text
+
+    @pytest.mark.asyncio
+    async def test_results_go_to_their_owner(self) -> None:
+        """Test that results are returned to their owner or ticket holder only."""
+        integration = GeminiIntegration({"rate_limit_delay": 0})
+
+        with patch.object(
+            integration,
+            "_execute_gemini_cli",
+            return_value={"output": "Looks risky", "execution_time": 0.1},
+        ):
+            first = await integration.auto_consult_text(HEDGING_TEXT, owner="a")
+            second = await integration.auto_consult_text(
+                "We could be weighing the options for security credentials here.",
+                owner="b",
+            )
+            await asyncio.gather(*integration._auto_consult_tasks)
+
+        assert integration.take_auto_consult_results("c") == []
+        results = integration.take_auto_consult_results("a")
+        assert [result["ticket"] for result in results] == [first["ticket"]]
+        results = integration.take_auto_consult_results("c", [second["ticket"]])
+        assert [result["ticket"] for result in results] == [second["ticket"]]
+        assert integration.take_auto_consult_results("b") == []
+
+    @pytest.mark.asyncio
+    async def test_tool_keeps_sessions_apart(self) -> None:
+        """Test that one session never receives another session's results."""
+        server = MCPServer()
+        server.gemini = GeminiIntegration({"rate_limit_delay": 0})
+        sessions = [Mock(), Mock()]
+
+        async def call(session: Mock, arguments: dict[str, Any]) -> str:
+            ctx = Mock(session=session)
+            with patch.object(
+                type(server.server), "request_context", new_callable=PropertyMock
+            ) as mock_ctx:
+                mock_ctx.return_value = ctx
+                result = await server._handle_auto_consult(arguments)
+            return result[0].text
+
+        with patch.object(
+            server.gemini,
+            "_execute_gemini_cli",
+            return_value={"output": "Consider a dry run", "execution_time": 0.1},
+        ):
+            first = await call(sessions[0], {"text": HEDGING_TEXT})
+            await asyncio.gather(*server.gemini._auto_consult_tasks)
+            other = await call(sessions[1], {"text": "All done."})
+            own = await call(sessions[0], {"text": "All done."})
+
+        assert "Consider a dry run" not in other
+        assert "Consider a dry run" in own
+        match = re.search(r"ticket `(auto_\d+)`", first)
+        assert match is not None
@@ -0,0 +1,240 @@
+"""Tests for the backends module."""
+
+import asyncio
+import json
+import sys
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import pytest
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from gemini_mcp.backends import CLIBackend, HTTPBackend, make_backend
+from gemini_mcp.gemini_integration import GeminiIntegration
+from gemini_mcp.process import ProcessSupervisor
+from gemini_mcp.retry import GeminiCLIError
+
+
+class StandInAPI:
+    """Local stand-in for the Gemini API's streamGenerateContent endpoint."""
+
+    def __init__(self, chunks: list[str], status: int = 200, error: str = ""):
+        self.chunks = chunks
+        self.status = status
+        self.error = error
+        self.requests: list[dict[str, Any]] = []
+        self.client_ports: set[int] = set()
+
+    async def generate(self, request: Request) -> Response:
+        assert request.client is not None
+        self.client_ports.add(request.client.port)
+        self.requests.append(
+            {
+                "path": request.url.path,
+                "alt": request.query_params.get("alt"),
+                "api_key": request.headers.get("x-goog-api-key"),
+                "body": await request.json(),
+            }
+        )
+        if self.status != 200:
+            return JSONResponse({"error": {"message": self.error}}, self.status)
+
+        async def events() -> AsyncIterator[str]:
+            for chunk in self.chunks:
+                event = {"candidates": [{"content": {"parts": [{"text": chunk}]}}]}
+                yield f"data: {json.dumps(event)}\r\n\r\n"
+                await asyncio.sleep(0)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@asynccontextmanager
+async def serve(api: StandInAPI) -> AsyncIterator[str]:
+    """Serve the stand-in API on an ephemeral port and yield its base URL."""
+    app = Starlette(
+        routes=[Route("/v1beta/models/{call:path}", api.generate, methods=["POST"])]
+    )
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning")
+    )
+    task = asyncio.ensure_future(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await asyncio.wait_for(task, 10)
+
+
+class TestMakeBackend:
+    """Test cases for backend selection."""
+
+    def test_defaults_to_cli(self) -> None:
+        """Test that the CLI backend is used by default."""
+        backend = make_backend({}, ProcessSupervisor())
+
+        assert isinstance(backend, CLIBackend)
+        assert backend.cli_command == "gemini"
+
+    def test_url_cli_command_selects_http(self) -> None:
+        """Test that a URL in cli_command selects the HTTP backend."""
+        backend = make_backend(
+            {"cli_command": "http://localhost:9000/"}, ProcessSupervisor()
+        )
+
+        assert isinstance(backend, HTTPBackend)
+        assert backend.base_url == "http://localhost:9000"
+
+    def test_backend_key_selects_http(self) -> None:
+        """Test that backend=http uses the public API by default."""
+        backend = make_backend({"backend": "http"}, ProcessSupervisor())
+
+        assert isinstance(backend, HTTPBackend)
+        assert backend.base_url == "https://generativelanguage.googleapis.com"
+
+    def test_unknown_backend(self) -> None:
+        """Test that an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            make_backend({"backend": "carrier-pigeon"}, ProcessSupervisor())
+
+
+class TestCLIBackend:
+    """Test cases for CLIBackend class."""
+
+    @pytest.mark.asyncio
+    async def test_slot_wait_is_bounded_by_timeout(self) -> None:
+        """Test that a full process cap fails the call within its timeout."""
+        supervisor = ProcessSupervisor(max_processes=1)
+        backend = CLIBackend(cli_command=sys.executable, supervisor=supervisor)
+        holder = await supervisor.spawn(
+            sys.executable, "-c", "import time; time.sleep(30)"
+        )
+        try:
+            with pytest.raises(GeminiCLIError) as excinfo:
+                await asyncio.wait_for(
+                    backend.execute("question", "", timeout=0.1), timeout=5
+                )
+        finally:
+            await supervisor.reap(holder)
+
+        assert excinfo.value.kind == "timeout"
+        assert excinfo.value.retryable
+        assert supervisor.live == 0
+
+
+class TestHTTPBackend:
+    """Test cases for HTTPBackend class."""
+
+    @pytest.mark.asyncio
+    async def test_streams_generated_text(self) -> None:
+        """Test that response events are forwarded and joined."""
+        api = StandInAPI(["Use ", "a queue", "."])
+        chunks: list[str] = []
+
+        async def on_chunk(chunk: str) -> None:
+            chunks.append(chunk)
+
+        async with serve(api) as url:
+            backend = HTTPBackend(url, api_key="secret")
+            try:
+                result = await backend.execute(
+                    "question", model="gemini-test", timeout=5, on_chunk=on_chunk
+                )
+            finally:
+                await backend.close()
+
+        assert result["output"] == "Use a queue."
+        assert chunks == ["Use ", "a queue", "."]
+        assert [span.name for span in result["spans"]] == [
+            "spawn",
+            "first_byte",
+            "complete",
+            "decode",
+        ]
+        request = api.requests[0]
+        assert request["path"] == "/v1beta/models/gemini-test:streamGenerateContent"
+        assert request["alt"] == "sse"
+        assert request["api_key"] == "secret"
+        assert request["body"]["contents"][0]["parts"][0]["text"] == "question"
+
+    @pytest.mark.asyncio
+    async def test_reuses_connections(self) -> None:
+        """Test that sequential calls share one kept-alive connection."""
+        api = StandInAPI(["ok"])
+
+        async with serve(api) as url:
+            backend = HTTPBackend(url)
+            try:
+                for _ in range(5):
+                    await backend.execute("question", model="m", timeout=5)
+            finally:
+                await backend.close()
+
+        assert len(api.requests) == 5
+        assert len(api.client_ports) == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("status", "error", "kind", "retryable"),
+        [
+            (429, "Resource has been exhausted", "rate_limit", True),
+            (503, "The model is overloaded", "server", True),
+            (403, "API key not valid", "auth", False),
+        ],
+    )
+    async def test_error_status_is_classified(
+        self, status: int, error: str, kind: str, retryable: bool
+    ) -> None:
+        """Test that error responses raise classified GeminiCLIErrors."""
+        api = StandInAPI([], status=status, error=error)
+
+        async with serve(api) as url:
+            backend = HTTPBackend(url)
+            try:
+                with pytest.raises(GeminiCLIError) as excinfo:
+                    await backend.execute("question", model="m", timeout=5)
+            finally:
+                await backend.close()
+
+        assert excinfo.value.kind == kind
+        assert excinfo.value.retryable is retryable
+
+    @pytest.mark.asyncio
+    async def test_connection_refused_is_retryable(self) -> None:
+        """Test that an unreachable API is a retryable network error."""
+        async with serve(StandInAPI([])) as url:
+            pass
+        backend = HTTPBackend(url)
+
+        with pytest.raises(GeminiCLIError) as excinfo:
+            await backend.execute("question", model="m", timeout=5)
+        await backend.close()
+
+        assert excinfo.value.kind == "network"
+        assert excinfo.value.retryable is True
+
+    @pytest.mark.asyncio
+    async def test_integration_consults_over_http(self) -> None:
+        """Test a full consultation through the HTTP backend."""
+        api = StandInAPI(["Looks ", "fine"])
+
+        async with serve(api) as url:
+            integration = GeminiIntegration(
+                {"cli_command": url, "model": "gemini-test", "rate_limit_delay": 0}
+            )
+            await integration.start()
+            try:
+                result = await integration.consult_gemini("Is this right?")
+            finally:
+                await integration.close()
+
+        assert result["status"] == "success"
+        assert result["response"] == "Looks fine"
+        assert integration.processes.spawned == 0
@@ -0,0 +1,72 @@
+"""Tests for the response cache module."""
+
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from gemini_mcp.cache import ResponseCache, make_cache_key
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache class."""
+
+    def test_cache_key_depends_on_model_and_mode(self) -> None:
+        """Test that model and comparison mode change the cache key."""
+        base = make_cache_key("query", "gemini-2.5-flash", True)
+
+        assert base == make_cache_key("query", "gemini-2.5-flash", True)
+        assert base != make_cache_key("query", "gemini-2.5-pro", True)
+        assert base != make_cache_key("query", "gemini-2.5-flash", False)
+        assert base != make_cache_key("other", "gemini-2.5-flash", True)
+
+    def test_hit_and_miss_counts(self) -> None:
+        """Test that lookups are counted as hits or misses."""
+        cache = ResponseCache()
+
+        assert cache.get("key") is None
+        cache.set("key", {"response": "answer"})
+        assert cache.get("key") == {"response": "answer"}
+
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert cache.hit_rate == 0.5
+
+    def test_lru_eviction(self) -> None:
+        """Test that the least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", {"response": "a"})
+        cache.set("b", {"response": "b"})
+
+        # Touch "a" so that "b" becomes the eviction candidate
+        cache.get("a")
+        cache.set("c", {"response": "c"})
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_ttl_expiry(self) -> None:
+        """Test that entries expire after the TTL."""
+        cache = ResponseCache(ttl=10)
+        cache.set("key", {"response": "answer"})
+
+        with patch("gemini_mcp.cache.time.time", return_value=time.time() + 11):
+            assert cache.get("key") is None
+        assert len(cache) == 0
+
+    def test_disk_tier_survives_new_instance(self, tmp_path: Path) -> None:
+        """Test that the disk tier is shared across cache instances."""
+        ResponseCache(cache_dir=tmp_path).set("key", {"response": "answer"})
+
+        cache = ResponseCache(cache_dir=tmp_path)
+        assert cache.get("key") == {"response": "answer"}
+        assert cache.hits == 1
+
+    def test_disk_tier_trimmed_to_limit(self, tmp_path: Path) -> None:
+        """Test that the disk tier keeps at most max_disk_entries files."""
+        cache = ResponseCache(cache_dir=tmp_path, max_disk_entries=2)
+        for key in ("a", "b", "c"):
+            cache.set(key, {"response": key})
+
+        assert len(list(tmp_path.glob("*.json"))) == 2
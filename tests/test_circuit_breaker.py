@@ -0,0 +1,114 @@
+"""Tests for the circuit breaker module."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from gemini_mcp.circuit_breaker import CircuitBreaker, CircuitOpenError
+from gemini_mcp.gemini_integration import GeminiIntegration
+
+
+def fail(breaker: CircuitBreaker, message: str = "boom") -> None:
+    """Run one failing call through the breaker."""
+    with pytest.raises(RuntimeError), breaker.guard():
+        raise RuntimeError(message)
+
+
+def succeed(breaker: CircuitBreaker) -> None:
+    """Run one successful call through the breaker."""
+    with breaker.guard():
+        pass
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker class."""
+
+    def test_opens_after_consecutive_failures(self) -> None:
+        """Test that consecutive failures open the circuit."""
+        breaker = CircuitBreaker(failure_threshold=3)
+        for _ in range(3):
+            fail(breaker, "Gemini CLI failed: quota")
+
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError, match="quota"):
+            breaker.check()
+        assert breaker.rejected == 1
+
+    def test_opens_on_error_rate(self) -> None:
+        """Test that a high error rate opens the circuit."""
+        breaker = CircuitBreaker(
+            failure_threshold=100, error_rate=0.5, window=10, min_calls=4
+        )
+        succeed(breaker)
+        fail(breaker)
+        succeed(breaker)
+        assert breaker.state == "closed"
+        fail(breaker)
+        assert breaker.state == "open"
+
+    def test_success_resets_consecutive_failures(self) -> None:
+        """Test that a success interrupts a failure streak."""
+        breaker = CircuitBreaker(failure_threshold=2, min_calls=100)
+        fail(breaker)
+        succeed(breaker)
+        fail(breaker)
+        assert breaker.state == "closed"
+
+    def test_half_open_allows_single_probe(self) -> None:
+        """Test that only one probe runs after the reset timeout."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        fail(breaker)
+        later = time.monotonic() + 11
+
+        with patch("gemini_mcp.circuit_breaker.time.monotonic", return_value=later):
+            assert breaker.state == "half_open"
+            with breaker.guard(), pytest.raises(CircuitOpenError):
+                breaker.check()
+            assert breaker.state == "closed"
+
+    def test_failed_probe_reopens(self) -> None:
+        """Test that a failing probe opens the circuit again."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        fail(breaker)
+        later = time.monotonic() + 11
+
+        with patch("gemini_mcp.circuit_breaker.time.monotonic", return_value=later):
+            fail(breaker)
+            assert breaker.state == "open"
+            assert breaker.opened == 2
+
+    def test_zero_threshold_disables(self) -> None:
+        """Test that a zero failure threshold never opens the circuit."""
+        breaker = CircuitBreaker(failure_threshold=0, min_calls=1)
+        for _ in range(5):
+            fail(breaker)
+        breaker.check()
+        assert breaker.state == "closed"
+
+
+class TestCircuitBreakerIntegration:
+    """Test cases for the circuit breaker in consultations."""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self) -> None:
+        """Test that consultations are rejected without running the CLI."""
+        integration = GeminiIntegration(
+            {"circuit_failure_threshold": 2, "rate_limit_delay": 0}
+        )
+
+        with patch.object(
+            integration,
+            "_execute_gemini_cli",
+            side_effect=Exception("Gemini CLI failed: not authenticated"),
+        ) as execute:
+            for index in range(2):
+                result = await integration.consult_gemini(f"question {index}")
+                assert result["status"] == "error"
+
+            result = await integration.consult_gemini("another question")
+
+        assert execute.call_count == 2
+        assert result["circuit_open"] is True
+        assert "not authenticated" in result["error"]
+        assert integration.stats.by_status["rejected"] == 1
@@ -0,0 +1,103 @@
+"""Tests for the file context module."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from gemini_mcp.file_context import FileContextIndex
+
+
+def write_lines(path: Path, lines: list[str]) -> None:
+    """Write one line per entry."""
+    path.write_text("".join(f"{line}\n" for line in lines))
+
+
+class TestFileContextIndex:
+    """Test cases for FileContextIndex class."""
+
+    def test_packs_most_relevant_chunks_first(self, tmp_path: Path) -> None:
+        """Test that chunks matching the question win the budget."""
+        write_lines(
+            tmp_path / "app.py",
+            [f"filler line {n}" for n in range(20)]
+            + ["def retry_backoff(attempt):", "    return 2 ** attempt"]
+            + [f"filler line {n}" for n in range(20, 40)],
+        )
+        index = FileContextIndex(tmp_path, chunk_lines=10)
+
+        context, included = index.pack("How does retry backoff work?", ["app.py"], 260)
+
+        assert "def retry_backoff" in context
+        assert len(context) <= 260
+        assert included == [{"path": "app.py", "ranges": [[21, 30]]}]
+        assert context.startswith("--- app.py (lines 21-30) ---\n")
+
+    def test_merges_adjacent_chunks_and_reports_omitted_files(
+        self, tmp_path: Path
+    ) -> None:
+        """Test that adjacent chunks share a header and unused files are listed."""
+        write_lines(tmp_path / "a.txt", ["alpha"] * 4)
+        write_lines(tmp_path / "b.txt", ["beta " * 50] * 4)
+        index = FileContextIndex(tmp_path, chunk_lines=2)
+
+        context, included = index.pack("alpha", ["a.txt", "b.txt"], 100)
+
+        assert context == "--- a.txt (lines 1-4) ---\n" + "alpha\n" * 4
+        assert included == [
+            {"path": "a.txt", "ranges": [[1, 4]]},
+            {"path": "b.txt", "ranges": []},
+        ]
+
+    def test_unchanged_files_are_not_read_again(self, tmp_path: Path) -> None:
+        """Test that the stat and content-hash checks skip repeated work."""
+        path = tmp_path / "notes.md"
+        write_lines(path, ["cache design"])
+        index = FileContextIndex(tmp_path)
+
+        index.pack("cache", ["notes.md"], 1000)
+        index.pack("design", ["notes.md"], 1000)
+        assert (index.reads, index.splits, index.unchanged) == (1, 1, 1)
+
+        # Touched but identical content is hashed, not split again
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        index.pack("cache", ["notes.md"], 1000)
+        assert (index.reads, index.splits) == (2, 1)
+
+        write_lines(path, ["queue design"])
+        context, _ = index.pack("queue", ["notes.md"], 1000)
+        assert "queue design" in context
+        assert (index.reads, index.splits) == (3, 2)
+
+    @pytest.mark.parametrize("path", ["../outside.txt", "missing.txt", "."])
+    def test_rejects_paths_outside_root_or_not_files(
+        self, tmp_path: Path, path: str
+    ) -> None:
+        """Test that only existing files under the root are accepted."""
+        root = tmp_path / "project"
+        root.mkdir()
+        (tmp_path / "outside.txt").write_text("secret")
+
+        with pytest.raises(ValueError):
+            FileContextIndex(root).pack("question", [path], 1000)
+
+    def test_rejects_binary_and_large_files(self, tmp_path: Path) -> None:
+        """Test that binary and oversized files are refused."""
+        (tmp_path / "image.bin").write_bytes(b"\x89PNG\0\0data")
+        (tmp_path / "big.txt").write_text("x" * 2048)
+        index = FileContextIndex(tmp_path, max_file_bytes=1024)
+
+        with pytest.raises(ValueError, match="binary"):
+            index.pack("question", ["image.bin"], 1000)
+        with pytest.raises(ValueError, match="larger"):
+            index.pack("question", ["big.txt"], 1000)
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        """Test that an empty file contributes nothing."""
+        (tmp_path / "empty.py").write_text("")
+
+        context, included = FileContextIndex(tmp_path).pack("q", ["empty.py"], 100)
+
+        assert context == ""
+        assert included == [{"path": "empty.py", "ranges": []}]
@@ -1,19 +1,40 @@
 """Tests for Gemini integration module."""
 
+import asyncio
+from collections.abc import Callable
+from typing import Any
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 from gemini_mcp import gemini_integration
-from gemini_mcp.gemini_integration import GeminiIntegration, get_integration
+from gemini_mcp.gemini_integration import (
+    GeminiIntegration,
+    IntegrationRegistry,
+    get_integration,
+)
+
+
+def mock_cli_process(stdout: bytes, stderr: bytes = b"") -> Mock:
+    """Create a mock finished CLI process with readable output streams."""
+    process = Mock()
+    process.returncode = 0
+    process.stdout = asyncio.StreamReader()
+    process.stdout.feed_data(stdout)
+    process.stdout.feed_eof()
+    process.stderr = asyncio.StreamReader()
+    process.stderr.feed_data(stderr)
+    process.stderr.feed_eof()
+    process.wait = AsyncMock(return_value=0)
+    return process
 
 
 class TestGeminiIntegration:
     """Test cases for GeminiIntegration class."""
 
     def setup_method(self) -> None:
-        """Reset singleton before each test."""
-        gemini_integration._integration = None
+        """Reset the integration registry before each test."""
+        gemini_integration.get_registry().clear()
 
     def test_singleton_pattern(self) -> None:
         """Test that get_integration returns the same instance."""
@@ -21,6 +42,17 @@ class TestGeminiIntegration:
         instance2 = get_integration()
         assert instance1 is instance2
 
+    def test_each_project_gets_its_own_integration(self) -> None:
+        """Test that project roots and configs get separate instances."""
+        first = get_integration({"timeout": 30}, project_root="/repo/a")
+        second = get_integration({"timeout": 90}, project_root="/repo/b")
+
+        assert first is not second
+        assert first.timeout == 30
+        assert second.timeout == 90
+        assert get_integration({"timeout": 30}, project_root="/repo/a") is first
+        assert get_integration({"timeout": 45}, project_root="/repo/a") is not first
+
     def test_initialization_with_config(self) -> None:
         """Test GeminiIntegration initialization with custom config."""
         config = {
@@ -87,11 +119,10 @@ class TestGeminiIntegration:
         with patch(
             "gemini_mcp.gemini_integration.asyncio.create_subprocess_exec"
         ) as mock_subprocess:
-            # Create a mock process
-            mock_process = Mock()
-            mock_process.returncode = 0
-            mock_process.communicate = AsyncMock(return_value=(b"Test response", b""))
-            mock_subprocess.return_value = mock_process
+            # Create a mock process for each call
+            mock_subprocess.side_effect = lambda *args, **kwargs: mock_cli_process(
+                b"Test response"
+            )
 
             # First consultation
             result1 = await integration.consult_gemini("test1")
@@ -102,6 +133,170 @@ class TestGeminiIntegration:
             result2 = await integration.consult_gemini("test2", force_consult=True)
             assert result2["status"] == "success"
 
+    @pytest.mark.asyncio
+    async def test_consult_gemini_uses_cache(self) -> None:
+        """Test that repeated consultations are served from the cache."""
+        integration = GeminiIntegration({"rate_limit_delay": 0})
+
+        with patch.object(
+            integration,
+            "_execute_gemini_cli",
+            AsyncMock(return_value={"output": "answer", "execution_time": 1.0}),
+        ) as mock_execute:
+            result1 = await integration.consult_gemini("same question")
+            result2 = await integration.consult_gemini("same question")
+            result3 = await integration.consult_gemini("same question", use_cache=False)
+
+        assert result1["cached"] is False
+        assert result2["cached"] is True
+        assert result2["response"] == "answer"
+        assert result3["cached"] is False
+        assert mock_execute.await_count == 2
+        assert integration.cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_consult_gemini_coalesces_identical_calls(self) -> None:
+        """Test that identical concurrent consultations share one CLI call."""
+        integration = GeminiIntegration({"rate_limit_delay": 0})
+
+        async def slow_execute(query: str, **kwargs: Any) -> dict[str, Any]:
+            await asyncio.sleep(0.01)
+            return {"output": "answer", "execution_time": 0.01}
+
+        with patch.object(
+            integration, "_execute_gemini_cli", side_effect=slow_execute
+        ) as mock_execute:
+            results = await asyncio.gather(
+                *(integration.consult_gemini("same question") for _ in range(3))
+            )
+
+        assert mock_execute.call_count == 1
+        assert all(result["status"] == "success" for result in results)
+        assert sum(result["coalesced"] for result in results) == 2
+        assert integration.inflight.coalesced == 2
+
+    @pytest.mark.asyncio
+    async def test_consult_gemini_drops_expired_queued_call(self) -> None:
+        """Test that a consultation still queued at its deadline is dropped."""
+        integration = GeminiIntegration(
+            {"rate_limit_delay": 0, "max_concurrency": 1, "request_deadline": 0.05}
+        )
+
+        async def slow_execute(query: str, **kwargs: Any) -> dict[str, Any]:
+            await asyncio.sleep(0.2)
+            return {"output": "answer", "execution_time": 0.2}
+
+        with patch.object(integration, "_execute_gemini_cli", side_effect=slow_execute):
+            first, second = await asyncio.gather(
+                integration.consult_gemini("first", priority="background"),
+                integration.consult_gemini("second", priority="interactive"),
+            )
+
+        assert first["status"] == "success"
+        assert second["status"] == "error"
+        assert second["expired"] is True
+        assert integration.stats.by_status["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_gemini_yields_output(
+        self, stub_cli: Callable[..., str]
+    ) -> None:
+        """Test that streamed chunks add up to the full response."""
+        integration = GeminiIntegration(
+            {"cli_command": stub_cli(), "model": "", "rate_limit_delay": 0}
+        )
+
+        chunks = [
+            chunk
+            async for chunk in integration.stream_gemini(
+                "question", comparison_mode=False
+            )
+        ]
+
+        assert "".join(chunks).endswith("Question/Topic:\nquestion")
+        assert integration.consultation_log[-1]["first_chunk_time"] is not None
+
+    @pytest.mark.asyncio
+    async def test_consult_gemini_batch(self) -> None:
+        """Test that batch results keep input order and isolate failures."""
+        integration = GeminiIntegration({"rate_limit_delay": 0, "max_concurrency": 4})
+
+        async def execute(query: str, **kwargs: Any) -> dict[str, Any]:
+            if "fail" in query:
+                raise Exception("Gemini CLI failed: boom")
+            await asyncio.sleep(0.01 if "slow" in query else 0)
+            return {"output": query.splitlines()[-1], "execution_time": 0.01}
+
+        with patch.object(integration, "_execute_gemini_cli", side_effect=execute):
+            results = await integration.consult_gemini_batch(
+                [
+                    {"query": "slow", "comparison_mode": False},
+                    {"query": "fail", "comparison_mode": False},
+                    {"query": ""},
+                    {"query": "fast", "comparison_mode": False},
+                ]
+            )
+
+        assert [result["index"] for result in results] == [0, 1, 2, 3]
+        assert [result["status"] for result in results] == [
+            "success",
+            "error",
+            "error",
+            "success",
+        ]
+        assert results[0]["response"] == "slow"
+        assert results[3]["response"] == "fast"
+        assert all(result["elapsed"] >= 0 for result in results)
+
+    @pytest.mark.asyncio
+    async def test_consult_gemini_batch_size_limit(self) -> None:
+        """Test that oversized batches are rejected."""
+        integration = GeminiIntegration({"max_batch_size": 1})
+
+        with pytest.raises(ValueError):
+            await integration.consult_gemini_batch([{"query": "a"}, {"query": "b"}])
+
+    @pytest.mark.asyncio
+    async def test_small_prompt_uses_argv(self, stub_cli: Callable[..., str]) -> None:
+        """Test that small prompts are passed on the command line in auto mode."""
+        integration = GeminiIntegration({"cli_command": stub_cli(), "model": ""})
+
+        result = await integration._execute_gemini_cli("short prompt")
+
+        assert result["prompt_delivery"] == "argv"
+        assert result["output"] == "argv:12:short prompt"
+
+    @pytest.mark.asyncio
+    async def test_large_prompt_uses_stdin(self, stub_cli: Callable[..., str]) -> None:
+        """Test that prompts over the threshold are streamed through stdin."""
+        integration = GeminiIntegration(
+            {"cli_command": stub_cli(), "model": "", "stdin_threshold": 1024}
+        )
+        prompt = "x" * 300_000
+
+        result = await integration._execute_gemini_cli(prompt)
+
+        assert result["prompt_delivery"] == "stdin"
+        assert result["output"] == f"stdin:300000:{prompt}"
+
+    @pytest.mark.asyncio
+    async def test_stdin_delivery_while_streaming(
+        self, stub_cli: Callable[..., str]
+    ) -> None:
+        """Test that stdin delivery also works for streamed consultations."""
+        integration = GeminiIntegration(
+            {"cli_command": stub_cli(), "model": "", "prompt_delivery": "stdin"}
+        )
+        chunks: list[str] = []
+
+        async def on_chunk(chunk: str) -> None:
+            chunks.append(chunk)
+
+        result = await integration._execute_gemini_cli("streamed", on_chunk=on_chunk)
+
+        assert result["prompt_delivery"] == "stdin"
+        assert "".join(chunks) == "stdin:8:streamed"
+
     def test_get_config_values(self) -> None:
         """Test getting configuration values."""
         integration = GeminiIntegration()
@@ -122,3 +317,49 @@ class TestGeminiIntegration:
         # Toggle on
         integration.auto_consult = True
         assert integration.auto_consult is True
+
+
+class TestIntegrationRegistry:
+    """Test cases for IntegrationRegistry class."""
+
+    def test_integrations_share_the_global_cap(self) -> None:
+        """Test that every integration's limiter uses the registry's cap."""
+        registry = IntegrationRegistry(max_concurrency=3)
+        first = registry.get({}, project_root="/repo/a")
+        second = registry.get({}, project_root="/repo/b")
+
+        assert len(registry) == 2
+        assert first.rate_limiter.shared is registry.concurrency
+        assert second.rate_limiter.shared is registry.concurrency
+        assert first.rate_limiter.tenant != second.rate_limiter.tenant
+        assert first.cache is not second.cache
+        assert first.stats is not second.stats
+
+    @pytest.mark.asyncio
+    async def test_release_drops_the_integration(self) -> None:
+        """Test that a released integration is recreated on next use."""
+        registry = IntegrationRegistry()
+        integration = registry.get({"timeout": 5})
+
+        await registry.release(integration)
+
+        assert len(registry) == 0
+        assert registry.get({"timeout": 5}) is not integration
+        await registry.close()
+        assert len(registry) == 0
+
+    @pytest.mark.asyncio
+    async def test_release_waits_for_every_holder(self) -> None:
+        """Test that an integration shared by two holders outlives one release."""
+        registry = IntegrationRegistry()
+        integration = registry.get({"timeout": 5})
+        assert registry.get({"timeout": 5}) is integration
+
+        with patch.object(integration, "close") as close:
+            await registry.release(integration)
+            assert registry.integrations() == [integration]
+            close.assert_not_called()
+
+            await registry.release(integration)
+            assert len(registry) == 0
+            close.assert_awaited_once()
@@ -0,0 +1,220 @@
+"""Tests for the hedging module."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from gemini_mcp.gemini_integration import GeminiIntegration
+from gemini_mcp.hedging import HedgePolicy
+
+
+def cli_result(output: str, execution_time: float = 0.1) -> dict[str, Any]:
+    """Build a result shaped like _execute_gemini_cli's."""
+    return {
+        "output": output,
+        "execution_time": execution_time,
+        "spawn_time": 0.0,
+        "warm_worker": False,
+        "first_chunk_time": None,
+        "prompt_delivery": "argv",
+    }
+
+
+class TestHedgePolicy:
+    """Test cases for HedgePolicy class."""
+
+    def test_initial_delay_until_enough_samples(self) -> None:
+        """Test that the initial delay is used before min_samples."""
+        policy = HedgePolicy(initial_delay=5.0, min_samples=3)
+        policy.observe(0.5)
+        policy.observe(0.5)
+        assert policy.delay() == 5.0
+
+    def test_delay_tracks_quantile(self) -> None:
+        """Test that the delay follows the observed quantile."""
+        policy = HedgePolicy(quantile=0.9, min_delay=0.0, min_samples=10)
+        for value in range(1, 11):
+            policy.observe(float(value))
+        assert policy.delay() == 9.0
+
+    def test_delay_respects_minimum(self) -> None:
+        """Test that the delay never drops below min_delay."""
+        policy = HedgePolicy(min_delay=2.0, min_samples=1)
+        policy.observe(0.1)
+        assert policy.delay() == 2.0
+
+    def test_budget_limits_hedges(self) -> None:
+        """Test that hedges are capped at max_fraction of eligible calls."""
+        policy = HedgePolicy(max_fraction=0.1)
+        policy.eligible = 9
+        assert not policy.try_acquire()
+        policy.eligible = 10
+        assert policy.try_acquire()
+        assert not policy.try_acquire()
+        assert policy.launched == 1
+
+    def test_from_config(self) -> None:
+        """Test building a policy from config keys."""
+        policy = HedgePolicy.from_config(
+            {"hedge_quantile": 0.5, "hedge_max_fraction": 0.2, "hedge_model": "m"}
+        )
+        assert policy.quantile == 0.5
+        assert policy.max_fraction == 0.2
+        assert policy.model == "m"
+
+
+class TestHedgedExecution:
+    """Test cases for hedged Gemini CLI execution."""
+
+    @staticmethod
+    def make_integration() -> GeminiIntegration:
+        return GeminiIntegration(
+            {
+                "hedge_enabled": True,
+                "hedge_initial_delay": 0.05,
+                "hedge_min_delay": 0.0,
+                "hedge_max_fraction": 1.0,
+                "hedge_model": "gemini-2.5-flash",
+                "rate_limit_delay": 0,
+            }
+        )
+
+    @pytest.mark.asyncio
+    async def test_hedge_wins_over_stalled_primary(self) -> None:
+        """Test that a backup attempt answers when the primary stalls."""
+        integration = self.make_integration()
+        models: list[str | None] = []
+        cancelled = asyncio.Event()
+
+        async def execute(
+            query: str,
+            on_chunk: Any = None,
+            model: str | None = None,
+            deadline: float | None = None,
+        ) -> dict[str, Any]:
+            models.append(model)
+            if model is None:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return cli_result("from hedge")
+
+        integration._execute_gemini_cli = execute  # type: ignore[method-assign]
+        result = await integration._execute_hedged("question")
+
+        assert result["output"] == "from hedge"
+        assert result["hedged"] and result["hedge_won"]
+        assert models == [None, "gemini-2.5-flash"]
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
+        assert integration.hedging.wins == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_during_hedge_delay_cancels_primary(self) -> None:
+        """Test that cancelling the caller before a hedge starts stops the call."""
+        integration = self.make_integration()
+        integration.hedging.initial_delay = 10.0
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def execute(
+            query: str,
+            on_chunk: Any = None,
+            model: str | None = None,
+            deadline: float | None = None,
+        ) -> dict[str, Any]:
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return cli_result("too late")
+
+        integration._execute_gemini_cli = execute  # type: ignore[method-assign]
+        task = asyncio.ensure_future(integration.consult_gemini("question"))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
+        assert integration.rate_limiter.active == 0
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self) -> None:
+        """Test that no hedge starts when the primary answers in time."""
+        integration = self.make_integration()
+        calls = 0
+
+        async def execute(
+            query: str,
+            on_chunk: Any = None,
+            model: str | None = None,
+            deadline: float | None = None,
+        ) -> dict[str, Any]:
+            nonlocal calls
+            calls += 1
+            return cli_result("fast")
+
+        integration._execute_gemini_cli = execute  # type: ignore[method-assign]
+        result = await integration._execute_hedged("question")
+
+        assert result["output"] == "fast"
+        assert "hedged" not in result
+        assert calls == 1
+        assert integration.hedging.launched == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_hedge_falls_back_to_primary(self) -> None:
+        """Test that a failing hedge does not mask a slow success."""
+        integration = self.make_integration()
+
+        async def execute(
+            query: str,
+            on_chunk: Any = None,
+            model: str | None = None,
+            deadline: float | None = None,
+        ) -> dict[str, Any]:
+            if model is None:
+                await asyncio.sleep(0.2)
+                return cli_result("primary")
+            raise Exception("hedge failed")
+
+        integration._execute_gemini_cli = execute  # type: ignore[method-assign]
+        result = await integration._execute_hedged("question")
+
+        assert result["output"] == "primary"
+        assert not result["hedge_won"]
+        assert integration.hedging.losses == 1
+
+    @pytest.mark.asyncio
+    async def test_streaming_attempt_claims_output(self) -> None:
+        """Test that the first attempt to stream owns the output."""
+        integration = self.make_integration()
+        chunks: list[str] = []
+
+        async def collect(chunk: str) -> None:
+            chunks.append(chunk)
+
+        async def execute(
+            query: str,
+            on_chunk: Any = None,
+            model: str | None = None,
+            deadline: float | None = None,
+        ) -> dict[str, Any]:
+            if model is None:
+                await asyncio.sleep(10)
+            await on_chunk("hedge ")
+            await on_chunk("answer")
+            return cli_result("hedge answer")
+
+        integration._execute_gemini_cli = execute  # type: ignore[method-assign]
+        result = await integration._execute_hedged("question", on_chunk=collect)
+
+        assert chunks == ["hedge ", "answer"]
+        assert result["hedge_won"]
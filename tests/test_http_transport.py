@@ -0,0 +1,198 @@
+"""Tests for serving MCP over Streamable HTTP."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Callable
+from contextlib import AsyncExitStack, asynccontextmanager
+from pathlib import Path
+
+import httpx
+import mcp.types as types
+import pytest
+import uvicorn
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+from sse_starlette.sse import AppStatus
+
+from gemini_mcp.gemini_integration import get_registry
+from gemini_mcp.server import MCPServer
+
+HEADERS = {
+    "Accept": "application/json, text/event-stream",
+    "Content-Type": "application/json",
+}
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": types.LATEST_PROTOCOL_VERSION,
+        "capabilities": {},
+        "clientInfo": {"name": "test", "version": "1"},
+    },
+}
+
+
+def make_server(project_root: Path, cli_command: str) -> MCPServer:
+    """Create a server whose Gemini CLI is the stub."""
+    config = {
+        "cli_command": cli_command,
+        "rate_limit_delay": 0,
+        "max_concurrency": 16,
+        "stream_output": False,
+    }
+    (project_root / "gemini-config.json").write_text(json.dumps(config))
+    return MCPServer(project_root=str(project_root))
+
+
+@asynccontextmanager
+async def serve(server: MCPServer, max_connections: int = 100) -> AsyncIterator[str]:
+    """Run the server's HTTP app on an ephemeral port and yield its URL."""
+    # sse-starlette keeps a process-wide event bound to the first test's loop
+    AppStatus.should_exit_event = None
+    config = uvicorn.Config(
+        server.http_app(),
+        host="127.0.0.1",
+        port=0,
+        # As in MCPServer.run_http
+        limit_concurrency=max_connections + 1,
+        timeout_graceful_shutdown=1,
+        log_level="warning",
+    )
+    http_server = uvicorn.Server(config)
+    task = asyncio.ensure_future(http_server.serve())
+    while not http_server.started:
+        await asyncio.sleep(0.01)
+    port = http_server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}/mcp"
+    finally:
+        http_server.should_exit = True
+        await asyncio.wait_for(task, 10)
+
+
+async def call_tool(url: str, name: str, arguments: dict) -> str:
+    """Open a client session, call one tool and return its text."""
+    async with (
+        streamablehttp_client(url) as (read_stream, write_stream, _),
+        ClientSession(read_stream, write_stream) as session,
+    ):
+        await session.initialize()
+        result = await session.call_tool(name, arguments)
+        content = result.content[0]
+        assert isinstance(content, types.TextContent)
+        return content.text
+
+
+class TestHTTPTransport:
+    """Test cases for the Streamable HTTP transport."""
+
+    @pytest.mark.asyncio
+    async def test_lists_tools(
+        self, tmp_path: Path, stub_cli: Callable[..., str]
+    ) -> None:
+        """Test that a client can initialize a session and list the tools."""
+        server = make_server(tmp_path, stub_cli())
+
+        async with (
+            serve(server) as url,
+            streamablehttp_client(url) as (read_stream, write_stream, _),
+            ClientSession(read_stream, write_stream) as session,
+        ):
+            await session.initialize()
+            tools = await session.list_tools()
+
+        assert "consult_gemini" in {tool.name for tool in tools.tools}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_clients_share_the_integration(
+        self, tmp_path: Path, stub_cli: Callable[..., str]
+    ) -> None:
+        """Test that many concurrent sessions are served by one integration."""
+        server = make_server(tmp_path, stub_cli(delay=0.05))
+        clients = 24
+
+        async with serve(server) as url:
+            texts = await asyncio.gather(
+                *(
+                    call_tool(url, "consult_gemini", {"query": f"question {index % 4}"})
+                    for index in range(clients)
+                )
+            )
+
+        assert all("question" in text for text in texts)
+        stats = server.gemini.stats
+        assert stats.total == clients
+        # Repeated questions were answered by the cache or a running call
+        assert server.gemini.processes.spawned == 4
+
+    @pytest.mark.asyncio
+    async def test_connection_limit_refuses_excess_clients(
+        self, tmp_path: Path, stub_cli: Callable[..., str]
+    ) -> None:
+        """Test that the limit admits that many connections and refuses the next."""
+        server = make_server(tmp_path, stub_cli())
+        limit = 2
+
+        async with AsyncExitStack() as stack:
+            url = await stack.enter_async_context(serve(server, max_connections=limit))
+            # Separate clients hold separate keep-alive connections open
+            clients = [
+                await stack.enter_async_context(httpx.AsyncClient())
+                for _ in range(limit + 1)
+            ]
+            admitted = await asyncio.gather(
+                *(
+                    client.post(url, json=INITIALIZE, headers=HEADERS)
+                    for client in clients[:limit]
+                )
+            )
+            refused = await clients[limit].post(url, json=INITIALIZE, headers=HEADERS)
+
+        assert [response.status_code for response in admitted] == [200] * limit
+        assert refused.status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_rejects_foreign_host_and_origin(
+        self, tmp_path: Path, stub_cli: Callable[..., str]
+    ) -> None:
+        """Test that DNS-rebound requests are refused before any tool runs."""
+        server = make_server(tmp_path, stub_cli())
+        async with serve(server) as url, httpx.AsyncClient() as client:
+            port = httpx.URL(url).port
+            foreign_host = await client.post(
+                url, json=INITIALIZE, headers={**HEADERS, "Host": f"evil.test:{port}"}
+            )
+            foreign_origin = await client.post(
+                url, json=INITIALIZE, headers={**HEADERS, "Origin": "http://evil.test"}
+            )
+            local = await client.post(url, json=INITIALIZE, headers=HEADERS)
+
+        assert foreign_host.status_code == 421
+        assert foreign_origin.status_code == 400
+        assert local.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_refuses_remote_bind_without_opt_in(self, tmp_path: Path) -> None:
+        """Test that a non-loopback bind needs allow_remote."""
+        server = MCPServer(project_root=str(tmp_path))
+        try:
+            with pytest.raises(ValueError, match="allow-remote"):
+                await server.run_http(host="0.0.0.0", port=0)
+        finally:
+            await get_registry().release(server.gemini)
+
+    @pytest.mark.asyncio
+    async def test_shutdown_closes_the_integration(
+        self, tmp_path: Path, stub_cli: Callable[..., str]
+    ) -> None:
+        """Test that stopping the server releases the integration."""
+        server = make_server(tmp_path, stub_cli())
+
+        async with serve(server) as url:
+            await call_tool(url, "gemini_status", {})
+
+        assert server.gemini not in get_registry().integrations()
+        assert server.gemini.processes.live == 0
+        assert server.gemini.rate_limiter.active == 0
@@ -0,0 +1,160 @@
+"""Tests for the consultation journal module."""
+
+import asyncio
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from gemini_mcp.gemini_integration import GeminiIntegration
+from gemini_mcp.journal import INDEX_ENTRY, ConsultationJournal, _Segment
+from gemini_mcp.server import MCPServer
+
+
+def fill(journal: ConsultationJournal, count: int, start: float = 1000.0) -> None:
+    """Append ``count`` records one second apart, alternating status."""
+    for index in range(count):
+        status = "success" if index % 2 == 0 else "error"
+        journal.append(
+            {"id": f"c{index}", "status": status},
+            timestamp=start + index,
+            status=status,
+        )
+
+
+class TestConsultationJournal:
+    """Test cases for ConsultationJournal class."""
+
+    @pytest.mark.asyncio
+    async def test_appends_are_batched(self, tmp_path: Path) -> None:
+        """Test that appends are buffered and written together."""
+        journal = ConsultationJournal(tmp_path, flush_interval=60)
+        fill(journal, 5)
+        assert journal.pending == 5
+        assert journal.written == 0
+
+        await journal.flush()
+
+        assert journal.pending == 0
+        assert journal.written == 5
+        index = (tmp_path / "journal-000001.idx").read_bytes()
+        assert len(index) == 5 * INDEX_ENTRY.size
+        await journal.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_flushes_do_not_overlap(self, tmp_path: Path) -> None:
+        """Test that flushes started while one is writing wait for it."""
+        journal = ConsultationJournal(tmp_path, flush_interval=60, batch_size=1)
+        size = _Segment.size
+
+        def slow_size(segment: _Segment) -> int:
+            time.sleep(0.05)
+            return size(segment)
+
+        with patch.object(_Segment, "size", slow_size):
+            # Every append past batch_size replaces the flusher mid-write
+            for index in range(4):
+                journal.append({"i": index}, timestamp=1000.0 + index, status="success")
+                await asyncio.sleep(0.001)
+            journal.append({"i": 4}, timestamp=1004.0, status="success")
+            await asyncio.gather(journal.flush(), journal.flush())
+            while journal.written < 5:
+                await asyncio.sleep(0.01)
+            records = await journal.query(limit=10)
+
+        assert records == [{"i": index} for index in range(4, -1, -1)]
+        await journal.close()
+
+    @pytest.mark.asyncio
+    async def test_query_pages_newest_first(self, tmp_path: Path) -> None:
+        """Test paging through records from newest to oldest."""
+        journal = ConsultationJournal(tmp_path)
+        fill(journal, 10)
+
+        first = await journal.query(limit=3)
+        second = await journal.query(offset=3, limit=3)
+
+        assert [record["id"] for record in first] == ["c9", "c8", "c7"]
+        assert [record["id"] for record in second] == ["c6", "c5", "c4"]
+        await journal.close()
+
+    @pytest.mark.asyncio
+    async def test_query_filters_time_and_status(self, tmp_path: Path) -> None:
+        """Test filtering by time range and status."""
+        journal = ConsultationJournal(tmp_path)
+        fill(journal, 10)
+
+        records = await journal.query(since=1002, until=1006, status="success")
+
+        assert [record["id"] for record in records] == ["c6", "c4", "c2"]
+        await journal.close()
+
+    @pytest.mark.asyncio
+    async def test_rotation_keeps_newest_files(self, tmp_path: Path) -> None:
+        """Test that full files rotate and old ones are removed."""
+        journal = ConsultationJournal(tmp_path, max_bytes=100, max_files=3)
+        fill(journal, 40)
+        await journal.flush()
+
+        data_files = sorted(path.name for path in tmp_path.glob("*.jsonl"))
+        assert len(data_files) == 3
+        assert all(path.stat().st_size <= 100 + 64 for path in tmp_path.glob("*.jsonl"))
+
+        records = await journal.query(limit=100)
+        assert records[0]["id"] == "c39"
+        ids = [int(record["id"][1:]) for record in records]
+        assert ids == sorted(ids, reverse=True)
+        await journal.close()
+
+    @pytest.mark.asyncio
+    async def test_survives_restart(self, tmp_path: Path) -> None:
+        """Test that a new journal continues the existing files."""
+        journal = ConsultationJournal(tmp_path)
+        fill(journal, 3)
+        await journal.close()
+
+        reopened = ConsultationJournal(tmp_path)
+        fill(reopened, 2, start=2000.0)
+        records = await reopened.query(limit=10)
+
+        assert len(records) == 5
+        await reopened.close()
+
+
+class TestJournalIntegration:
+    """Test cases for journaling consultations."""
+
+    @pytest.mark.asyncio
+    async def test_history_tool_lists_consultations(self, tmp_path: Path) -> None:
+        """Test that consultations are journaled and listed by gemini_history."""
+        server = MCPServer(project_root=str(tmp_path))
+        server.gemini = GeminiIntegration(
+            {"journal_dir": str(tmp_path / "journal"), "rate_limit_delay": 0}
+        )
+
+        with patch.object(
+            server.gemini,
+            "_execute_gemini_cli",
+            return_value={"output": "answer", "execution_time": 0.5},
+        ):
+            await server.gemini.consult_gemini("first question")
+            await server.gemini.consult_gemini("first question")
+
+        result = await server._handle_gemini_history({"status": "cached"})
+        text = result[0].text
+
+        assert "**cached**" in text
+        assert "first question" in text
+        assert "**success**" not in text
+        await server.gemini.close()
+
+    @pytest.mark.asyncio
+    async def test_history_tool_when_disabled(self) -> None:
+        """Test the history tool without a journal."""
+        server = MCPServer()
+        server.gemini = GeminiIntegration({})
+
+        result = await server._handle_gemini_history({})
+
+        assert "disabled" in result[0].text
@@ -0,0 +1,219 @@
+"""Tests for the metrics module."""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from gemini_mcp.gemini_integration import GeminiIntegration, IntegrationRegistry
+from gemini_mcp.metrics import MetricsExporter, MetricsRegistry, _Metric
+
+
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry class."""
+
+    def test_counter_renders_total_samples(self) -> None:
+        """Test that counters render OpenMetrics _total samples."""
+        registry = MetricsRegistry()
+        counter = registry.counter("calls", "Calls made", labelnames=("status",))
+        counter.inc(status="ok")
+        counter.inc(2, status="ok")
+        counter.inc(status='bad "one"')
+
+        text = registry.render()
+
+        assert "# TYPE calls counter" in text
+        assert 'calls_total{status="ok"} 3' in text
+        assert 'calls_total{status="bad \\"one\\""} 1' in text
+        assert text.endswith("# EOF\n")
+
+    def test_prometheus_text_format(self) -> None:
+        """Test that the text format names counters by sample name."""
+        registry = MetricsRegistry()
+        registry.counter("calls", "Calls made").inc()
+
+        text = registry.render(openmetrics=False)
+
+        assert "# TYPE calls_total counter" in text
+        assert "# EOF" not in text
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        """Test histogram bucket, count and sum samples."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency", "Latency", buckets=(1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_bucket{le="1"} 2' in text
+        assert 'latency_bucket{le="5"} 3' in text
+        assert 'latency_bucket{le="+Inf"} 4' in text
+        assert "latency_count 4" in text
+        assert "latency_sum 14.5" in text
+        assert histogram.count() == 4
+
+    def test_callback_gauge(self) -> None:
+        """Test that callback gauges are read at render time."""
+        registry = MetricsRegistry()
+        depth = [0]
+        registry.gauge("depth", "Queue depth", fn=lambda: depth[0])
+        depth[0] = 7
+
+        assert "depth 7" in registry.render()
+
+    def test_tracked_series_per_label(self) -> None:
+        """Test that labelled callbacks render and can be untracked."""
+        registry = MetricsRegistry()
+        depth = registry.gauge("depth", "Queue depth", labelnames=("project",))
+        depth.track(lambda: 1, project="a")
+        depth.track(lambda: 2, project="b")
+        depth.untrack(project="a")
+
+        text = registry.render()
+
+        assert 'depth{project="a"}' not in text
+        assert 'depth{project="b"} 2' in text
+
+    def test_metric_base_is_abstract(self) -> None:
+        """Test that a metric family must say how to produce its samples."""
+        with pytest.raises(TypeError):
+            _Metric("calls", "Calls made")  # type: ignore[abstract]
+
+    def test_duplicate_names_rejected(self) -> None:
+        """Test that metric names must be unique."""
+        registry = MetricsRegistry()
+        registry.gauge("depth", "Queue depth")
+        with pytest.raises(ValueError):
+            registry.gauge("depth", "Queue depth")
+
+
+class TestMetricsExporter:
+    """Test cases for MetricsExporter class."""
+
+    @pytest.mark.asyncio
+    async def test_http_endpoint(self) -> None:
+        """Test scraping the HTTP endpoint."""
+        registry = MetricsRegistry()
+        registry.counter("calls", "Calls made").inc()
+        exporter = MetricsExporter(registry, port=0)
+        await exporter.start()
+        try:
+            assert exporter._server is not None
+            port = exporter._server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n"
+                b"Accept: application/openmetrics-text\r\n\r\n"
+            )
+            response = (await reader.read()).decode()
+            writer.close()
+        finally:
+            await exporter.close()
+
+        assert response.startswith("HTTP/1.1 200 OK")
+        assert "application/openmetrics-text" in response
+        assert "calls_total 1" in response
+
+    @pytest.mark.asyncio
+    async def test_overlong_request_is_refused(self) -> None:
+        """Test that a request past the stream limit gets 431 and is closed."""
+        exporter = MetricsExporter(MetricsRegistry(), port=0)
+        await exporter.start()
+        try:
+            assert exporter._server is not None
+            port = exporter._server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /" + b"x" * 70_000)
+            await writer.drain()
+            response = (await asyncio.wait_for(reader.read(), 5)).decode()
+            writer.close()
+        finally:
+            await exporter.close()
+
+        assert response.startswith("HTTP/1.1 431 ")
+
+    @pytest.mark.asyncio
+    async def test_textfile_written(self, tmp_path: Path) -> None:
+        """Test that the textfile is written and refreshed on close."""
+        registry = MetricsRegistry()
+        counter = registry.counter("calls", "Calls made")
+        textfile = tmp_path / "gemini.prom"
+        exporter = MetricsExporter(registry, textfile=textfile, interval=60)
+        await exporter.start()
+        await asyncio.sleep(0)
+        assert "calls_total 1" not in textfile.read_text()
+
+        counter.inc()
+        await exporter.close()
+
+        assert "calls_total 1" in textfile.read_text()
+        assert list(tmp_path.iterdir()) == [textfile]
+
+
+class TestConsultationMetrics:
+    """Test cases for metrics recorded by consultations."""
+
+    @pytest.mark.asyncio
+    async def test_consultation_is_recorded(self) -> None:
+        """Test that a consultation updates counters and histograms."""
+        integration = GeminiIntegration({"rate_limit_delay": 0, "model": "m"})
+
+        with patch.object(
+            integration,
+            "_execute_gemini_cli",
+            return_value={"output": "answer", "execution_time": 1.5},
+        ):
+            await integration.consult_gemini("question")
+            await integration.consult_gemini("question")
+
+        metrics = integration.metrics
+        labels = {"project": "default", "model": "m"}
+        assert metrics.consultations.value(status="success", **labels) == 1
+        assert metrics.consultations.value(status="cached", **labels) == 1
+        assert metrics.duration.count(**labels) == 1
+        assert metrics.queue_wait.count(project="default") == 1
+        assert metrics.response_bytes.count(project="default") == 1
+
+        text = metrics.registry.render()
+        assert 'gemini_queue_depth{project="default"} 0' in text
+        assert 'gemini_cache_hits_total{project="default"} 1' in text
+
+    @pytest.mark.asyncio
+    async def test_projects_share_one_exporter(self, tmp_path: Path) -> None:
+        """Test that integrations for two roots are served by one exporter."""
+        registry = IntegrationRegistry()
+        config = {"rate_limit_delay": 0, "model": "m", "metrics_port": 0}
+        first = registry.get(config, tmp_path / "a")
+        second = registry.get(config, tmp_path / "b")
+        try:
+            await first.start()
+            await second.start()
+            assert first.metrics_exporter is second.metrics_exporter
+            assert first.metrics_exporter is not None
+            assert first.metrics_exporter._server is not None
+
+            with patch.object(
+                second,
+                "_execute_gemini_cli",
+                return_value={"output": "answer", "execution_time": 1.5},
+            ):
+                await second.consult_gemini("question")
+
+            port = first.metrics_exporter._server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            response = (await reader.read()).decode()
+            writer.close()
+        finally:
+            await registry.close()
+
+        assert f'gemini_queue_depth{{project="{first.project}"}} 0' in response
+        assert f'gemini_queue_depth{{project="{second.project}"}} 0' in response
+        assert (
+            f'gemini_consultations_total{{project="{second.project}",'
+            'status="success",model="m"} 1'
+        ) in response
+        assert registry.metrics_exporter is None
+        assert "gemini_queue_depth{" not in registry.metrics.registry.render()
@@ -0,0 +1,133 @@
+"""Tests for the process supervisor module."""
+
+import asyncio
+import os
+import sys
+from collections.abc import Callable
+
+import pytest
+
+from gemini_mcp.gemini_integration import GeminiIntegration
+from gemini_mcp.process import ProcessSupervisor
+
+IGNORE_SIGTERM = (
+    "import signal, sys, time\n"
+    "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+    "sys.stdout.write('ready\\n'); sys.stdout.flush()\n"
+    "time.sleep(30)\n"
+)
+
+
+class TestProcessSupervisor:
+    """Test cases for ProcessSupervisor class."""
+
+    @pytest.mark.asyncio
+    async def test_spawn_uses_new_process_group(self) -> None:
+        """Test that each process leads its own process group."""
+        supervisor = ProcessSupervisor()
+        process = await supervisor.spawn(sys.executable, "-c", "pass")
+        try:
+            assert os.getpgid(process.pid) == process.pid
+        finally:
+            await process.wait()
+            await supervisor.reap(process)
+        assert supervisor.live == 0
+
+    @pytest.mark.asyncio
+    async def test_reap_terminates_running_process(self) -> None:
+        """Test that reaping a running process sends SIGTERM and waits."""
+        supervisor = ProcessSupervisor(grace_period=5.0)
+        process = await supervisor.spawn(
+            sys.executable, "-c", "import time; time.sleep(30)"
+        )
+        assert supervisor.live == 1
+
+        await supervisor.reap(process)
+
+        assert process.returncode is not None and process.returncode < 0
+        assert supervisor.live == 0
+        assert supervisor.terminated == 1
+        assert supervisor.killed == 0
+
+    @pytest.mark.asyncio
+    async def test_reap_escalates_to_sigkill(self) -> None:
+        """Test that a process ignoring SIGTERM is killed after the grace period."""
+        supervisor = ProcessSupervisor(grace_period=0.2)
+        process = await supervisor.spawn(
+            sys.executable,
+            "-c",
+            IGNORE_SIGTERM,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        assert process.stdout is not None
+        await process.stdout.readline()
+
+        await supervisor.reap(process)
+
+        assert process.returncode == -9
+        assert supervisor.killed == 1
+
+    @pytest.mark.asyncio
+    async def test_cap_limits_live_processes(self) -> None:
+        """Test that spawns beyond the cap wait for a reaped process."""
+        supervisor = ProcessSupervisor(max_processes=1)
+        first = await supervisor.spawn(
+            sys.executable, "-c", "import time; time.sleep(30)"
+        )
+        second = asyncio.ensure_future(supervisor.spawn(sys.executable, "-c", "pass"))
+        await asyncio.sleep(0.05)
+        assert not second.done()
+
+        await supervisor.reap(first)
+        process = await asyncio.wait_for(second, timeout=5)
+        await process.wait()
+        await supervisor.reap(process)
+        assert supervisor.live == 0
+
+    @pytest.mark.asyncio
+    async def test_shutdown_reaps_everything(self) -> None:
+        """Test that shutdown stops every live process."""
+        supervisor = ProcessSupervisor()
+        processes = [
+            await supervisor.spawn(sys.executable, "-c", "import time; time.sleep(30)")
+            for _ in range(3)
+        ]
+
+        await supervisor.shutdown()
+
+        assert supervisor.live == 0
+        assert all(process.returncode is not None for process in processes)
+
+
+class TestCLICleanup:
+    """Test cases for CLI cleanup on timeout and cancellation."""
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_cli(self, stub_cli: Callable[..., str]) -> None:
+        """Test that a timed-out CLI process is terminated and reaped."""
+        integration = GeminiIntegration(
+            {"cli_command": stub_cli(delay=30), "timeout": 0.2}
+        )
+
+        with pytest.raises(Exception, match="timed out"):
+            await integration._execute_gemini_cli("question")
+
+        assert integration.processes.live == 0
+        assert integration.processes.terminated == 1
+
+    @pytest.mark.asyncio
+    async def test_cancellation_kills_cli(self, stub_cli: Callable[..., str]) -> None:
+        """Test that cancelling a consultation terminates its CLI process."""
+        integration = GeminiIntegration({"cli_command": stub_cli(delay=30)})
+
+        task = asyncio.ensure_future(integration._execute_gemini_cli("question"))
+        for _ in range(100):
+            if integration.processes.live:
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert integration.processes.live == 0
+        assert integration.processes.terminated == 1
@@ -0,0 +1,285 @@
+"""Tests for the rate limiter module."""
+
+import asyncio
+import time
+
+import pytest
+
+from gemini_mcp.rate_limiter import FairShare, QueueDeadlineError, RateLimiter
+
+
+class TestRateLimiter:
+    """Test cases for RateLimiter class."""
+
+    def test_from_config_uses_rate_limit_delay(self) -> None:
+        """Test that rate_limit_delay is translated into a refill rate."""
+        limiter = RateLimiter.from_config(
+            {"rate_limit_delay": 0.5, "rate_limit_burst": 3, "max_concurrency": 2}
+        )
+
+        assert limiter.rate == 2.0
+        assert limiter.burst == 3
+        assert limiter.max_concurrency == 2
+
+    def test_from_config_zero_delay_disables_bucket(self) -> None:
+        """Test that a zero delay means no token bucket."""
+        assert RateLimiter.from_config({"rate_limit_delay": 0}).rate == 0.0
+
+    @pytest.mark.asyncio
+    async def test_burst_admits_immediately(self) -> None:
+        """Test that calls within the burst are not delayed."""
+        limiter = RateLimiter(rate=1.0, burst=3, max_concurrency=3)
+        start = time.monotonic()
+
+        for _ in range(3):
+            async with limiter.acquire():
+                pass
+
+        assert time.monotonic() - start < 0.1
+        assert limiter.admitted == 3
+
+    @pytest.mark.asyncio
+    async def test_refill_rate_spaces_calls(self) -> None:
+        """Test that calls beyond the burst wait for a refill."""
+        limiter = RateLimiter(rate=20.0, burst=1)
+        start = time.monotonic()
+
+        for _ in range(3):
+            async with limiter.acquire():
+                pass
+
+        # Two refills at 20 tokens/s take at least 0.1s
+        assert time.monotonic() - start >= 0.09
+        assert limiter.max_wait_time > 0
+
+    @pytest.mark.asyncio
+    async def test_bypassing_tokens_does_not_wait(self) -> None:
+        """Test that use_token=False skips the token bucket."""
+        limiter = RateLimiter(rate=0.01, burst=1)
+
+        async with limiter.acquire():
+            pass
+        async with limiter.acquire(use_token=False) as wait:
+            assert wait < 0.1
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self) -> None:
+        """Test that no more than max_concurrency calls run at once."""
+        limiter = RateLimiter(rate=0, max_concurrency=2)
+        running = 0
+        peak = 0
+
+        async def work() -> None:
+            nonlocal running, peak
+            async with limiter.acquire():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(work() for _ in range(6)))
+
+        assert peak == 2
+        assert limiter.waiting == 0
+        assert limiter.active == 0
+
+    @pytest.mark.asyncio
+    async def test_shared_cap_bounds_all_limiters(self) -> None:
+        """Test that limiters sharing a cap never exceed it together."""
+        shared = FairShare(capacity=2)
+        limiters = [
+            RateLimiter(rate=0, max_concurrency=4, shared=shared, tenant=name)
+            for name in ("a", "b")
+        ]
+        running = 0
+        peak = 0
+
+        async def work(limiter: RateLimiter) -> None:
+            nonlocal running, peak
+            async with limiter.acquire():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(work(limiter) for limiter in limiters * 4))
+
+        assert peak == 2
+        assert shared.active == 0
+        assert shared.waiting == 0
+
+
+class TestPriorityScheduling:
+    """Test cases for priority classes in RateLimiter."""
+
+    @staticmethod
+    async def admission_order(limiter: RateLimiter, priorities: list[str]) -> list[str]:
+        """Queue calls behind a held slot and return the order they run in."""
+        order: list[str] = []
+        release = asyncio.Event()
+
+        async def hold() -> None:
+            async with limiter.acquire():
+                await release.wait()
+
+        async def work(priority: str) -> None:
+            async with limiter.acquire(priority=priority):
+                order.append(priority)
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        tasks = [asyncio.ensure_future(work(priority)) for priority in priorities]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(holder, *tasks)
+        return order
+
+    @pytest.mark.asyncio
+    async def test_interactive_overtakes_background(self) -> None:
+        """Test that an interactive call jumps a background backlog."""
+        limiter = RateLimiter(rate=0, max_concurrency=1)
+
+        order = await self.admission_order(
+            limiter, ["background"] * 4 + ["interactive"]
+        )
+
+        assert order[0] == "interactive"
+
+    @pytest.mark.asyncio
+    async def test_background_is_not_starved(self) -> None:
+        """Test that background calls get a weighted share under contention."""
+        limiter = RateLimiter(rate=0, max_concurrency=1)
+
+        order = await self.admission_order(
+            limiter, ["interactive"] * 12 + ["background"] * 3
+        )
+
+        # Interactive has four times the weight of background
+        assert order[:5].count("background") == 1
+        assert order[5:10].count("background") == 1
+
+    @pytest.mark.asyncio
+    async def test_waiting_by_class(self) -> None:
+        """Test that queue depth is reported per priority class."""
+        limiter = RateLimiter(rate=0, max_concurrency=1)
+
+        async def work(priority: str) -> None:
+            async with limiter.acquire(priority=priority):
+                pass
+
+        async with limiter.acquire():
+            waiters = [
+                asyncio.ensure_future(work(priority))
+                for priority in ("normal", "background", "background")
+            ]
+            await asyncio.sleep(0)
+            assert limiter.waiting_by_class == {
+                "interactive": 0,
+                "normal": 1,
+                "background": 2,
+            }
+            for waiter in waiters:
+                waiter.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+
+        assert limiter.waiting_by_class == {
+            "interactive": 0,
+            "normal": 0,
+            "background": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_expired_call_is_dropped(self) -> None:
+        """Test that a call still queued at its deadline is dropped."""
+        limiter = RateLimiter(rate=0, max_concurrency=1)
+
+        async with limiter.acquire():
+            with pytest.raises(QueueDeadlineError):
+                async with limiter.acquire(deadline=time.monotonic() + 0.05):
+                    pass
+
+        assert limiter.expired == 1
+        assert limiter.waiting == 0
+        async with limiter.acquire() as wait:
+            assert wait < 0.05
+
+    @pytest.mark.asyncio
+    async def test_unknown_priority(self) -> None:
+        """Test that an unknown priority class is rejected."""
+        limiter = RateLimiter(rate=0)
+
+        with pytest.raises(ValueError):
+            async with limiter.acquire(priority="urgent"):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_applies_to_priorities(self) -> None:
+        """Test that queued priority calls still wait for tokens."""
+        limiter = RateLimiter(rate=20.0, burst=1, max_concurrency=4)
+        start = time.monotonic()
+
+        async def work(priority: str) -> None:
+            async with limiter.acquire(priority=priority):
+                pass
+
+        await asyncio.gather(work("background"), work("interactive"), work("normal"))
+
+        # Two refills at 20 tokens/s take at least 0.1s
+        assert time.monotonic() - start >= 0.09
+
+
+class TestFairShare:
+    """Test cases for FairShare class."""
+
+    @pytest.mark.asyncio
+    async def test_slots_alternate_between_tenants(self) -> None:
+        """Test that a deep backlog does not starve another tenant."""
+        shared = FairShare(capacity=1)
+        order: list[str] = []
+
+        async def work(tenant: str) -> None:
+            await shared.acquire(tenant)
+            order.append(tenant)
+            await asyncio.sleep(0)
+            shared.release(tenant)
+
+        await shared.acquire("busy")
+        tasks = [asyncio.ensure_future(work("busy")) for _ in range(4)]
+        tasks.append(asyncio.ensure_future(work("quiet")))
+        await asyncio.sleep(0)
+        shared.release("busy")
+        await asyncio.gather(*tasks)
+
+        assert order.index("quiet") == 1
+        assert shared.granted == 6
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_gives_up_its_place(self) -> None:
+        """Test that cancelling a waiter neither leaks nor blocks slots."""
+        shared = FairShare(capacity=1)
+        await shared.acquire("a")
+        waiter = asyncio.ensure_future(shared.acquire("b"))
+        await asyncio.sleep(0)
+        assert shared.waiting == 1
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        shared.release("a")
+
+        assert shared.waiting == 0
+        assert shared.active == 0
+        assert shared.active_by_tenant == {}
+
+    @pytest.mark.asyncio
+    async def test_resize_admits_waiters(self) -> None:
+        """Test that growing the cap lets waiting callers in."""
+        shared = FairShare(capacity=1)
+        await shared.acquire("a")
+        waiter = asyncio.ensure_future(shared.acquire("b"))
+        await asyncio.sleep(0)
+
+        shared.resize(2)
+        await asyncio.wait_for(waiter, 1)
+
+        assert shared.active == 2
+        assert shared.active_by_tenant == {"a": 1, "b": 1}
@@ -0,0 +1,146 @@
+"""Tests for the retry module."""
+
+import random
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from gemini_mcp.gemini_integration import GeminiIntegration
+from gemini_mcp.retry import GeminiCLIError, RetryPolicy, classify_error
+
+
+def cli_result(output: str) -> dict[str, Any]:
+    """Build a result shaped like _execute_gemini_cli's."""
+    return {"output": output, "execution_time": 0.1}
+
+
+class TestClassifyError:
+    """Test cases for classify_error function."""
+
+    @pytest.mark.parametrize(
+        "stderr, expected",
+        [
+            ("[API Error: 429 Too Many Requests]", ("rate_limit", True)),
+            ("RESOURCE_EXHAUSTED: Quota exceeded", ("rate_limit", True)),
+            ("503 Service Unavailable", ("server", True)),
+            (
+                "request to https://example failed, reason: ECONNRESET",
+                ("network", True),
+            ),
+            ("Please set an Auth method; authentication required", ("auth", False)),
+            ("[API Error: 400 INVALID_ARGUMENT]", ("invalid_request", False)),
+            ("retry after 4000ms", ("unknown", False)),
+        ],
+    )
+    def test_stderr_classes(self, stderr: str, expected: tuple[str, bool]) -> None:
+        """Test classification of typical CLI error output."""
+        assert classify_error(1, stderr) == expected
+
+    def test_exit_codes(self) -> None:
+        """Test classification by exit code when stderr says nothing."""
+        assert classify_error(-9, "") == ("crash", True)
+        assert classify_error(127, "") == ("not_executable", False)
+
+
+class TestRetryPolicy:
+    """Test cases for RetryPolicy class."""
+
+    def test_backoff_is_bounded_full_jitter(self) -> None:
+        """Test that backoff stays within the exponential envelope."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, rng=random.Random(1))
+        for retry, ceiling in enumerate([1.0, 2.0, 4.0, 5.0, 5.0]):
+            delays = [policy.backoff(retry) for _ in range(100)]
+            assert all(0 <= delay <= ceiling for delay in delays)
+            assert max(delays) > ceiling / 2
+
+
+class TestRetriedConsultation:
+    """Test cases for retries of consultations."""
+
+    @staticmethod
+    def make_integration(**config: Any) -> GeminiIntegration:
+        return GeminiIntegration(
+            {
+                "rate_limit_delay": 0,
+                "retry_base_delay": 0.01,
+                "cache_enabled": False,
+                **config,
+            }
+        )
+
+    @pytest.mark.asyncio
+    async def test_transient_error_is_retried(self) -> None:
+        """Test that a retryable failure is retried through the limiter."""
+        integration = self.make_integration()
+        transient = GeminiCLIError("429", kind="rate_limit", retryable=True)
+
+        with patch.object(
+            integration,
+            "_execute_gemini_cli",
+            side_effect=[transient, cli_result("answer")],
+        ) as execute:
+            result = await integration.consult_gemini("question")
+
+        assert result["status"] == "success"
+        assert result["retries"] == 1
+        assert execute.call_count == 2
+        assert integration.rate_limiter.admitted == 2
+        assert integration.stats.retries == 1
+
+    @pytest.mark.asyncio
+    async def test_permanent_error_is_not_retried(self) -> None:
+        """Test that permanent failures fail on the first attempt."""
+        integration = self.make_integration()
+        permanent = GeminiCLIError("auth", kind="auth", retryable=False)
+
+        with patch.object(
+            integration, "_execute_gemini_cli", side_effect=permanent
+        ) as execute:
+            result = await integration.consult_gemini("question")
+
+        assert result["status"] == "error"
+        assert execute.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_are_bounded(self) -> None:
+        """Test that retries stop after max_retries."""
+        integration = self.make_integration(max_retries=2)
+        transient = GeminiCLIError("503", kind="server", retryable=True)
+
+        with patch.object(
+            integration, "_execute_gemini_cli", side_effect=transient
+        ) as execute:
+            result = await integration.consult_gemini("question")
+
+        assert result["status"] == "error"
+        assert execute.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_retries_stop_at_deadline(self) -> None:
+        """Test that no retry starts after the request deadline."""
+        integration = self.make_integration(
+            max_retries=5, retry_base_delay=10.0, request_deadline=0.5
+        )
+        transient = GeminiCLIError("503", kind="server", retryable=True)
+
+        with (
+            patch.object(integration, "_execute_gemini_cli", side_effect=transient),
+            patch("gemini_mcp.retry.random.Random.uniform", return_value=5.0),
+        ):
+            result = await integration.consult_gemini("question")
+
+        assert result["status"] == "error"
+        assert integration.stats.retries == 0
+
+    @pytest.mark.asyncio
+    async def test_cli_exit_is_classified(self, stub_cli: Callable[..., str]) -> None:
+        """Test that a failing CLI raises a classified error."""
+        integration = self.make_integration(cli_command=stub_cli(exit_code=1))
+
+        with pytest.raises(GeminiCLIError) as excinfo:
+            await integration._execute_gemini_cli("question")
+
+        assert excinfo.value.kind == "unknown"
+        assert not excinfo.value.retryable
@@ -1,13 +1,15 @@
 """Tests for MCP server module."""
 
+import threading
 from pathlib import Path
 from typing import Any
-from unittest.mock import patch
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
 
 import mcp.types as types
 import pytest
 
 from gemini_mcp.server import MCPServer
+from gemini_mcp.stats import ConsultationStats
 
 
 class TestMCPServer:
@@ -66,23 +68,21 @@ class TestMCPServer:
         """Test tool listing."""
         server = MCPServer()
 
-        # Mock the server's list_tools handler
-        with patch.object(server.server, "list_tools") as mock_list_tools:
-            # Get the actual handler function
-            handler = None
-            for call in mock_list_tools.call_args_list:
-                if call[0]:  # If there are positional arguments
-                    handler = call[0][0]
-                    break
-
-            # Call the handler if we found it
-            if handler:
-                tools = await handler()
-                assert len(tools) == 3
-                tool_names = [tool.name for tool in tools]
-                assert "consult_gemini" in tool_names
-                assert "gemini_status" in tool_names
-                assert "toggle_gemini_auto_consult" in tool_names
+        handler = server.server.request_handlers[types.ListToolsRequest]
+        result = await handler(types.ListToolsRequest(method="tools/list"))
+
+        assert isinstance(result.root, types.ListToolsResult)
+        tools = result.root.tools
+        assert len(tools) == 8
+        tool_names = [tool.name for tool in tools]
+        assert "consult_gemini" in tool_names
+        assert "consult_gemini_batch" in tool_names
+        assert "consult_gemini_files" in tool_names
+        assert "gemini_status" in tool_names
+        assert "gemini_metrics" in tool_names
+        assert "gemini_history" in tool_names
+        assert "gemini_auto_consult" in tool_names
+        assert "toggle_gemini_auto_consult" in tool_names
 
     @pytest.mark.asyncio
     async def test_handle_consult_gemini(self) -> None:
@@ -125,6 +125,131 @@ class TestMCPServer:
             assert "Failed" in result[0].text
             assert "Test error message" in result[0].text
 
+    @pytest.mark.asyncio
+    async def test_handle_consult_gemini_streams_progress(self) -> None:
+        """Test that streamed chunks are forwarded as progress notifications."""
+        server = MCPServer()
+        ctx = Mock()
+        ctx.request_id = 7
+        ctx.meta.progressToken = "token"
+        ctx.session.send_progress_notification = AsyncMock()
+
+        async def fake_consult(**kwargs: Any) -> dict[str, Any]:
+            await kwargs["on_chunk"]("Hello, ")
+            await kwargs["on_chunk"]("world")
+            return {
+                "status": "success",
+                "response": "Hello, world",
+                "execution_time": 0.5,
+            }
+
+        with (
+            patch.object(
+                type(server.server), "request_context", new_callable=PropertyMock
+            ) as mock_ctx,
+            patch.object(server.gemini, "consult_gemini", side_effect=fake_consult),
+        ):
+            mock_ctx.return_value = ctx
+            result = await server._handle_consult_gemini({"query": "Test query"})
+
+        assert "Hello, world" in result[0].text
+        calls = ctx.session.send_progress_notification.await_args_list
+        assert [call.kwargs["message"] for call in calls] == ["Hello, ", "world"]
+        assert [call.args[1] for call in calls] == [7, 12]
+
+    @pytest.mark.asyncio
+    async def test_handle_consult_gemini_files(self, tmp_path: Path) -> None:
+        """Test that file excerpts are sent as context and reported."""
+        (tmp_path / "limits.py").write_text("RATE_LIMIT = 2\n")
+        server = MCPServer(project_root=str(tmp_path))
+
+        with patch.object(server.gemini, "consult_gemini") as mock_consult:
+            mock_consult.return_value = {
+                "status": "success",
+                "response": "Raise it",
+                "execution_time": 1.0,
+            }
+
+            result = await server._handle_consult_gemini_files(
+                {"query": "Is the rate limit too low?", "paths": ["limits.py"]}
+            )
+
+        context = mock_consult.call_args.kwargs["context"]
+        assert context == "--- limits.py (lines 1-1) ---\nRATE_LIMIT = 2\n"
+        assert "Raise it" in result[0].text
+        assert "`limits.py`: lines 1-1" in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_handle_consult_gemini_files_packs_off_the_loop(
+        self, tmp_path: Path
+    ) -> None:
+        """Test that file reading and ranking do not run on the event loop."""
+        (tmp_path / "limits.py").write_text("RATE_LIMIT = 2\n")
+        server = MCPServer(project_root=str(tmp_path))
+        pack = server.files.pack
+        threads = []
+
+        def record_thread(*args: Any) -> tuple[str, list[dict[str, Any]]]:
+            threads.append(threading.current_thread())
+            return pack(*args)
+
+        with (
+            patch.object(server.files, "pack", side_effect=record_thread),
+            patch.object(server.gemini, "consult_gemini") as mock_consult,
+        ):
+            mock_consult.return_value = {
+                "status": "success",
+                "response": "Fine",
+                "execution_time": 1.0,
+            }
+            await server._handle_consult_gemini_files(
+                {"query": "Is the rate limit too low?", "paths": ["limits.py"]}
+            )
+
+        assert threads and threads[0] is not threading.main_thread()
+
+    @pytest.mark.asyncio
+    async def test_handle_consult_gemini_files_outside_root(
+        self, tmp_path: Path
+    ) -> None:
+        """Test that paths outside the project root are refused."""
+        server = MCPServer(project_root=str(tmp_path))
+
+        result = await server._handle_consult_gemini_files(
+            {"query": "What is in here?", "paths": ["/etc/passwd"]}
+        )
+
+        assert "outside the project root" in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_handle_consult_gemini_batch(self) -> None:
+        """Test batch consultation handler output."""
+        server = MCPServer()
+
+        with patch.object(server.gemini, "consult_gemini_batch") as mock_batch:
+            mock_batch.return_value = [
+                {"status": "success", "response": "First", "index": 0, "elapsed": 1},
+                {"status": "error", "error": "Boom", "index": 1, "elapsed": 2},
+            ]
+
+            result = await server._handle_consult_gemini_batch(
+                {"items": [{"query": "Q1"}, {"query": "Q2"}]}
+            )
+
+        text = result[0].text
+        assert "1 succeeded" in text
+        assert "1 failed" in text
+        assert text.index("First") < text.index("Boom")
+
+    @pytest.mark.asyncio
+    async def test_handle_consult_gemini_batch_empty(self) -> None:
+        """Test batch consultation handler without items."""
+        server = MCPServer()
+
+        result = await server._handle_consult_gemini_batch({"items": []})
+
+        assert "Error" in result[0].text
+
     @pytest.mark.asyncio
     async def test_handle_gemini_status(self) -> None:
         """Test status handler."""
@@ -133,14 +258,17 @@ class TestMCPServer:
         # No need to mock, the method directly accesses properties
         server.gemini.enabled = True
         server.gemini.model = "gemini-2.5-flash"
-        server.gemini.consultation_log = [{"timestamp": "2024-01-01"}] * 5
+        server.gemini.stats = ConsultationStats()
+        for _ in range(5):
+            server.gemini.stats.record("success", 1.5)
 
         result = await server._handle_gemini_status({})
 
         assert len(result) == 1
         assert isinstance(result[0], types.TextContent)
         assert "Enabled" in result[0].text
-        assert "5" in result[0].text
+        assert "Total Consultations**: 5" in result[0].text
+        assert "p50 1.5" in result[0].text
         assert "gemini-2.5-flash" in result[0].text
 
     @pytest.mark.asyncio
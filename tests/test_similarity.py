@@ -0,0 +1,114 @@
+"""Tests for the similarity module."""
+
+import time
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from gemini_mcp.gemini_integration import GeminiIntegration
+from gemini_mcp.similarity import SimilarityIndex, normalize, shingles, simhash
+
+QUESTION = (
+    "Should we cache Gemini responses in memory with an LRU policy, or persist "
+    "them to disk so that they survive restarts of the MCP server process?"
+)
+
+
+class TestSimilarityIndex:
+    """Test cases for SimilarityIndex class."""
+
+    def test_normalize_ignores_case_and_punctuation(self) -> None:
+        """Test that formatting differences normalize away."""
+        assert normalize("Use a  QUEUE, right?") == normalize("use a queue right")
+
+    def test_simhash_of_similar_sets_is_close(self) -> None:
+        """Test that a small edit flips few fingerprint bits."""
+        edited = QUESTION.replace("restarts", "reboots")
+        near = simhash(shingles(normalize(QUESTION))) ^ simhash(
+            shingles(normalize(edited))
+        )
+        far = simhash(shingles(normalize(QUESTION))) ^ simhash(
+            shingles(normalize("How do I configure the circuit breaker timeout?"))
+        )
+
+        assert bin(near).count("1") < bin(far).count("1")
+
+    def test_finds_near_duplicate(self) -> None:
+        """Test that a reworded question finds the stored answer."""
+        index = SimilarityIndex(threshold=0.8)
+        index.add(QUESTION, "", "model", True, {"response": "LRU"})
+
+        match = index.find(QUESTION.upper().replace("?", "!"), "", "model", True)
+        assert match is not None
+        assert match[0] == {"response": "LRU"}
+        assert match[1] == 1.0
+
+        match = index.find(QUESTION.replace("restarts", "reboots"), "", "model", True)
+        assert match is not None
+        assert 0.8 <= match[1] < 1.0
+
+        assert index.lookups == 2
+        assert index.reused == 2
+
+    def test_threshold_rejects_different_questions(self) -> None:
+        """Test that questions below the threshold are not reused."""
+        index = SimilarityIndex(threshold=0.9)
+        index.add(QUESTION, "", "model", True, {"response": "LRU"})
+
+        assert (
+            index.find("Should we cache Gemini responses?", "", "model", True) is None
+        )
+        assert index.reused == 0
+
+    def test_context_model_and_mode_must_match(self) -> None:
+        """Test that context, model and comparison mode limit reuse."""
+        index = SimilarityIndex()
+        index.add(QUESTION, "def handler(): pass", "model", True, {"response": "LRU"})
+
+        assert index.find(QUESTION, "class Cache: ...", "model", True) is None
+        assert index.find(QUESTION, "def handler(): pass", "other", True) is None
+        assert index.find(QUESTION, "def handler(): pass", "model", False) is None
+        assert index.find(QUESTION, "def handler(): pass", "model", True) is not None
+
+    def test_evicts_oldest_and_expired_entries(self) -> None:
+        """Test that the index is bounded by size and TTL."""
+        index = SimilarityIndex(max_entries=2, ttl=10)
+        for topic in ("queues", "caches", "retries"):
+            index.add(f"How should I design {topic}?", "", "m", True, {"r": topic})
+
+        assert len(index) == 2
+        assert index.find("How should I design queues?", "", "m", True) is None
+
+        with patch("gemini_mcp.similarity.time.time", return_value=time.time() + 11):
+            assert index.find("How should I design caches?", "", "m", True) is None
+            assert index.find("How should I design retries?", "", "m", True) is None
+        assert len(index) == 0
+
+    @pytest.mark.asyncio
+    async def test_integration_reuses_similar_answer(self) -> None:
+        """Test that a consultation reuses the answer to a similar question."""
+        integration = GeminiIntegration(
+            {"rate_limit_delay": 0, "similarity_enabled": True}
+        )
+        calls = 0
+
+        async def execute(query: str, **kwargs: Any) -> dict[str, Any]:
+            nonlocal calls
+            calls += 1
+            return {"output": "Use an LRU", "execution_time": 0.5}
+
+        with patch.object(integration, "_execute_gemini_cli", side_effect=execute):
+            first = await integration.consult_gemini(QUESTION)
+            second = await integration.consult_gemini(QUESTION.lower())
+            bypassed = await integration.consult_gemini(
+                QUESTION.lower(), use_cache=False
+            )
+
+        assert calls == 2
+        assert second["response"] == "Use an LRU"
+        assert second["reused"] is True
+        assert second["reused_from"] == first["consultation_id"]
+        assert second["similarity"] == 1.0
+        assert "reused" not in bypassed
+        assert integration.stats.by_status["cached"] == 1
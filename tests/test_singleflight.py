@@ -0,0 +1,87 @@
+"""Tests for the single-flight module."""
+
+import asyncio
+
+import pytest
+
+from gemini_mcp.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight class."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_execution(self) -> None:
+        """Test that identical concurrent calls run once."""
+        flight: SingleFlight[str] = SingleFlight()
+        calls = 0
+
+        async def work() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+        assert calls == 1
+        assert [value for value, _ in results] == ["result"] * 5
+        assert [shared for _, shared in results].count(False) == 1
+        assert flight.coalesced == 4
+        assert flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self) -> None:
+        """Test that different keys are not coalesced."""
+        flight: SingleFlight[str] = SingleFlight()
+
+        async def work() -> str:
+            await asyncio.sleep(0.01)
+            return "result"
+
+        await asyncio.gather(flight.do("a", work), flight.do("b", work))
+
+        assert flight.coalesced == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self) -> None:
+        """Test that other waiters still get the result after a cancellation."""
+        flight: SingleFlight[str] = SingleFlight()
+        release = asyncio.Event()
+
+        async def work() -> str:
+            await release.wait()
+            return "result"
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == ("result", True)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    @pytest.mark.asyncio
+    async def test_last_waiter_cancels_shared_call(self) -> None:
+        """Test that the execution is cancelled once nobody waits for it."""
+        flight: SingleFlight[str] = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def work() -> str:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "result"
+
+        waiter = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        waiter.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert flight.in_flight() == 0
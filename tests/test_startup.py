@@ -0,0 +1,92 @@
+"""Tests for package import and startup cost."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import gemini_mcp
+
+# Cold-start budgets in seconds; override on slow CI machines
+IMPORT_BUDGET = float(os.getenv("GEMINI_MCP_IMPORT_BUDGET", "0.5"))
+STARTUP_BUDGET = float(os.getenv("GEMINI_MCP_STARTUP_BUDGET", "3.0"))
+
+
+def run_python(code: str) -> str:
+    """Run code in a fresh interpreter and return its stdout."""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+    )
+    return result.stdout.strip()
+
+
+def best_of(code: str, runs: int = 3) -> float:
+    """Fastest of several cold measurements printed by ``code``."""
+    return min(float(run_python(code)) for _ in range(runs))
+
+
+class TestStartup:
+    """Test cases for lazy imports and the startup budget."""
+
+    def test_import_does_not_load_mcp_sdk(self) -> None:
+        """Test that importing the package leaves the MCP SDK unloaded."""
+        output = run_python(
+            "import sys, gemini_mcp; print(gemini_mcp.__version__); "
+            "print(any(m == 'mcp' or m.startswith(('mcp.', 'pydantic')) "
+            "for m in sys.modules))"
+        )
+
+        assert output.splitlines() == [gemini_mcp.__version__, "False"]
+
+    def test_lazy_exports(self) -> None:
+        """Test that public names resolve on first access."""
+        from gemini_mcp.gemini_integration import GeminiIntegration
+        from gemini_mcp.server import MCPServer
+
+        assert gemini_mcp.GeminiIntegration is GeminiIntegration
+        assert gemini_mcp.MCPServer is MCPServer
+        assert "MCPServer" in dir(gemini_mcp)
+
+    def test_integration_import_within_budget(self) -> None:
+        """Test that the integration module imports within the budget."""
+        elapsed = best_of(
+            "import time; start = time.perf_counter(); "
+            "import gemini_mcp.gemini_integration; "
+            "print(time.perf_counter() - start)"
+        )
+
+        assert elapsed < IMPORT_BUDGET
+
+    def test_server_startup_within_budget(self) -> None:
+        """Test that importing and creating the server fits the budget."""
+        elapsed = best_of(
+            "import time; start = time.perf_counter(); "
+            "from gemini_mcp.server import MCPServer; MCPServer(); "
+            "print(time.perf_counter() - start)"
+        )
+
+        assert elapsed < STARTUP_BUDGET
+
+    def test_profile_startup_option(self, tmp_path: Path) -> None:
+        """Test that --profile-startup reports timings and exits."""
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "gemini_mcp",
+                "--profile-startup",
+                "--project-root",
+                str(tmp_path),
+            ],
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+
+        assert result.returncode == 0
+        assert "import gemini_mcp.server" in result.stderr
+        assert "MCPServer() initialization" in result.stderr
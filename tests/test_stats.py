@@ -0,0 +1,74 @@
+"""Tests for the consultation statistics module."""
+
+import random
+
+from gemini_mcp.stats import (
+    ConsultationLog,
+    ConsultationRecord,
+    ConsultationStats,
+    LatencySketch,
+    ThroughputWindow,
+)
+
+
+class TestConsultationStats:
+    """Test cases for consultation log and aggregates."""
+
+    def test_log_is_bounded(self) -> None:
+        """Test that the ring buffer keeps only the newest records."""
+        log = ConsultationLog(capacity=3)
+        for index in range(5):
+            log.append(ConsultationRecord(id=f"c{index}", query="q", status="success"))
+
+        assert len(log) == 3
+        assert [record.id for record in log] == ["c2", "c3", "c4"]
+        assert log[-1]["id"] == "c4"
+
+    def test_record_truncates_query(self) -> None:
+        """Test that long queries are truncated in records."""
+        record = ConsultationRecord(id="c", query="x" * 500, status="success")
+
+        assert len(record.query) == 203
+        assert record.to_dict()["timestamp"].startswith("20")
+
+    def test_sketch_quantiles_within_error(self) -> None:
+        """Test that sketch quantiles stay close to exact quantiles."""
+        rng = random.Random(0)
+        values = [rng.lognormvariate(1, 1) for _ in range(20000)]
+        sketch = LatencySketch()
+        for value in values:
+            sketch.add(value)
+
+        values.sort()
+        for q in (0.5, 0.95, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            estimate = sketch.quantile(q)
+            assert estimate is not None
+            assert abs(estimate - exact) / exact < 0.03
+
+    def test_sketch_empty(self) -> None:
+        """Test that an empty sketch has no quantiles."""
+        assert LatencySketch().quantile(0.5) is None
+
+    def test_throughput_window(self) -> None:
+        """Test that per-minute rates only count recent minutes."""
+        window = ThroughputWindow(minutes=15)
+        now = 10_000 * 60.0
+        for minute_ago in (0, 0, 3, 10, 20):
+            window.add(now - minute_ago * 60)
+
+        assert window.rate(1, now) == 2
+        assert window.rate(5, now) == 3 / 5
+        assert window.rate(15, now) == 4 / 15
+
+    def test_stats_summary(self) -> None:
+        """Test that aggregates count statuses and latencies."""
+        stats = ConsultationStats()
+        stats.record("success", 1.0)
+        stats.record("error")
+        stats.record("success", 3.0)
+
+        summary = stats.summary()
+        assert summary["total"] == 3
+        assert summary["by_status"] == {"success": 2, "error": 1}
+        assert stats.latency.count == 2
@@ -0,0 +1,64 @@
+"""Tests for the streaming module."""
+
+import asyncio
+
+import pytest
+
+from gemini_mcp.streaming import ChunkBroadcast, iter_stream
+
+
+class TestStreaming:
+    """Test cases for streaming helpers."""
+
+    @pytest.mark.asyncio
+    async def test_iter_stream_keeps_split_utf8_intact(self) -> None:
+        """Test that multi-byte characters split across reads are decoded."""
+        stream = asyncio.StreamReader()
+        data = "héllo ✓".encode()
+        stream.feed_data(data)
+        stream.feed_eof()
+
+        chunks = [chunk async for chunk in iter_stream(stream, chunk_size=2)]
+
+        assert "".join(chunks) == "héllo ✓"
+        assert "�" not in "".join(chunks)
+
+    @pytest.mark.asyncio
+    async def test_broadcast_replays_to_late_subscribers(self) -> None:
+        """Test that late subscribers see earlier chunks in order."""
+        broadcast = ChunkBroadcast()
+        early: list[str] = []
+        late: list[str] = []
+
+        async def on_early(chunk: str) -> None:
+            early.append(chunk)
+
+        async def on_late(chunk: str) -> None:
+            late.append(chunk)
+
+        await broadcast.subscribe(on_early)
+        await broadcast.publish("a")
+        await broadcast.subscribe(on_late)
+        await broadcast.publish("b")
+
+        assert early == ["a", "b"]
+        assert late == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_broadcast_drops_failing_subscriber(self) -> None:
+        """Test that one failing subscriber does not affect the others."""
+        broadcast = ChunkBroadcast()
+        received: list[str] = []
+
+        async def failing(chunk: str) -> None:
+            raise RuntimeError("client went away")
+
+        async def healthy(chunk: str) -> None:
+            received.append(chunk)
+
+        await broadcast.subscribe(failing)
+        await broadcast.subscribe(healthy)
+        await broadcast.publish("a")
+        await broadcast.publish("b")
+
+        assert received == ["a", "b"]
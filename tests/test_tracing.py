@@ -0,0 +1,87 @@
+"""Tests for the tracing module."""
+
+from collections.abc import Callable, Sequence
+
+import pytest
+
+from gemini_mcp.gemini_integration import GeminiIntegration
+from gemini_mcp.tracing import PHASES, Span, emit_spans, phase_durations
+
+
+class TestSpans:
+    """Test cases for span helpers."""
+
+    def test_phase_durations_sum_and_order(self) -> None:
+        """Test that durations are summed per phase in phase order."""
+        spans = [
+            Span("spawn", 10.0, 0.5),
+            Span("queue_wait", 9.0, 0.25),
+            Span("queue_wait", 9.5, 0.25),
+        ]
+        assert list(phase_durations(spans).items()) == [
+            ("queue_wait", 0.5),
+            ("spawn", 0.5),
+        ]
+
+    def test_failing_hook_is_skipped(self) -> None:
+        """Test that one failing hook does not stop the others."""
+        received: list[str] = []
+
+        def broken(consultation_id: str, spans: Sequence[Span]) -> None:
+            raise RuntimeError("tracer down")
+
+        def working(consultation_id: str, spans: Sequence[Span]) -> None:
+            received.append(consultation_id)
+
+        emit_spans([broken, working], "consult_1", [Span("prepare", 0.0, 0.1)])
+
+        assert received == ["consult_1"]
+
+
+class TestConsultationSpans:
+    """Test cases for spans recorded by consultations."""
+
+    @pytest.mark.asyncio
+    async def test_consultation_reports_every_phase(
+        self, stub_cli: Callable[..., str]
+    ) -> None:
+        """Test that a CLI consultation reports all phases."""
+        integration = GeminiIntegration(
+            {"cli_command": stub_cli(delay=0.05), "rate_limit_delay": 0}
+        )
+        received: list[tuple[str, list[Span]]] = []
+        integration.add_span_hook(
+            lambda consultation_id, spans: received.append(
+                (consultation_id, list(spans))
+            )
+        )
+
+        result = await integration.consult_gemini("question")
+
+        assert result["status"] == "success"
+        assert list(result["phases"]) == list(PHASES)
+        assert all(duration >= 0 for duration in result["phases"].values())
+        assert result["phases"]["first_byte"] >= 0.04
+
+        consultation_id, spans = received[0]
+        assert consultation_id == result["consultation_id"]
+        assert [span.name for span in spans] == list(PHASES)
+        starts = [span.start for span in spans]
+        assert starts == sorted(starts)
+
+        assert integration.consultation_log[-1].phases == result["phases"]
+
+    @pytest.mark.asyncio
+    async def test_cached_consultation_only_prepares(
+        self, stub_cli: Callable[..., str]
+    ) -> None:
+        """Test that a cache hit reports only the prepare phase."""
+        integration = GeminiIntegration(
+            {"cli_command": stub_cli(), "rate_limit_delay": 0}
+        )
+        await integration.consult_gemini("question")
+
+        result = await integration.consult_gemini("question")
+
+        assert result["cached"]
+        assert list(result["phases"]) == ["prepare"]
@@ -0,0 +1,65 @@
+"""Tests for the uncertainty detection module."""
+
+import re
+
+from gemini_mcp.uncertainty import PATTERN_FAMILIES, UncertaintyMatcher
+
+
+def search_each(text: str) -> list[str]:
+    """Reference implementation: one re.search per pattern."""
+    return [
+        f"{family}: {pattern}"
+        for family, patterns in PATTERN_FAMILIES
+        for pattern in patterns
+        if re.search(pattern, text, re.IGNORECASE)
+    ]
+
+
+SAMPLES = [
+    "",
+    "This is correct",
+    "I'm not sure, but I think it might be a security issue in production.",
+    "Maybe PERHAPS probably; the decision involves trade-offs and alternatives.",
+    "Weighing the options: pros and cons of a database migration with credentials",
+    "performance \n  critical path uses encryption and an API key",
+    "unlikely maybeX xsecurity considering",
+]
+
+
+class TestUncertaintyMatcher:
+    """Test cases for UncertaintyMatcher class."""
+
+    def test_matches_per_pattern_search(self) -> None:
+        """Test that the single-pass matcher equals searching each pattern."""
+        matcher = UncertaintyMatcher()
+        for text in SAMPLES:
+            assert matcher.detect(text) == search_each(text)
+
+    def test_reports_patterns_sharing_a_start(self) -> None:
+        """Test that overlapping patterns starting at one position are found."""
+        matcher = UncertaintyMatcher([("family", [r"\bfoo\b", r"\bfoo bar\b"])])
+
+        assert matcher.detect("foo bar") == [
+            r"family: \bfoo\b",
+            r"family: \bfoo bar\b",
+        ]
+
+    def test_scanner_matches_across_chunks(self) -> None:
+        """Test that matches split across chunks are found by the scanner."""
+        matcher = UncertaintyMatcher()
+        text = " ".join(SAMPLES) * 3
+
+        for size in (1, 7, 50):
+            scanner = matcher.scanner(overlap=32)
+            for start in range(0, len(text), size):
+                scanner.feed(text[start : start + size])
+            assert scanner.finish() == search_each(text)
+
+    def test_scanner_respects_word_boundary_at_chunk_end(self) -> None:
+        """Test that a chunk ending mid-word does not produce a false match."""
+        scanner = UncertaintyMatcher().scanner(overlap=16)
+
+        scanner.feed("we keep the security")
+        scanner.feed("x token " + "padding " * 10)
+
+        assert scanner.finish() == []
@@ -0,0 +1,96 @@
+"""Tests for the warm worker pool module."""
+
+import asyncio
+from collections.abc import Callable
+
+import pytest
+
+from gemini_mcp.gemini_integration import GeminiIntegration
+from gemini_mcp.worker_pool import WarmWorkerPool
+
+
+async def wait_for_idle(pool: WarmWorkerPool, count: int) -> None:
+    """Wait until the pool has at least ``count`` idle workers."""
+    for _ in range(200):
+        if pool.idle >= count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("warm workers were not spawned")
+
+
+class TestWarmWorkerPool:
+    """Test cases for WarmWorkerPool class."""
+
+    @pytest.mark.asyncio
+    async def test_start_fills_pool(self, stub_cli: Callable[..., str]) -> None:
+        """Test that starting the pool spawns idle workers."""
+        pool = WarmWorkerPool([stub_cli()], size=2)
+        pool.start()
+        try:
+            await wait_for_idle(pool, 2)
+        finally:
+            await pool.close()
+
+        assert pool.idle == 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_replenishes(self, stub_cli: Callable[..., str]) -> None:
+        """Test that checking out a worker spawns a replacement."""
+        pool = WarmWorkerPool([stub_cli()], size=1)
+        try:
+            assert await pool.acquire() is None
+            await wait_for_idle(pool, 1)
+
+            process = await pool.acquire()
+            assert process is not None
+            stdout, _ = await process.communicate(b"hello")
+            assert stdout == b"stdin:5:hello"
+
+            await wait_for_idle(pool, 1)
+            assert pool.hits == 1
+            assert pool.misses == 1
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_dead_workers_are_recycled(
+        self, stub_cli: Callable[..., str]
+    ) -> None:
+        """Test that exited workers are never handed out."""
+        pool = WarmWorkerPool([stub_cli(exit_code=1)], size=1)
+        try:
+            pool.start()
+            await wait_for_idle(pool, 1)
+            # The stub exits as soon as its stdin is closed
+            pool._idle[0].process.stdin.close()  # type: ignore[union-attr]
+            await pool._idle[0].process.wait()
+
+            assert await pool.acquire() is None
+            assert pool.recycled == 1
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_integration_uses_warm_worker(
+        self, stub_cli: Callable[..., str]
+    ) -> None:
+        """Test that consultations go through warm workers when available."""
+        integration = GeminiIntegration(
+            {
+                "cli_command": stub_cli(),
+                "model": "",
+                "worker_pool_size": 1,
+                "rate_limit_delay": 0,
+            }
+        )
+        await integration.start()
+        try:
+            assert integration.worker_pool is not None
+            await wait_for_idle(integration.worker_pool, 1)
+
+            result = await integration._execute_gemini_cli("question")
+            assert result["warm_worker"] is True
+            assert result["output"] == "stdin:8:question"
+            assert result["spawn_time"] >= 0
+        finally:
+            await integration.close()